@@ -1,1160 +1,1863 @@
 """
 This python module contains low-level functions to interact with the DW1000 chip using a Raspberry Pi 3. It requires the following modules: 
-math, time, spidev, Rpi.GPIO, random.
+math, time, random, DW1000Bus (spidev and Rpi.GPIO on the Raspberry Pi).
+The SPI transactions and the interrupt line go through a bus backend given to begin(), see DW1000Bus and DW1000Simulator.
 """
 
 import time
 import math
+import threading
+from collections import deque, namedtuple
 from random import randint
-import spidev
-import RPi.GPIO as GPIO
+import DW1000Bus
 import DW1000Constants as C
+import DW1000Timestamp
+
+# Diagnostics of a received frame, see readRxDiagnostics(). rxTimestamp is the raw RX_STAMP, not corrected for the range bias.
+RxDiagnostics = namedtuple("RxDiagnostics", ["frameLength", "preambleCount", "rxTimestamp", "fpAmpl1",
+                                             "stdNoise", "fpAmpl2", "fpAmpl3", "cirPower", "carrierIntegrator"])
+# Event captured by the interrupt handler, see enableEventQueue(). kind is C.EVENT_SENT or C.EVENT_RECEIVED, status is the SYS_STATUS value
+# read at interrupt time, data and diagnostics are None for sent events.
+RadioEvent = namedtuple("RadioEvent", ["kind", "data", "timestamp", "status", "diagnostics"])
+
+
+class DW1000Radio(object):
+    """
+    This class holds the state of one DW1000 chip: its bus and chip select, the device mode, the callbacks and the copies of its configuration
+    registers. Several instances can share one bus backend (e.g. several chips on the same SPI bus with different chip selects) to drive
+    several chips from the same process. The module level functions use a default instance, see the end of this module.
+    """
+
+    def __init__(self):
+        self._bus = None
+        self._irq = None
+        self._irqLevel = None
+        self._chipSelect = None
+        self._spiSpeed = None
+        self._fastSpeed = None
+        self._deviceMode = C.IDLE_MODE
+        self._permanentReceive = False
+        self._doubleBuffered = False
+        self._operationMode = [None] * 6 # [dataRate, pulseFrequency, pacSize, preambleLength, channel, preacode]
+        self._rangeBiasTable = None
+        self._antennaDelay = C.ANTENNA_DELAY
+        self.callbacks = {}
+        self._events = None
+        self._eventQueueSize = 0
+        self._droppedEvents = 0
+        self._eventSignal = threading.Event()
+        self._readCarrierIntegrator = False
+        self._txOrigin = None
+        self._latencies = None
+        self._lateProbability = C.LATE_TX_PROBABILITY
+        self._lateTransmits = 0
+        self._autoAcks = 0
+        # read and write transfer buffers of each thread doing SPI transactions, see _newTransferBuffer()
+        self._transferBuffers = threading.local()
+
+        self._networkAndAddress = [0] * 4
+        self._sysctrl = [0] * 4
+        self._chanctrl = [0] * 4
+        self._syscfg = [0] * 4
+        self._sysmask = [0] * 4
+        self._txfctrl = [0] * 5
+        self._sysstatus = [0] * 5
+
+    """
+    DW1000 general configuration.
+    """
+
+    def begin(self, irq, bus=None):
+        """
+        This function opens the bus connection, by default the SPI connection available on the Raspberry Pi using the chip select #0. Normally, spidev can auto enable chip select when necessary. However, in our case, the dw1000's chip select is connected to GPIO16 so we have to enable/disable it manually.
+        It also sets up the interrupt detection event on the rising edge of the interrupt pin.
+
+        Args:
+                irq : The GPIO pin number managing interrupts.
+                bus : The bus backend to use, a DW1000Bus.SpiBus by default.
+        """
+        self._bus = bus if bus is not None else DW1000Bus.SpiBus()
+        # Wait 5 us to open spi connection to let the chip enter idle state, see 2.3.2 of the DW1000 user manual (INIT).
+        time.sleep(C.INIT_DELAY)
+        self._bus.open()
+        self._deviceMode = C.IDLE_MODE
+
+        self._irq = irq
+        # without a way to sample the interrupt line, the handler reads SYS_STATUS again to know if it is still high
+        self._irqLevel = getattr(self._bus, "interruptAsserted", None)
+        self._bus.setupInterrupt(irq, self.handleInterrupt)
+
+    def setup(self, ss, spiSpeed=C.SPI_FAST_SPEED):
+        """
+        This function defines the GPIO used for the chip select by configuring it as an output and by setting its initial state at inactive (HIGH).
+        It also clears interrupt configuration and performs a soft reset before applying initial configurations for the chip.
+        The initialization runs with the SPI clock at C.SPI_SLOW_SPEED, the chip being on its crystal, then the clock is raised to spiSpeed once
+        the PLL is locked, see setSpiSpeed(). From then on, enableClock() and softReset() lower and restore it with the clock of the chip.
+
+        Args:
+                ss: The GPIO pin number of the chip enable/select for the SPI bus.
+                spiSpeed: The SPI clock frequency in Hz after the initialization, at most C.SPI_FAST_SPEED.
+        """
+        self._chipSelect = ss
+        self._bus.setupChipSelect(self._chipSelect)
+        self._fastSpeed = None
+        self.setBusSpeed(C.SPI_SLOW_SPEED)
+
+        self.enableClock(C.AUTO_CLOCK)
+
+        self.softReset()
+
+        # Default system configuration
+        setArray(self._syscfg, 4, 0x00)
+        setBit(self._syscfg, 4, C.DIS_DRXB_BIT, True)
+        setBit(self._syscfg, 4, C.HIRQ_POL_BIT, True)
+        self.writeBytes(C.SYS_CFG, C.NO_SUB, self._syscfg, 4)
+
+        # clear interrupts configuration
+        setArray(self._sysmask, 4, 0x00)
+        self.writeBytes(C.SYS_MASK, C.NO_SUB, self._sysmask, 4)
+
+        self.enableClock(C.XTI_CLOCK)
+        self.manageLDE()
+        self.enableClock(C.AUTO_CLOCK)
+        self.setSpiSpeed(spiSpeed)
+
+    def setBusSpeed(self, speed):
+        """
+        This function sets the SPI clock frequency of the chip's transactions, without checking the link. Nothing is done if the bus backend
+        has no setSpeed function.
+
+        Args:
+                speed: The SPI clock frequency in Hz.
+        """
+        setSpeed = getattr(self._bus, "setSpeed", None)
+        if setSpeed is None:
+            return
+        setSpeed(self._chipSelect, speed)
+        self._spiSpeed = speed
+
+    def setSpiSpeed(self, speed):
+        """
+        This function raises the SPI clock frequency to the given one and checks the link with checkLink(). On errors, the frequency is halved
+        until the link works, down to C.SPI_SLOW_SPEED. The chip must run on its PLL (AUTO_CLOCK, after setup()) above C.SPI_XTI_MAX_SPEED:
+        the clock stays at C.SPI_SLOW_SPEED until the PLL is locked, see isPllLocked(). The frequency is restored by enableClock(AUTO_CLOCK)
+        and softReset().
+
+        Args:
+                speed: The SPI clock frequency in Hz, at most C.SPI_FAST_SPEED.
+
+        Returns:
+                The SPI clock frequency in use, None if the bus backend has a fixed one.
+        """
+        if getattr(self._bus, "setSpeed", None) is None:
+            return None
+        speed = min(speed, C.SPI_FAST_SPEED)
+        self._fastSpeed = speed
+        self.setBusSpeed(C.SPI_SLOW_SPEED)
+        checks = 1
+        while not self.isPllLocked():
+            if checks == C.PLL_LOCK_CHECKS:
+                return C.SPI_SLOW_SPEED
+            checks += 1
+            time.sleep(C.PLL_LOCK_DELAY)
+        while speed > C.SPI_SLOW_SPEED:
+            self.setBusSpeed(speed)
+            if self.checkLink():
+                return speed
+            speed //= 2
+        self.setBusSpeed(C.SPI_SLOW_SPEED)
+        # the failed tests may have left a wrong value in the scratch register
+        self.writeBytes(C.OTP_IF, C.OTP_WDAT_SUB, [0] * 4, 4)
+        return C.SPI_SLOW_SPEED
+
+    def lowerSpiSpeed(self):
+        """
+        This function lowers the SPI clock frequency to C.SPI_SLOW_SPEED if it is above the limit of the crystal clock, C.SPI_XTI_MAX_SPEED.
+        The frequency given to setSpiSpeed() is kept to be restored.
+        """
+        if self._spiSpeed is not None and self._spiSpeed > C.SPI_XTI_MAX_SPEED:
+            self.setBusSpeed(C.SPI_SLOW_SPEED)
+
+    def isPllLocked(self):
+        """
+        This function tells if the clock PLL is locked: CPLOCK is set in SYS_STATUS and CLKPLL_LL (losing lock) is not.
+
+        Returns:
+                True if the chip can run on its PLL.
+        """
+        status = self.readStatus()
+        return bool(status & (1 << C.CPLOCK_BIT)) and not status & (1 << C.CLKPLL_LL_BIT)
+
+    def getSpiSpeed(self):
+        """
+        This function returns the SPI clock frequency of the chip's transactions, None if the bus backend has a fixed one.
+        """
+        return self._spiSpeed
+
+    def checkLink(self):
+        """
+        This function tests the SPI link at the current clock frequency: DEV_ID must hold the DW1000's tag and model, and the
+        C.LINK_TEST_PATTERNS written into OTP_WDAT, which has no effect outside OTP programming, must be read back unchanged.
+
+        Returns:
+                True if the link works.
+        """
+        data = [0] * 4
+        self.readBytes(C.DEV_ID, C.NO_SUB, data, 4)
+        if getTimeStamp(data, 0, 4) >> 8 != C.DEV_ID_TAG:
+            return False
+        for pattern in C.LINK_TEST_PATTERNS:
+            self.writeBytes(C.OTP_IF, C.OTP_WDAT_SUB, writeValueToBytes([0] * 4, pattern, 4), 4)
+            self.readBytes(C.OTP_IF, C.OTP_WDAT_SUB, data, 4)
+            if getTimeStamp(data, 0, 4) != pattern:
+                return False
+        self.writeBytes(C.OTP_IF, C.OTP_WDAT_SUB, [0] * 4, 4)
+        return True
 
-spi = spidev.SpiDev()
-_chipSelect = None
-_deviceMode = C.IDLE_MODE
-_permanentReceive = False
-_operationMode = [None] * 6 # [dataRate, pulseFrequency, pacSize, preambleLength, channel, preacode]
-callbacks = {}
-
-_networkAndAddress = [0] * 4
-_sysctrl = [0] * 4
-_chanctrl = [0] * 4
-_syscfg = [0] * 4
-_sysmask = [0] * 4
-_txfctrl = [0] * 5
-_sysstatus = [0] * 5
-
-GPIO.setwarnings(False)
-
-
-"""
-DW1000 general configuration.
-"""
-
-
-def begin(irq):
-    """
-    This function opens the SPI connection available on the Raspberry Pi using the chip select #0. Normally, spidev can auto enable chip select when necessary. However, in our case, the dw1000's chip select is connected to GPIO16 so we have to enable/disable it manually.
-    It also sets up the interrupt detection event on the rising edge of the interrupt pin.
-
-    Args:
-            irq : The GPIO pin number managing interrupts.
-    """
-    global _deviceMode
-    # Wait 5 us to open spi connection to let the chip enter idle state, see 2.3.2 of the DW1000 user manual (INIT).
-    time.sleep(C.INIT_DELAY)
-    GPIO.setmode(GPIO.BCM)
-    spi.open(0, 0)
-    spi.max_speed_hz = 4000000
-    _deviceMode = C.IDLE_MODE
-    GPIO.setup(irq, GPIO.IN, pull_up_down=GPIO.PUD_UP)
-
-    GPIO.add_event_detect(irq, GPIO.RISING, callback=handleInterrupt)
-
-
-def setup(ss):
-    """
-    This function defines the GPIO used for the chip select by configuring it as an output and by setting its initial state at inactive (HIGH).
-    It also clears interrupt configuration and performs a soft reset before applying initial configurations for the chip.
-
-    Args:
-            ss: The GPIO pin number of the chip enable/select for the SPI bus.
-    """
-    global _chipSelect, _syscfg, _sysmask
-    _chipSelect = ss
-    GPIO.setup(_chipSelect, GPIO.OUT)
-    GPIO.output(_chipSelect, GPIO.HIGH)
-
-    enableClock(C.AUTO_CLOCK)
-
-    softReset()
-
-    # Default system configuration
-    setArray(_syscfg, 4, 0x00)
-    setBit(_syscfg, 4, C.DIS_DRXB_BIT, True)
-    setBit(_syscfg, 4, C.HIRQ_POL_BIT, True)
-    writeBytes(C.SYS_CFG, C.NO_SUB, _syscfg, 4)
-
-    # clear interrupts configuration
-    setArray(_sysmask, 4, 0x00)
-    writeBytes(C.SYS_MASK, C.NO_SUB, _sysmask, 4)
-
-    enableClock(C.XTI_CLOCK)
-    manageLDE()
-    enableClock(C.AUTO_CLOCK)
-
-
-def handleInterrupt(channel):
-    """
-    Callback invoked on the rising edge of the interrupt pin. Handle the configured interruptions.
-    """
-    # print("\nInterrupt!")
-    readBytes(C.SYS_STATUS, C.NO_SUB, _sysstatus, 5)
-    # print(_sysstatus)
-    msgReceived = getBit(_sysstatus, 5, C.RXFCG_BIT)
-    receiveTimeStampAvailable = getBit(_sysstatus, 5, C.LDEDONE_BIT)
-    transmitDone = getBit(_sysstatus, 5, C.TXFRS_BIT)
-    if transmitDone:
-        callbacks["handleSent"]()
-        clearTransmitStatus()
-    if receiveTimeStampAvailable:
-        setBit(_sysstatus, 5, C.LDEDONE_BIT, True)
-        writeBytes(C.SYS_STATUS, C.NO_SUB, _sysstatus, 5)
-    if isReceiveFailed():
-        clearReceiveStatus()
-        if _permanentReceive:
-            newReceive()
-            startReceive()
-    elif isReceiveTimeout():
-        clearReceiveStatus()
-        if _permanentReceive:
-            newReceive()
-            startReceive()
-    elif msgReceived:
-        callbacks["handleReceived"]()
-        clearReceiveStatus()                
-        if _permanentReceive:
+    def handleInterrupt(self, channel):
+        """
+        Callback invoked on the rising edge of the interrupt pin. Handle the configured interruptions.
+        SYS_STATUS is read once per pass and decoded without being modified, then every event handled (and any other unmasked one) is
+        cleared with a single write. The passes go on while the interrupt line is still high: an event raised in the meantime (e.g. the
+        next frame of the double buffer) gives no new rising edge.
+        """
+        mask = getTimeStamp(self._sysmask, 0, 4)
+        for _ in range(C.MAX_INTERRUPT_PASSES):
+            self.readBytes(C.SYS_STATUS, C.NO_SUB, self._sysstatus, 5)
+            status = getTimeStamp(self._sysstatus, 0)
+            if not status & mask:
+                return
+            self.dispatchStatus(status, mask)
+            if self._irqLevel is not None and not self._irqLevel(self._irq):
+                return
+
+    def dispatchStatus(self, status, mask):
+        """
+        This function handles the events of a SYS_STATUS value read by handleInterrupt, clears them in one write and restarts the receiver
+        if needed.
+
+        Args:
+                status: The SYS_STATUS value.
+                mask: The SYS_MASK value.
+        """
+        handled = status & mask
+        if status & (1 << C.AAT_BIT):
+            # the chip acknowledges the received frame by itself, the next transmit done event is its acknowledgement
+            self._autoAcks += 1
+        if status & (1 << C.TXFRS_BIT):
+            handled |= C.TX_STATUS_MASK
+            if self._autoAcks:
+                self._autoAcks -= 1
+            else:
+                if self._events is not None:
+                    self.pushEvent(RadioEvent(C.EVENT_SENT, None, self.getTransmitTimestamp(), status, None))
+                if "handleSent" in self.callbacks:
+                    self.callbacks["handleSent"]()
+        restart = False
+        resetReceiver = False
+        releaseBuffer = False
+        if self._doubleBuffered and status & (1 << C.RXOVRR_BIT):
+            # both buffers were full when a frame arrived: the receiver must be reset, see 4.3.3 of the user manual
+            handled |= C.RX_STATUS_MASK
+            restart = resetReceiver = True
+        elif status & C.RX_ERROR_STATUS_MASK:
+            handled |= C.RX_ERROR_STATUS_MASK | C.RX_GOOD_STATUS_MASK
+            restart = self._permanentReceive
+        elif status & C.RX_TIMEOUT_STATUS_MASK:
+            handled |= C.RX_TIMEOUT_STATUS_MASK | C.RX_GOOD_STATUS_MASK
+            restart = self._permanentReceive
+        elif status & (1 << C.RXFCG_BIT):
+            handled |= C.RX_GOOD_STATUS_MASK
+            if self._events is not None:
+                diagnostics = self.readRxDiagnostics(self._readCarrierIntegrator)
+                length = max(diagnostics.frameLength - 2, 0)
+                # a bytearray, decoded in place by DW1000Frame
+                data = self.getData(length, bytearray(length))
+                self.pushEvent(RadioEvent(C.EVENT_RECEIVED, data, self.getReceiveTimestamp(diagnostics), status, diagnostics))
+            if "handleReceived" in self.callbacks:
+                self.callbacks["handleReceived"]()
+            # with the double buffer, the receiver is still on, receiving into the other buffer
+            releaseBuffer = self._doubleBuffered
+
+        self.writeStatus(handled)
+        if restart:
+            self.idle()
+            setArray(self._sysctrl, 4, 0x00)
+            self._deviceMode = C.RX_MODE
+            if resetReceiver:
+                self.resetReceiver()
+            if self._doubleBuffered:
+                self.syncBufferPointers()
+            self.startReceive()
+        elif status & (1 << C.RXFCG_BIT) and not self._doubleBuffered and self._permanentReceive:
             # no need to start a new receive since we enabled the permanent receive mode in the system configuration register. it created an interference causing problem
             # with the reception
             # newReceive()
-            startReceive()
-
-    clearAllStatus()
-
-
-def registerCallback(string, callback):
-    """
-    This function saves the callback sent by the script who imports this module for later use. It stores it in a dictionary with the
-    specified key.
-
-    Args:
-            string: This is the key used to store the callback in the dictionary.
-            callback: This is the saved callback.
-    """
-    global callbacks
-    if callback not in callbacks:
-        callbacks[string] = callback
-
-
-def softReset():
-    """
-    This function performs a soft reset on the DW1000 chip.
-    """
-    pmscctrl0 = [0] * 4
-    readBytes(C.PMSC, C.PMSC_CTRL0_SUB, pmscctrl0, 4)
-    pmscctrl0[0] = C.SOFT_RESET_SYSCLKS
-    writeBytes(C.PMSC, C.PMSC_CTRL0_SUB, pmscctrl0, 4)
-    pmscctrl0[3] = C.SOFT_RESET_CLEAR
-    writeBytes(C.PMSC, C.PMSC_CTRL0_SUB, pmscctrl0, 4)
-    pmscctrl0[0] = C.SOFT_RESET_CLEAR
-    pmscctrl0[3] = C.SOFT_RESET_SET
-    writeBytes(C.PMSC, C.PMSC_CTRL0_SUB, pmscctrl0, 4)
-    idle()
-
-
-def manageLDE():
-    """
-    This function manages the LDE micro-code. It is to setup the power management and system control unit as well as the OTP memory interface. 
-    This is necessary as part of the DW1000 initialisation, since it is important to get timestamp and diagnostic info from received frames.
-    """
-    pmscctrl0 = [None] * 4
-    otpctrl = [None] * 2
-    readBytes(C.PMSC, C.PMSC_CTRL0_SUB, pmscctrl0, 4)
-    readBytes(C.OTP_IF, C.OTP_CTRL_SUB, otpctrl, 2)
+            self.startReceive()
+        if releaseBuffer:
+            # done last: if the other buffer already holds a frame, its events are raised again once the pointer is toggled
+            self.toggleHostBuffer()
+
+    def registerCallback(self, string, callback):
+        """
+        This function saves the callback sent by the script who imports this module for later use. It stores it in a dictionary with the
+        specified key.
+
+        Args:
+                string: This is the key used to store the callback in the dictionary.
+                callback: This is the saved callback.
+        """
+        if callback not in self.callbacks:
+            self.callbacks[string] = callback
+
+    def enableEventQueue(self, size=C.EVENT_QUEUE_SIZE):
+        """
+        This function makes the interrupt handler capture every transmission and reception as a RadioEvent (payload, TX/RX timestamp and
+        status read at interrupt time) in a bounded queue, so no frame is lost or overwritten when several arrive before the main loop
+        polls them. The registered callbacks are still called.
+
+        Args:
+                size: The maximum number of pending events. Events arriving while the queue is full are dropped and counted.
+        """
+        self._eventQueueSize = size
+        self._droppedEvents = 0
+        self._events = deque()
+
+    def pushEvent(self, event):
+        """
+        This function queues an event, or drops it if the queue is full. Only the interrupt handler pushes events, and deque appends and pops
+        are atomic, so the queue needs no lock between the interrupt thread and the main loop.
+
+        Args:
+                event: The RadioEvent to queue.
+        """
+        if len(self._events) >= self._eventQueueSize:
+            self._droppedEvents += 1
+        else:
+            self._events.append(event)
+            self._eventSignal.set()
+
+    def pollEvent(self, timeout=0):
+        """
+        This function returns the oldest pending event. With a timeout, it blocks until an event is queued by the interrupt handler, so a
+        main loop does not spin while the radio is idle.
+
+        Args:
+                timeout: The maximum waiting time in seconds, 0 to return at once.
+
+        Returns:
+                The RadioEvent, or None if no event is pending.
+        """
+        if not self._events and timeout:
+            # cleared before checking the queue again: an event pushed in between is either seen or sets the signal
+            self._eventSignal.clear()
+            if not self._events:
+                self._eventSignal.wait(timeout)
+        if not self._events:
+            return None
+        return self._events.popleft()
+
+    def getDroppedEventCount(self):
+        """
+        This function returns the number of events dropped because the queue was full, since the queue was enabled.
+        """
+        return self._droppedEvents
+
+    def enableReplyDelayTuning(self, lateProbability=C.LATE_TX_PROBABILITY, window=C.LATENCY_WINDOW):
+        """
+        This function makes startTransmit() measure the latency of the replies scheduled with transmitAt(): the time elapsed between their
+        origin (e.g. the reception of the message they answer) and the start command, read from SYS_TIME. getReplyDelay() then returns the
+        smallest reply delay a reply would very likely not miss on this host.
+
+        Args:
+                lateProbability: The accepted probability of a late transmission.
+                window: The number of latest latencies the reply delay is computed from.
+        """
+        self._lateProbability = lateProbability
+        self._latencies = deque(maxlen=window)
+
+    def getReplyDelay(self, default, unit=C.MICROSECONDS):
+        """
+        This function returns the reply delay to pass to transmitAt(): the latency exceeded with the accepted probability, see
+        enableReplyDelayTuning(), plus C.REPLY_DELAY_MARGIN microseconds. The default delay is returned until C.LATENCY_MIN_SAMPLES
+        latencies are measured, and is never exceeded since it is the one the other devices expect.
+
+        Args:
+                default: The configured reply delay.
+                unit: The unit of both delays, see setDelay().
+
+        Returns:
+                The reply delay.
+        """
+        if self._latencies is None or len(self._latencies) < C.LATENCY_MIN_SAMPLES:
+            return default
+        latencies = sorted(self._latencies)
+        index = max(int(math.ceil((1 - self._lateProbability) * len(latencies))) - 1, 0)
+        delay = latencies[index] * C.TIME_RES + C.REPLY_DELAY_MARGIN
+        return min(delay / unit, default)
+
+    def getLateTransmitCount(self):
+        """
+        This function returns the number of delayed transmissions aborted because they were late, see startTransmit().
+        """
+        return self._lateTransmits
+
+    def softReset(self):
+        """
+        This function performs a soft reset on the DW1000 chip. The reset runs on the crystal clock, at the SPI clock frequency of
+        lowerSpiSpeed(), and the frequency given to setSpiSpeed() is restored once the PLL has locked again.
+        """
+        pmscctrl0 = [0] * 4
+        self.readBytes(C.PMSC, C.PMSC_CTRL0_SUB, pmscctrl0, 4)
+        pmscctrl0[0] = C.SOFT_RESET_SYSCLKS
+        self.writeBytes(C.PMSC, C.PMSC_CTRL0_SUB, pmscctrl0, 4)
+        self.lowerSpiSpeed()
+        pmscctrl0[3] = C.SOFT_RESET_CLEAR
+        self.writeBytes(C.PMSC, C.PMSC_CTRL0_SUB, pmscctrl0, 4)
+        pmscctrl0[0] = C.SOFT_RESET_CLEAR
+        pmscctrl0[3] = C.SOFT_RESET_SET
+        self.writeBytes(C.PMSC, C.PMSC_CTRL0_SUB, pmscctrl0, 4)
+        self.idle()
+        if self._fastSpeed is not None:
+            self.setSpiSpeed(self._fastSpeed)
+
+    def manageLDE(self):
+        """
+        This function manages the LDE micro-code. It is to setup the power management and system control unit as well as the OTP memory interface. 
+        This is necessary as part of the DW1000 initialisation, since it is important to get timestamp and diagnostic info from received frames.
+        """
+        pmscctrl0 = [None] * 4
+        otpctrl = [None] * 2
+        self.readBytes(C.PMSC, C.PMSC_CTRL0_SUB, pmscctrl0, 4)
+        self.readBytes(C.OTP_IF, C.OTP_CTRL_SUB, otpctrl, 2)
+
+        pmscctrl0[0] = C.LDE_L1STEP1
+        pmscctrl0[1] = C.LDE_L1STEP2
+        otpctrl[0] = C.LDE_L2STEP1
+        otpctrl[1] = C.LDE_L2STEP2
+
+        self.writeBytes(C.PMSC, C.PMSC_CTRL0_SUB, pmscctrl0, 2)
+        self.writeBytes(C.OTP_IF, C.OTP_CTRL_SUB, otpctrl, 2)
+
+        # wait 150 us before writing the 0x36:00 sub-register, see 2.5.5.10 of the DW1000 user manual.
+        time.sleep(C.PMSC_CONFIG_DELAY)
+
+        pmscctrl0[0] = C.LDE_L3STEP1
+        pmscctrl0[1] = C.LDE_L3STEP2
+
+        self.writeBytes(C.PMSC, C.PMSC_CTRL0_SUB, pmscctrl0, 2)
+
+    def setDefaultConfiguration(self):
+        """
+        This function sets the default mode on the chip initialization : MODE_LONGDATA_RANGE_LOWPOWER and with receive/transmit mask activated when in IDLE mode.
+        """
+        if (self._deviceMode == C.TX_MODE):
+            pass
+        elif self._deviceMode == C.RX_MODE:
+            pass
+        elif self._deviceMode == C.IDLE_MODE:
+            self._syscfg[2] &= C.ENABLE_MODE_MASK2
+            self._syscfg[2] |= 0x00
+            
+            setBit(self._syscfg, 4, C.DIS_STXP_BIT, True)
+            setBit(self._syscfg, 4, C.FFEN_BIT, False)
+            
+            # interrupt on sent
+            setBit(self._sysmask, 4, C.MTXFRS_BIT, True)
+            # interrupt on received
+            setBit(self._sysmask, 4, C.MRXDFR_BIT, True)
+            setBit(self._sysmask, 4, C.MRXFCG_BIT, True)
+            # interrupt on received failed
+            setBit(self._sysmask, 4, C.MLDEERR_BIT, True)
+            setBit(self._sysmask, 4, C.MRXFCE_BIT, True)
+            setBit(self._sysmask, 4, C.MRXPHE_BIT, True)
+            setBit(self._sysmask, 4, C.MRXRFSL_BIT, True)
+            # interrupt on receive time stamp available
+            setBit(self._sysmask, 4, C.MLDEDONE_BIT, False)
+            # interrupt on auto acknowledge trigger
+            setBit(self._sysmask, 4, C.MAAT_BIT, True)
+            # set receiver auto reenable
+            setBit(self._syscfg, 4, C.RXAUTR_BIT,  True)
+
+            self.clearAllStatus()
+
+            self.enableMode(C.MODE_LONGDATA_FAST_ACCURACY)
+
+    def enableMode(self, mode):
+        """
+        This function configures the DW1000 chip to perform with a specific mode. It sets up the TRX rate the TX pulse frequency and the preamble length.
+        """
+
+        # setDataRate
+        rate = mode[0]
+        rate = rate & C.MASK_LS_2BITS
+        self._txfctrl[1] = self._txfctrl[1] & C.ENABLE_MODE_MASK1
+        self._txfctrl[1] = self._txfctrl[1] | ((rate << 5) & C.MASK_LS_BYTE)
+        if rate == C.TRX_RATE_110KBPS:
+            setBit(self._syscfg, 4, C.RXM110K_BIT, True)
+        else:
+            setBit(self._syscfg, 4, C.RXM110K_BIT, False)
 
-    pmscctrl0[0] = C.LDE_L1STEP1
-    pmscctrl0[1] = C.LDE_L1STEP2
-    otpctrl[0] = C.LDE_L2STEP1
-    otpctrl[1] = C.LDE_L2STEP2
+        if rate == C.TRX_RATE_6800KBPS:
+            setBit(self._chanctrl, 4, C.DWSFD_BIT, False)
+            setBit(self._chanctrl, 4, C.TNSSFD_BIT, False)
+            setBit(self._chanctrl, 4, C.RNSSFD_BIT, False)
+        else:
+            setBit(self._chanctrl, 4, C.DWSFD_BIT, True)
+            setBit(self._chanctrl, 4, C.TNSSFD_BIT, True)
+            setBit(self._chanctrl, 4, C.RNSSFD_BIT, True)
+        if rate == C.TRX_RATE_850KBPS:
+            sfdLength = [C.SFD_LENGTH_850KBPS]
+        elif rate == C.TRX_RATE_6800KBPS:
+            sfdLength = [C.SFD_LENGTH_6800KBPS]
+        else:
+            sfdLength = [C.SFD_LENGTH_OTHER]
+        self.writeBytes(C.USR_SFD, C.SFD_LENGTH_SUB, sfdLength, 1)
+        self._operationMode[C.DATA_RATE_BIT] = rate
+
+        # setPulseFreq
+        freq = mode[1]
+        freq = freq & C.MASK_LS_2BITS
+        self._txfctrl[2] = self._txfctrl[2] & C.ENABLE_MODE_MASK2
+        self._txfctrl[2] = self._txfctrl[2] | (freq & C.MASK_LS_BYTE)
+        self._chanctrl[2] = self._chanctrl[2] & C.ENABLE_MODE_MASK3
+        self._chanctrl[2] = self._chanctrl[2] | ((freq << 2) & C.MASK_LS_BYTE)
+        self._operationMode[C.PULSE_FREQUENCY_BIT] = freq
+
+        # setPreambleLength
+        prealen = mode[2]
+        prealen = prealen & C.MASK_NIBBLE
+        self._txfctrl[2] = self._txfctrl[2] & C.ENABLE_MODE_MASK4
+        self._txfctrl[2] = self._txfctrl[2] | ((prealen << 2) & C.MASK_LS_BYTE)
+        if (prealen == C.TX_PREAMBLE_LEN_64 or prealen == C.TX_PREAMBLE_LEN_128):
+            self._operationMode[C.PAC_SIZE_BIT] = C.PAC_SIZE_8
+        elif (prealen == C.TX_PREAMBLE_LEN_256 or prealen == C.TX_PREAMBLE_LEN_512):
+            self._operationMode[C.PAC_SIZE_BIT] = C.PAC_SIZE_16
+        elif (prealen == C.TX_PREAMBLE_LEN_1024):
+            self._operationMode[C.PAC_SIZE_BIT] = C.PAC_SIZE_32
+        else:
+            self._operationMode[C.PAC_SIZE_BIT] = C.PAC_SIZE_64
+        self._operationMode[C.PREAMBLE_LENGTH_BIT] = prealen
 
-    writeBytes(C.PMSC, C.PMSC_CTRL0_SUB, pmscctrl0, 2)
-    writeBytes(C.OTP_IF, C.OTP_CTRL_SUB, otpctrl, 2)
+        # setChannel
+        self.setChannel(C.CHANNEL_5)
 
-    # wait 150 us before writing the 0x36:00 sub-register, see 2.5.5.10 of the DW1000 user manual.
-    time.sleep(C.PMSC_CONFIG_DELAY)
+        # setPreambleCode
+        if mode[1] == C.TX_PULSE_FREQ_16MHZ:
+            self.setPreambleCode(C.PREAMBLE_CODE_16MHZ_4)
+        else:
+            self.setPreambleCode(C.PREAMBLE_CODE_64MHZ_10)
+
+    def newConfiguration(self):
+        """
+        This function resets the DW1000 chip to the idle state mode and reads all the configuration registers to prepare for a new configuration.
+        """
+        self.idle()
+        self.readBytes(C.PANADR, C.NO_SUB, self._networkAndAddress, 4)
+        self.readBytes(C.SYS_CFG, C.NO_SUB, self._syscfg, 4)
+        self.readBytes(C.CHAN_CTRL, C.NO_SUB, self._chanctrl, 4)
+        self.readBytes(C.TX_FCTRL, C.NO_SUB, self._txfctrl, 5)
+        self.readBytes(C.SYS_MASK, C.NO_SUB, self._sysmask, 4)
+
+    def commitConfiguration(self):
+        """
+        This function commits the configuration stored in the arrays previously filled. It writes into the corresponding registers to apply the changes to the DW1000 chip.
+        It also tunes the chip according to the current enabled mode.
+        """
+        self.writeBytes(C.PANADR, C.NO_SUB, self._networkAndAddress, 4)
+        self.writeBytes(C.SYS_CFG, C.NO_SUB, self._syscfg, 4)
+        self.writeBytes(C.CHAN_CTRL, C.NO_SUB, self._chanctrl, 4)
+        self.writeBytes(C.TX_FCTRL, C.NO_SUB, self._txfctrl, 5)
+        self.writeBytes(C.SYS_MASK, C.NO_SUB, self._sysmask, 4)
+
+        self.tune()
+
+    def setAntennaDelay(self, val):
+        """
+        This function sets the DW1000 chip's antenna delay value which needs to be calibrated to have better ranging accuracy.
+
+        Args:
+                val : The antenna delay value which will be configured into the chip.
+        """
+        self._antennaDelay = val
+        antennaDelayBytes = [None] * 5
+        writeValueToBytes(antennaDelayBytes, val, 5)
+        self.writeBytes(C.TX_ANTD, C.NO_SUB, antennaDelayBytes, 2)
+        self.writeBytes(C.LDE_CTRL, C.LDE_RXANTD_SUB, antennaDelayBytes, 2)
+
+    def setEUI(self, currentAddress):
+        """
+        This function sets the extended unique identifier of the chip according to the value specified by the user in setup.
+
+        Args:
+                currentAddress : the array of bytes containing the EUI
+        """
+        reverseEUI = [0] * 8
+        for i in range(0, 8):
+            reverseEUI[i] = currentAddress[8 - i - 1]
+        self.writeBytes(C.EUI, C.NO_SUB, reverseEUI, 8)
+
+    def setDeviceAddress(self, value):
+        """
+        This function sets the device's address according to the specified value.
+
+        Args:
+                value : The address you want to set to the chip.
+        """
+        self._networkAndAddress[0] = value & C.MASK_LS_BYTE
+        self._networkAndAddress[1] = (value >> 8) & C.MASK_LS_BYTE
+
+    def getDeviceAddress(self):
+        """
+        This function returns the device's short address, as set by setDeviceAddress().
+
+        Returns:
+                The 16 bits short address.
+        """
+        return (self._networkAndAddress[1] << 8) | self._networkAndAddress[0]
+
+    def setNetworkId(self, value):
+        """
+        This function sets the device's network ID according to the specified value.
+
+        Args:
+                value : The network id you want to assign to the chip.
+        """
+        self._networkAndAddress[2] = value & C.MASK_LS_BYTE
+        self._networkAndAddress[3] = (value >> 8) & C.MASK_LS_BYTE
+
+    def setChannel(self, channel):
+        """
+        This function configures the DW1000 chip to enable a the specified channel of operation.
+
+        Args:
+                channel : The channel value you want to assign to the chip.
+        """
+        channel = channel & C.MASK_NIBBLE
+        self._chanctrl[0] = ((channel | (channel << 4)) & C.MASK_LS_BYTE)
+        self._operationMode[C.CHANNEL_BIT] = channel
+        self._rangeBiasTable = buildRangeBiasTable(channel, self._operationMode[C.PULSE_FREQUENCY_BIT])
+
+    def setPreambleCode(self, preacode):
+        """
+        This function sets the preamble code used for the frames, depending on the the pulse repetition frequency and the channel used.
+
+        Args:
+                 preacode : The preamble code type you want to assign to the chip.
+        """
+        preacode = preacode & C.PREACODE_MASK1
+        self._chanctrl[2] = self._chanctrl[2] & C.PREACODE_MASK2
+        self._chanctrl[2] = self._chanctrl[2] | ((preacode << 6) & C.MASK_LS_BYTE)
+        self._chanctrl[3] = 0x00
+        self._chanctrl[3] = ((((preacode >> 2) & C.PREACODE_MASK3) |
+                         (preacode << 3)) & C.MASK_LS_BYTE)
+        self._operationMode[C.PREAMBLE_CODE_BIT] = preacode
+
+    def tune(self):
+        """
+        This function tunes/configures dw1000 chip's registers according to the enabled mode. Although the DW1000 will power up in a usable mode for the default configuration,
+        some of the register defaults are sub optimal and should be overwritten before using the chip in the default mode. See 2.5.5 of the user manual.
+        """
+        agctune1 = [None] * 2
+        agctune2 = [None] * 4
+        agctune3 = [None] * 2
+        drxtune0b = [None] * 2
+        drxtune1a = [None] * 2
+        drxtune1b = [None] * 2
+        drxtune2 = [None] * 4
+        drxtune4H = [None] * 2
+        rfrxctrlh = [None] * 1
+        rftxctrl = [None] * 4
+        tcpgdelay = [None] * 1
+        fspllcfg = [None] * 4
+        fsplltune = [None] * 1
+        ldecfg1 = [None] * 1
+        ldecfg2 = [None] * 2
+        lderepc = [None] * 2
+        txpower = [None] * 4
+        fsxtalt = [None] * 1
+        preambleLength = self._operationMode[C.PREAMBLE_LENGTH_BIT]
+        channel = self._operationMode[C.CHANNEL_BIT]
+
+        self.tuneAgcTune1(agctune1)
+        writeValueToBytes(agctune2, C.AGC_TUNE2_OP, 4)
+        writeValueToBytes(agctune3, C.AGC_TUNE3_OP, 2)
+        self.tuneDrxTune0b(drxtune0b)
+        self.tuneDrxTune1aAndldecfg2(drxtune1a, ldecfg2)
+        self.tuneDrxtune1b(drxtune1b)
+        self.tuneDrxTune2(drxtune2)
+
+        if preambleLength == C.TX_PREAMBLE_LEN_64:
+            writeValueToBytes(drxtune4H, C.DRX_TUNE4H_64, 2)
+        else:
+            writeValueToBytes(drxtune4H, C.DRX_TUNE4H_128, 2)
 
-    pmscctrl0[0] = C.LDE_L3STEP1
-    pmscctrl0[1] = C.LDE_L3STEP2
+        if (channel != C.CHANNEL_4 and channel != C.CHANNEL_7):
+            writeValueToBytes(rfrxctrlh, C.RF_RXCTRLH_1235, 1)
+        else:
+            writeValueToBytes(rfrxctrlh, C.RF_RXCTRLH_147, 1)
 
-    writeBytes(C.PMSC, C.PMSC_CTRL0_SUB, pmscctrl0, 2)
+        self.tuneAccToChan(rftxctrl, tcpgdelay, fspllcfg, fsplltune, txpower)
 
+        writeValueToBytes(ldecfg1, C.LDE_CFG1_OP, 1)
+        self.tunelderepc(lderepc)
 
-def setDefaultConfiguration():
-    """
-    This function sets the default mode on the chip initialization : MODE_LONGDATA_RANGE_LOWPOWER and with receive/transmit mask activated when in IDLE mode.
-    """
-    global _syscfg, _sysmask
-    if (_deviceMode == C.TX_MODE):
-        pass
-    elif _deviceMode == C.RX_MODE:
-        pass
-    elif _deviceMode == C.IDLE_MODE:
-        _syscfg[2] &= C.ENABLE_MODE_MASK2
-        _syscfg[2] |= 0x00
-        
-        setBit(_syscfg, 4, C.DIS_STXP_BIT, True)
-        setBit(_syscfg, 4, C.FFEN_BIT, False)
+        buf_otp = [None] * 4
+        buf_otp = self.readBytesOTP(C.OTP_XTAL_ADDRESS, buf_otp)
+        if buf_otp[0] == 0:
+            writeValueToBytes(
+                fsxtalt, ((C.TUNE_OPERATION & C.TUNE_MASK1) | C.TUNE_MASK2), 1)
+        else:
+            writeValueToBytes(
+                fsxtalt, ((buf_otp[0] & C.TUNE_MASK1) | C.TUNE_MASK2), 1)
+
+        self.writeBytes(C.AGC_CTRL, C.AGC_TUNE1_SUB, agctune1, 2)
+        self.writeBytes(C.AGC_CTRL, C.AGC_TUNE2_SUB, agctune2, 4)
+        self.writeBytes(C.AGC_CTRL, C.AGC_TUNE3_SUB, agctune3, 2)
+        self.writeBytes(C.DRX_CONF, C.DRX_TUNE0b_SUB, drxtune0b, 2)
+        self.writeBytes(C.DRX_CONF, C.DRX_TUNE1a_SUB, drxtune1a, 2)
+        self.writeBytes(C.DRX_CONF, C.DRX_TUNE1b_SUB, drxtune1b, 2)
+        self.writeBytes(C.DRX_CONF, C.DRX_TUNE2_SUB, drxtune2, 4)
+        self.writeBytes(C.DRX_CONF, C.DRX_TUNE4H_SUB, drxtune4H, 2)
+        self.writeBytes(C.LDE_CTRL, C.LDE_CFG1_SUB, ldecfg1, 1)
+        self.writeBytes(C.LDE_CTRL, C.LDE_CFG2_SUB, ldecfg2, 2)
+        self.writeBytes(C.LDE_CTRL, C.LDE_REPC_SUB, lderepc, 2)
+        self.writeBytes(C.TX_POWER, C.NO_SUB, txpower, 4)
+        self.writeBytes(C.RF_CONF, C.RF_RXCTRLH_SUB, rfrxctrlh, 1)
+        self.writeBytes(C.RF_CONF, C.RF_TXCTRL_SUB, rftxctrl, 4)
+        self.writeBytes(C.TX_CAL, C.TC_PGDELAY_SUB, tcpgdelay, 1)
+        self.writeBytes(C.FS_CTRL, C.FS_PLLTUNE_SUB, fsplltune, 1)
+        self.writeBytes(C.FS_CTRL, C.FS_PLLCFG_SUB, fspllcfg, 4)
+        self.writeBytes(C.FS_CTRL, C.FS_XTALT_SUB, fsxtalt, 1)
+
+    def generalConfiguration(self, address, mode, shortAddress=None, panId=C.PAN_ID):
+        """
+        This function configures the DW1000 chip with general settings. It also defines the address and the network ID used by the device. It finally prints the
+        configured device.
+
+        Args:
+                address: The string address you want to set the device to.
+                mode: The operation mode, one of the C.MODE_* arrays.
+                shortAddress: The 16 bits short address of the device, a random one if None.
+                panId: The 16 bits network ID (PAN ID) of the device.
+        """
+        currentAddress = convertStringToByte(address)
+        self.setEUI(currentAddress)
+        if shortAddress is None:
+            currentShortAddress = [0] * 2
+            currentShortAddress[0] = randint(0, 255)
+            currentShortAddress[1] = randint(0, 255)
+            deviceAddress = currentShortAddress[0] * 256 + currentShortAddress[1]
+        else:
+            deviceAddress = shortAddress
         
-        # interrupt on sent
-        setBit(_sysmask, 4, C.MTXFRS_BIT, True)
-        # interrupt on received
-        setBit(_sysmask, 4, C.MRXDFR_BIT, True)
-        setBit(_sysmask, 4, C.MRXFCG_BIT, True)
-        # interrupt on received failed
-        setBit(_sysmask, 4, C.MLDEERR_BIT, True)
-        setBit(_sysmask, 4, C.MRXFCE_BIT, True)
-        setBit(_sysmask, 4, C.MRXPHE_BIT, True)
-        setBit(_sysmask, 4, C.MRXRFSL_BIT, True)
-        # interrupt on receive time stamp available
-        setBit(_sysmask, 4, C.MLDEDONE_BIT, False)
-        # interrupt on auto acknowledge trigger
-        setBit(_sysmask, 4, C.MAAT_BIT, True)
-        # set receiver auto reenable
-        setBit(_syscfg, 4, C.RXAUTR_BIT,  True)
-
-        clearAllStatus()
-
-        enableMode(C.MODE_LONGDATA_FAST_ACCURACY)
-
-
-def enableMode(mode):
-    """
-    This function configures the DW1000 chip to perform with a specific mode. It sets up the TRX rate the TX pulse frequency and the preamble length.
-    """
-    global _txfctrl, _chanctrl, _operationMode
-
-    # setDataRate
-    rate = mode[0]
-    rate = rate & C.MASK_LS_2BITS
-    _txfctrl[1] = _txfctrl[1] & C.ENABLE_MODE_MASK1
-    _txfctrl[1] = _txfctrl[1] | ((rate << 5) & C.MASK_LS_BYTE)
-    if rate == C.TRX_RATE_110KBPS:
-        setBit(_syscfg, 4, C.RXM110K_BIT, True)
-    else:
-        setBit(_syscfg, 4, C.RXM110K_BIT, False)
-
-    if rate == C.TRX_RATE_6800KBPS:
-        setBit(_chanctrl, 4, C.DWSFD_BIT, False)
-        setBit(_chanctrl, 4, C.TNSSFD_BIT, False)
-        setBit(_chanctrl, 4, C.RNSSFD_BIT, False)
-    else:
-        setBit(_chanctrl, 4, C.DWSFD_BIT, True)
-        setBit(_chanctrl, 4, C.TNSSFD_BIT, True)
-        setBit(_chanctrl, 4, C.RNSSFD_BIT, True)
-    if rate == C.TRX_RATE_850KBPS:
-        sfdLength = [C.SFD_LENGTH_850KBPS]
-    elif rate == C.TRX_RATE_6800KBPS:
-        sfdLength = [C.SFD_LENGTH_6800KBPS]
-    else:
-        sfdLength = [C.SFD_LENGTH_OTHER]
-    writeBytes(C.USR_SFD, C.SFD_LENGTH_SUB, sfdLength, 1)
-    _operationMode[C.DATA_RATE_BIT] = rate
-
-    # setPulseFreq
-    freq = mode[1]
-    freq = freq & C.MASK_LS_2BITS
-    _txfctrl[2] = _txfctrl[2] & C.ENABLE_MODE_MASK2
-    _txfctrl[2] = _txfctrl[2] | (freq & C.MASK_LS_BYTE)
-    _chanctrl[2] = _chanctrl[2] & C.ENABLE_MODE_MASK3
-    _chanctrl[2] = _chanctrl[2] | ((freq << 2) & C.MASK_LS_BYTE)
-    _operationMode[C.PULSE_FREQUENCY_BIT] = freq
-
-    # setPreambleLength
-    prealen = mode[2]
-    prealen = prealen & C.MASK_NIBBLE
-    _txfctrl[2] = _txfctrl[2] & C.ENABLE_MODE_MASK4
-    _txfctrl[2] = _txfctrl[2] | ((prealen << 2) & C.MASK_LS_BYTE)
-    if (prealen == C.TX_PREAMBLE_LEN_64 or prealen == C.TX_PREAMBLE_LEN_128):
-        _operationMode[C.PAC_SIZE_BIT] = C.PAC_SIZE_8
-    elif (prealen == C.TX_PREAMBLE_LEN_256 or prealen == C.TX_PREAMBLE_LEN_512):
-        _operationMode[C.PAC_SIZE_BIT] = C.PAC_SIZE_16
-    elif (prealen == C.TX_PREAMBLE_LEN_1024):
-        _operationMode[C.PAC_SIZE_BIT] = C.PAC_SIZE_32
-    else:
-        _operationMode[C.PAC_SIZE_BIT] = C.PAC_SIZE_64
-    _operationMode[C.PREAMBLE_LENGTH_BIT] = prealen
-
-    # setChannel
-    setChannel(C.CHANNEL_5)
-
-    # setPreambleCode
-    if mode[1] == C.TX_PULSE_FREQ_16MHZ:
-        setPreambleCode(C.PREAMBLE_CODE_16MHZ_4)
-    else:
-        setPreambleCode(C.PREAMBLE_CODE_64MHZ_10)
-
-
-def newConfiguration():
-    """
-    This function resets the DW1000 chip to the idle state mode and reads all the configuration registers to prepare for a new configuration.
-    """
-    idle()
-    readBytes(C.PANADR, C.NO_SUB, _networkAndAddress, 4)
-    readBytes(C.SYS_CFG, C.NO_SUB, _syscfg, 4)
-    readBytes(C.CHAN_CTRL, C.NO_SUB, _chanctrl, 4)
-    readBytes(C.TX_FCTRL, C.NO_SUB, _txfctrl, 5)
-    readBytes(C.SYS_MASK, C.NO_SUB, _sysmask, 4)
-
-
-def commitConfiguration():
-    """
-    This function commits the configuration stored in the arrays previously filled. It writes into the corresponding registers to apply the changes to the DW1000 chip.
-    It also tunes the chip according to the current enabled mode.
-    """
-    writeBytes(C.PANADR, C.NO_SUB, _networkAndAddress, 4)
-    writeBytes(C.SYS_CFG, C.NO_SUB, _syscfg, 4)
-    writeBytes(C.CHAN_CTRL, C.NO_SUB, _chanctrl, 4)
-    writeBytes(C.TX_FCTRL, C.NO_SUB, _txfctrl, 5)
-    writeBytes(C.SYS_MASK, C.NO_SUB, _sysmask, 4)
-
-    tune()
-
-
-def setAntennaDelay(val):
-    """
-    This function sets the DW1000 chip's antenna delay value which needs to be calibrated to have better ranging accuracy.
-
-    Args:
-            val : The antenna delay value which will be configured into the chip.
-    """
-    antennaDelayBytes = [None] * 5
-    writeValueToBytes(antennaDelayBytes, val, 5)
-    writeBytes(C.TX_ANTD, C.NO_SUB, antennaDelayBytes, 2)
-    writeBytes(C.LDE_CTRL, C.LDE_RXANTD_SUB, antennaDelayBytes, 2)
-
-
-def setEUI(currentAddress):
-    """
-    This function sets the extended unique identifier of the chip according to the value specified by the user in setup.
-
-    Args:
-            currentAddress : the array of bytes containing the EUI
-    """
-    reverseEUI = [0] * 8
-    for i in range(0, 8):
-        reverseEUI[i] = currentAddress[8 - i - 1]
-    writeBytes(C.EUI, C.NO_SUB, reverseEUI, 8)
-
-
-def setDeviceAddress(value):
-    """
-    This function sets the device's address according to the specified value.
-
-    Args:
-            value : The address you want to set to the chip.
-    """
-    global _networkAndAddress
-    _networkAndAddress[0] = value & C.MASK_LS_BYTE
-    _networkAndAddress[1] = (value >> 8) & C.MASK_LS_BYTE
-
-
-def setNetworkId(value):
-    """
-    This function sets the device's network ID according to the specified value.
-
-    Args:
-            value : The network id you want to assign to the chip.
-    """
-    global _networkAndAddress
-    _networkAndAddress[2] = value & C.MASK_LS_BYTE
-    _networkAndAddress[3] = (value >> 8) & C.MASK_LS_BYTE
-
-
-def setChannel(channel):
-    """
-    This function configures the DW1000 chip to enable a the specified channel of operation.
-
-    Args:
-            channel : The channel value you want to assign to the chip.
-    """
-    global _operationMode, _chanctrl
-    channel = channel & C.MASK_NIBBLE
-    _chanctrl[0] = ((channel | (channel << 4)) & C.MASK_LS_BYTE)
-    _operationMode[C.CHANNEL_BIT] = channel
-
-
-def setPreambleCode(preacode):
-    """
-    This function sets the preamble code used for the frames, depending on the the pulse repetition frequency and the channel used.
-
-    Args:
-             preacode : The preamble code type you want to assign to the chip.
-    """
-    global _chanctrl, _operationMode
-    preacode = preacode & C.PREACODE_MASK1
-    _chanctrl[2] = _chanctrl[2] & C.PREACODE_MASK2
-    _chanctrl[2] = _chanctrl[2] | ((preacode << 6) & C.MASK_LS_BYTE)
-    _chanctrl[3] = 0x00
-    _chanctrl[3] = ((((preacode >> 2) & C.PREACODE_MASK3) |
-                     (preacode << 3)) & C.MASK_LS_BYTE)
-    _operationMode[C.PREAMBLE_CODE_BIT] = preacode
-
-
-def tune():
-    """
-    This function tunes/configures dw1000 chip's registers according to the enabled mode. Although the DW1000 will power up in a usable mode for the default configuration,
-    some of the register defaults are sub optimal and should be overwritten before using the chip in the default mode. See 2.5.5 of the user manual.
-    """
-    agctune1 = [None] * 2
-    agctune2 = [None] * 4
-    agctune3 = [None] * 2
-    drxtune0b = [None] * 2
-    drxtune1a = [None] * 2
-    drxtune1b = [None] * 2
-    drxtune2 = [None] * 4
-    drxtune4H = [None] * 2
-    rfrxctrlh = [None] * 1
-    rftxctrl = [None] * 4
-    tcpgdelay = [None] * 1
-    fspllcfg = [None] * 4
-    fsplltune = [None] * 1
-    ldecfg1 = [None] * 1
-    ldecfg2 = [None] * 2
-    lderepc = [None] * 2
-    txpower = [None] * 4
-    fsxtalt = [None] * 1
-    preambleLength = _operationMode[C.PREAMBLE_LENGTH_BIT]
-    channel = _operationMode[C.CHANNEL_BIT]
-
-    tuneAgcTune1(agctune1)
-    writeValueToBytes(agctune2, C.AGC_TUNE2_OP, 4)
-    writeValueToBytes(agctune3, C.AGC_TUNE3_OP, 2)
-    tuneDrxTune0b(drxtune0b)
-    tuneDrxTune1aAndldecfg2(drxtune1a, ldecfg2)
-    tuneDrxtune1b(drxtune1b)
-    tuneDrxTune2(drxtune2)
-
-    if preambleLength == C.TX_PREAMBLE_LEN_64:
-        writeValueToBytes(drxtune4H, C.DRX_TUNE4H_64, 2)
-    else:
-        writeValueToBytes(drxtune4H, C.DRX_TUNE4H_128, 2)
-
-    if (channel != C.CHANNEL_4 and channel != C.CHANNEL_7):
-        writeValueToBytes(rfrxctrlh, C.RF_RXCTRLH_1235, 1)
-    else:
-        writeValueToBytes(rfrxctrlh, C.RF_RXCTRLH_147, 1)
-
-    tuneAccToChan(rftxctrl, tcpgdelay, fspllcfg, fsplltune, txpower)
-
-    writeValueToBytes(ldecfg1, C.LDE_CFG1_OP, 1)
-    tunelderepc(lderepc)
-
-    buf_otp = [None] * 4
-    buf_otp = readBytesOTP(C.OTP_XTAL_ADDRESS, buf_otp)
-    if buf_otp[0] == 0:
-        writeValueToBytes(
-            fsxtalt, ((C.TUNE_OPERATION & C.TUNE_MASK1) | C.TUNE_MASK2), 1)
-    else:
-        writeValueToBytes(
-            fsxtalt, ((buf_otp[0] & C.TUNE_MASK1) | C.TUNE_MASK2), 1)
-
-    writeBytes(C.AGC_CTRL, C.AGC_TUNE1_SUB, agctune1, 2)
-    writeBytes(C.AGC_CTRL, C.AGC_TUNE2_SUB, agctune2, 4)
-    writeBytes(C.AGC_CTRL, C.AGC_TUNE3_SUB, agctune3, 2)
-    writeBytes(C.DRX_CONF, C.DRX_TUNE0b_SUB, drxtune0b, 2)
-    writeBytes(C.DRX_CONF, C.DRX_TUNE1a_SUB, drxtune1a, 2)
-    writeBytes(C.DRX_CONF, C.DRX_TUNE1b_SUB, drxtune1b, 2)
-    writeBytes(C.DRX_CONF, C.DRX_TUNE2_SUB, drxtune2, 4)
-    writeBytes(C.DRX_CONF, C.DRX_TUNE4H_SUB, drxtune4H, 2)
-    writeBytes(C.LDE_CTRL, C.LDE_CFG1_SUB, ldecfg1, 1)
-    writeBytes(C.LDE_CTRL, C.LDE_CFG2_SUB, ldecfg2, 2)
-    writeBytes(C.LDE_CTRL, C.LDE_REPC_SUB, lderepc, 2)
-    writeBytes(C.TX_POWER, C.NO_SUB, txpower, 4)
-    writeBytes(C.RF_CONF, C.RF_RXCTRLH_SUB, rfrxctrlh, 1)
-    writeBytes(C.RF_CONF, C.RF_TXCTRL_SUB, rftxctrl, 4)
-    writeBytes(C.TX_CAL, C.TC_PGDELAY_SUB, tcpgdelay, 1)
-    writeBytes(C.FS_CTRL, C.FS_PLLTUNE_SUB, fsplltune, 1)
-    writeBytes(C.FS_CTRL, C.FS_PLLCFG_SUB, fspllcfg, 4)
-    writeBytes(C.FS_CTRL, C.FS_XTALT_SUB, fsxtalt, 1)
-
-
-def generalConfiguration(address, mode):
-    """
-    This function configures the DW1000 chip with general settings. It also defines the address and the network ID used by the device. It finally prints the
-    configured device.
-
-    Args:
-            address: The string address you want to set the device to.
-    """
-    currentAddress = convertStringToByte(address)
-    currentShortAddress = [0] * 2
-    setEUI(currentAddress)
-    currentShortAddress[0] = randint(0, 256)
-    currentShortAddress[1] = randint(0, 256)
-    deviceAddress = currentShortAddress[0] * 256 + currentShortAddress[1]
-    
-    # configure mode, network
-    newConfiguration()
-    setDefaultConfiguration()
-    # setDeviceAddress(2)
-    setDeviceAddress(deviceAddress)
-    # setNetworkId(10)
-    setNetworkId(0xDECA)
-    enableMode(mode)
-    setAntennaDelay(C.ANTENNA_DELAY)
-    commitConfiguration()
-
-
-    data = [0] * 4
-    data2 = [0] * 8
-    data3 = [0] * 4
-    readBytes(C.DEV_ID, C.NO_SUB, data, 4)
-    readBytes(C.EUI, C.NO_SUB, data2, 8)
-    readBytes(C.PANADR, C.NO_SUB, data3, 4)
-
-    print("\nDevice ID %02X - model: %d, version: %d, revision: %d" %
-          ((data[3] << 8) | data[2], (data[1]), (data[0] >> 4) & C.MASK_NIBBLE, data[0] & C.MASK_NIBBLE))
-    print("Unique ID: %02X:%02X:%02X:%02X:%02X:%02X:%02X:%02X" % (
-        data2[7], data2[6], data2[5], data2[4], data2[3], data2[2], data2[1], data2[0]))
-    print("Network ID & Device Address: PAN: %02X, Short Address: %02X" %
-          (((data3[3] << 8) | data3[2]), ((data3[1] << 8) | data3[0])))
-    getDeviceModeInfo()
-
-
-"""
-Tuning functions
-See tune() for more information
-"""
-
-
-def tuneAgcTune1(data):
-    """
-    This function fills the array for the tuning of agctune1 according to the datasheet and the enabled mode.
-
-    Args:
-            data: The array which will store the correct values for agctune1.
-
-    """
-    pulseFrequency = _operationMode[C.PULSE_FREQUENCY_BIT]
-    if pulseFrequency == C.TX_PULSE_FREQ_16MHZ:
-        writeValueToBytes(data, C.AGC_TUNE1_16MHZ_OP, 2)
-    elif pulseFrequency == C.TX_PULSE_FREQ_64MHZ:
-        writeValueToBytes(data, C.AGC_TUNE1_DEFAULT_OP, 2)
-
-
-def tuneDrxTune0b(data):
-    """
-    This function fills the array for the tuning of drxtune0b according to the datasheet and the enabled mode.
-
-    Args:
-            data: The array which will store the correct values for drxtune0b.
-    """
-    dataRate = _operationMode[C.DATA_RATE_BIT]
-    if dataRate == C.TRX_RATE_110KBPS:
-        writeValueToBytes(data, C.DRX_TUNE0b_110KBPS_NOSTD_OP, 2)
-    elif dataRate == C.TRX_RATE_850KBPS:
-        writeValueToBytes(data, C.DRX_TUNE0b_850KBPS_NOSTD_OP, 2)
-    elif dataRate == C.TRX_RATE_6800KBPS:
-        writeValueToBytes(data, C.DRX_TUNE0b_6800KBPS_STD_OP, 2)
-
-
-def tuneDrxTune1aAndldecfg2(data, data2):
-    """
-    This function fills the array for the tuning of drxtune1a and ldecfg2 according to the datasheet and the enabled mode.
-
-    Args:
-            data: The array which will store the correct values for the drxtune1a.    
-            data2: The array which will store the correct values for ldecfg2.    
-    """
-    pulseFrequency = _operationMode[C.PULSE_FREQUENCY_BIT]
-    if pulseFrequency == C.TX_PULSE_FREQ_16MHZ:
-        writeValueToBytes(data, C.DRX_TUNE1a_16MHZ_OP, 2)
-        writeValueToBytes(data2, C.LDE_CFG2_16MHZ_OP, 2)
-    elif pulseFrequency == C.TX_PULSE_FREQ_64MHZ:
-        writeValueToBytes(data, C.DRX_TUNE1a_64MHZ_OP, 2)
-        writeValueToBytes(data2, C.LDE_CFG2_64MHZ_OP, 2)
-
-
-def tuneDrxtune1b(data):
-    """
-    This function fills the array for the tuning of drxtune1b according to the datasheet and the enabled mode.
-
-    Args:
-            data: The array which will store the correct values for drxtune1b.    
-    """
-    dataRate = _operationMode[C.DATA_RATE_BIT]
-    preambleLength = _operationMode[C.PREAMBLE_LENGTH_BIT]
-    if (preambleLength == C.TX_PREAMBLE_LEN_1536 or preambleLength == C.TX_PREAMBLE_LEN_2048 or preambleLength == C.TX_PREAMBLE_LEN_4096):
-        if (dataRate == C.TRX_RATE_110KBPS):
-            writeValueToBytes(data, C.DRX_TUNE1b_M1024, 2)
-    elif preambleLength != C.TX_PREAMBLE_LEN_64:
-        if (dataRate == C.TRX_RATE_850KBPS or dataRate == C.TRX_RATE_6800KBPS):
-            writeValueToBytes(data, C.DRX_TUNE1b_L1024, 2)
-    else:
-        if dataRate == C.TRX_RATE_6800KBPS:
-            writeValueToBytes(data, C.DRX_TUNE1b_64, 2)
-
-
-def tuneDrxTune2(data):
-    """
-    This function fills the array for the tuning of drxtune2 according to the datasheet and the enabled mode.
-
-    Args:
-            data: The array which will store the correct values for drxtune2.
-    """
-    pacSize = _operationMode[C.PAC_SIZE_BIT]
-    pulseFrequency = _operationMode[C.PULSE_FREQUENCY_BIT]
-    if pacSize == C.PAC_SIZE_8:
-        if pulseFrequency == C.TX_PULSE_FREQ_16MHZ:
-            writeValueToBytes(data, C.DRX_TUNE2_8_16MHZ, 4)
-        elif pulseFrequency == C.TX_PULSE_FREQ_64MHZ:
-            writeValueToBytes(data, C.DRX_TUNE2_8_64MHZ, 4)
-    elif pacSize == C.PAC_SIZE_16:
-        if pulseFrequency == C.TX_PULSE_FREQ_16MHZ:
-            writeValueToBytes(data, C.DRX_TUNE2_16_16MHZ, 4)
-        elif pulseFrequency == C.TX_PULSE_FREQ_64MHZ:
-            writeValueToBytes(data, C.DRX_TUNE2_16_64MHZ, 4)
-    elif pacSize == C.PAC_SIZE_32:
-        if pulseFrequency == C.TX_PULSE_FREQ_16MHZ:
-            writeValueToBytes(data, C.DRX_TUNE2_32_16MHZ, 4)
-        elif pulseFrequency == C.TX_PULSE_FREQ_64MHZ:
-            writeValueToBytes(data, C.DRX_TUNE2_32_64MHZ, 4)
-    elif pacSize == C.PAC_SIZE_64:
+        # configure mode, network
+        self.newConfiguration()
+        self.setDefaultConfiguration()
+        # setDeviceAddress(2)
+        self.setDeviceAddress(deviceAddress)
+        # setNetworkId(10)
+        self.setNetworkId(panId)
+        self.enableMode(mode)
+        self.setAntennaDelay(C.ANTENNA_DELAY)
+        self.commitConfiguration()
+
+        data = [0] * 4
+        data2 = [0] * 8
+        data3 = [0] * 4
+        self.readBytes(C.DEV_ID, C.NO_SUB, data, 4)
+        self.readBytes(C.EUI, C.NO_SUB, data2, 8)
+        self.readBytes(C.PANADR, C.NO_SUB, data3, 4)
+
+        print("\nDevice ID %02X - model: %d, version: %d, revision: %d" %
+              ((data[3] << 8) | data[2], (data[1]), (data[0] >> 4) & C.MASK_NIBBLE, data[0] & C.MASK_NIBBLE))
+        print("Unique ID: %02X:%02X:%02X:%02X:%02X:%02X:%02X:%02X" % (
+            data2[7], data2[6], data2[5], data2[4], data2[3], data2[2], data2[1], data2[0]))
+        print("Network ID & Device Address: PAN: %02X, Short Address: %02X" %
+              (((data3[3] << 8) | data3[2]), ((data3[1] << 8) | data3[0])))
+        self.getDeviceModeInfo()
+
+    """
+    Tuning functions
+    See tune() for more information
+    """
+
+    def tuneAgcTune1(self, data):
+        """
+        This function fills the array for the tuning of agctune1 according to the datasheet and the enabled mode.
+
+        Args:
+                data: The array which will store the correct values for agctune1.
+
+        """
+        pulseFrequency = self._operationMode[C.PULSE_FREQUENCY_BIT]
         if pulseFrequency == C.TX_PULSE_FREQ_16MHZ:
-            writeValueToBytes(data, C.DRX_TUNE2_64_16MHZ, 4)
+            writeValueToBytes(data, C.AGC_TUNE1_16MHZ_OP, 2)
         elif pulseFrequency == C.TX_PULSE_FREQ_64MHZ:
-            writeValueToBytes(data, C.DRX_TUNE2_64_64MHZ, 4)
+            writeValueToBytes(data, C.AGC_TUNE1_DEFAULT_OP, 2)
 
+    def tuneDrxTune0b(self, data):
+        """
+        This function fills the array for the tuning of drxtune0b according to the datasheet and the enabled mode.
 
-def tuneAccToChan(rftxctrl, tcpgdelay, fspllcfg, fsplltune, txpower):
-    """
-    This function fills the arrays for the tuning of rftxctrl, tcpgdelay, fspllcfg, fsplltune and txpower according to the datasheet and the enabled mode.
-    """
-    channel = _operationMode[C.CHANNEL_BIT]
-    pulseFrequency = _operationMode[C.PULSE_FREQUENCY_BIT]
-    if channel == C.CHANNEL_1:
-        writeValueToBytes(rftxctrl, C.RF_TXCTRL_1, 4)
-        writeValueToBytes(tcpgdelay, C.TC_PGDELAY_1, 1)
-        writeValueToBytes(fspllcfg, C.FS_PLLCFG_1, 4)
-        writeValueToBytes(fsplltune, C.FS_PLLTUNE_1, 1)
-        if pulseFrequency == C.TX_PULSE_FREQ_16MHZ:
-            writeValueToBytes(txpower, C.TX_POWER_12_16MHZ, 4)
-        elif pulseFrequency == C.TX_PULSE_FREQ_64MHZ:
-            writeValueToBytes(txpower, C.TX_POWER_12_64MHZ, 4)
-    elif channel == C.CHANNEL_2:
-        writeValueToBytes(rftxctrl, C.RF_TXCTRL_2, 4)
-        writeValueToBytes(tcpgdelay, C.TC_PGDELAY_2, 1)
-        writeValueToBytes(fspllcfg, C.FS_PLLCFG_24, 4)
-        writeValueToBytes(fsplltune, C.FS_PLLTUNE_24, 1)
-        if pulseFrequency == C.TX_PULSE_FREQ_16MHZ:
-            writeValueToBytes(txpower, C.TX_POWER_12_16MHZ, 4)
-        elif pulseFrequency == C.TX_PULSE_FREQ_64MHZ:
-            writeValueToBytes(txpower, C.TX_POWER_12_64MHZ, 4)
-    elif channel == C.CHANNEL_3:
-        writeValueToBytes(rftxctrl, C.RF_TXCTRL_3, 4)
-        writeValueToBytes(tcpgdelay, C.TC_PGDELAY_3, 1)
-        writeValueToBytes(fspllcfg, C.FS_PLLCFG_3, 4)
-        writeValueToBytes(fsplltune, C.FS_PLLTUNE_3, 1)
-        if pulseFrequency == C.TX_PULSE_FREQ_16MHZ:
-            writeValueToBytes(txpower, C.TX_POWER_3_16MHZ, 4)
-        elif pulseFrequency == C.TX_PULSE_FREQ_64MHZ:
-            writeValueToBytes(txpower, C.TX_POWER_3_64MHZ, 4)
-    elif channel == C.CHANNEL_4:
-        writeValueToBytes(rftxctrl, C.RF_TXCTRL_4, 4)
-        writeValueToBytes(tcpgdelay, C.TC_PGDELAY_4, 1)
-        writeValueToBytes(fspllcfg, C.FS_PLLCFG_24, 4)
-        writeValueToBytes(fsplltune, C.FS_PLLTUNE_24, 1)
-        if pulseFrequency == C.TX_PULSE_FREQ_16MHZ:
-            writeValueToBytes(txpower, C.TX_POWER_4_16MHZ, 4)
-        elif pulseFrequency == C.TX_PULSE_FREQ_64MHZ:
-            writeValueToBytes(txpower, C.TX_POWER_4_64MHZ, 4)
-    elif channel == C.CHANNEL_5:
-        writeValueToBytes(rftxctrl, C.RF_TXCTRL_5, 4)
-        writeValueToBytes(tcpgdelay, C.TC_PGDELAY_5, 1)
-        writeValueToBytes(fspllcfg, C.FS_PLLCFG_57, 4)
-        writeValueToBytes(fsplltune, C.FS_PLLTUNE_57, 1)
-        if pulseFrequency == C.TX_PULSE_FREQ_16MHZ:
-            writeValueToBytes(txpower, C.TX_POWER_5_16MHZ, 4)
-        elif pulseFrequency == C.TX_PULSE_FREQ_64MHZ:
-            writeValueToBytes(txpower, C.TX_POWER_5_64MHZ, 4)
-    elif channel == C.CHANNEL_7:
-        writeValueToBytes(rftxctrl, C.RF_TXCTRL_7, 4)
-        writeValueToBytes(tcpgdelay, C.TC_PGDELAY_7, 1)
-        writeValueToBytes(fspllcfg, C.FS_PLLCFG_57, 4)
-        writeValueToBytes(fsplltune, C.FS_PLLTUNE_57, 1)
+        Args:
+                data: The array which will store the correct values for drxtune0b.
+        """
+        dataRate = self._operationMode[C.DATA_RATE_BIT]
+        if dataRate == C.TRX_RATE_110KBPS:
+            writeValueToBytes(data, C.DRX_TUNE0b_110KBPS_NOSTD_OP, 2)
+        elif dataRate == C.TRX_RATE_850KBPS:
+            writeValueToBytes(data, C.DRX_TUNE0b_850KBPS_NOSTD_OP, 2)
+        elif dataRate == C.TRX_RATE_6800KBPS:
+            writeValueToBytes(data, C.DRX_TUNE0b_6800KBPS_STD_OP, 2)
+
+    def tuneDrxTune1aAndldecfg2(self, data, data2):
+        """
+        This function fills the array for the tuning of drxtune1a and ldecfg2 according to the datasheet and the enabled mode.
+
+        Args:
+                data: The array which will store the correct values for the drxtune1a.    
+                data2: The array which will store the correct values for ldecfg2.    
+        """
+        pulseFrequency = self._operationMode[C.PULSE_FREQUENCY_BIT]
         if pulseFrequency == C.TX_PULSE_FREQ_16MHZ:
-            writeValueToBytes(txpower, C.TX_POWER_7_16MHZ, 4)
+            writeValueToBytes(data, C.DRX_TUNE1a_16MHZ_OP, 2)
+            writeValueToBytes(data2, C.LDE_CFG2_16MHZ_OP, 2)
         elif pulseFrequency == C.TX_PULSE_FREQ_64MHZ:
-            writeValueToBytes(txpower, C.TX_POWER_7_64MHZ, 4)
-
-
-def tunelderepc(data):
-    """
-    This function fills the arrays for the tuning of lderepc according to the datasheet and the enabled mode.
-
-    Args:
-            data: The array which will store the correct values for lderepC.
-    """
-    preacode = _operationMode[C.PREAMBLE_CODE_BIT]
-    dataRate = _operationMode[C.DATA_RATE_BIT]
-    if (preacode == C.PREAMBLE_CODE_16MHZ_1 or preacode == C.PREAMBLE_CODE_16MHZ_2):
-        if dataRate == C.TRX_RATE_110KBPS:
-            writeValueToBytes(
-                data, ((C.LDE_REPC_1AND2 >> 3) & C.MASK_LS_2BYTES), 2)
-        else:
-            writeValueToBytes(data, C.LDE_REPC_1AND2, 2)
-    elif (preacode == C.PREAMBLE_CODE_16MHZ_3 or preacode == C.PREAMBLE_CODE_16MHZ_8):
-        if dataRate == C.TRX_RATE_110KBPS:
-            writeValueToBytes(
-                data, ((C.LDE_REPC_3AND8 >> 3) & C.MASK_LS_2BYTES), 2)
-        else:
-            writeValueToBytes(data, C.LDE_REPC_3, 2)
-    elif preacode == C.PREAMBLE_CODE_16MHZ_4:
-        if dataRate == C.TRX_RATE_110KBPS:
-            writeValueToBytes(
-                data, ((C.LDE_REPC_4 >> 3) & C.MASK_LS_2BYTES), 2)
-        else:
-            writeValueToBytes(data, C.LDE_REPC_4, 2)
-    elif preacode == C.PREAMBLE_CODE_16MHZ_5:
-        if dataRate == C.TRX_RATE_110KBPS:
-            writeValueToBytes(
-                data, ((C.LDE_REPC_5 >> 3) & C.MASK_LS_2BYTES), 2)
-        else:
-            writeValueToBytes(data, C.LDE_REPC_5, 2)
-    elif preacode == C.PREAMBLE_CODE_16MHZ_6:
-        if dataRate == C.TRX_RATE_110KBPS:
-            writeValueToBytes(
-                data, ((C.LDE_REPC_6 >> 3) & C.MASK_LS_2BYTES), 2)
+            writeValueToBytes(data, C.DRX_TUNE1a_64MHZ_OP, 2)
+            writeValueToBytes(data2, C.LDE_CFG2_64MHZ_OP, 2)
+
+    def tuneDrxtune1b(self, data):
+        """
+        This function fills the array for the tuning of drxtune1b according to the datasheet and the enabled mode.
+
+        Args:
+                data: The array which will store the correct values for drxtune1b.    
+        """
+        dataRate = self._operationMode[C.DATA_RATE_BIT]
+        preambleLength = self._operationMode[C.PREAMBLE_LENGTH_BIT]
+        if (preambleLength == C.TX_PREAMBLE_LEN_1536 or preambleLength == C.TX_PREAMBLE_LEN_2048 or preambleLength == C.TX_PREAMBLE_LEN_4096):
+            if (dataRate == C.TRX_RATE_110KBPS):
+                writeValueToBytes(data, C.DRX_TUNE1b_M1024, 2)
+        elif preambleLength != C.TX_PREAMBLE_LEN_64:
+            if (dataRate == C.TRX_RATE_850KBPS or dataRate == C.TRX_RATE_6800KBPS):
+                writeValueToBytes(data, C.DRX_TUNE1b_L1024, 2)
         else:
-            writeValueToBytes(data, C.LDE_REPC_6, 2)
-    elif preacode == C.PREAMBLE_CODE_16MHZ_7:
-        if dataRate == C.TRX_RATE_110KBPS:
-            writeValueToBytes(
-                data, ((C.LDE_REPC_7 >> 3) & C.MASK_LS_2BYTES), 2)
-        else:
-            writeValueToBytes(data, C.LDE_REPC_7, 2)
-    elif preacode == C.PREAMBLE_CODE_64MHZ_9:
-        if dataRate == C.TRX_RATE_110KBPS:
-            writeValueToBytes(
-                data, ((C.LDE_REPC_9 >> 3) & C.MASK_LS_2BYTES), 2)
+            if dataRate == C.TRX_RATE_6800KBPS:
+                writeValueToBytes(data, C.DRX_TUNE1b_64, 2)
+
+    def tuneDrxTune2(self, data):
+        """
+        This function fills the array for the tuning of drxtune2 according to the datasheet and the enabled mode.
+
+        Args:
+                data: The array which will store the correct values for drxtune2.
+        """
+        pacSize = self._operationMode[C.PAC_SIZE_BIT]
+        pulseFrequency = self._operationMode[C.PULSE_FREQUENCY_BIT]
+        if pacSize == C.PAC_SIZE_8:
+            if pulseFrequency == C.TX_PULSE_FREQ_16MHZ:
+                writeValueToBytes(data, C.DRX_TUNE2_8_16MHZ, 4)
+            elif pulseFrequency == C.TX_PULSE_FREQ_64MHZ:
+                writeValueToBytes(data, C.DRX_TUNE2_8_64MHZ, 4)
+        elif pacSize == C.PAC_SIZE_16:
+            if pulseFrequency == C.TX_PULSE_FREQ_16MHZ:
+                writeValueToBytes(data, C.DRX_TUNE2_16_16MHZ, 4)
+            elif pulseFrequency == C.TX_PULSE_FREQ_64MHZ:
+                writeValueToBytes(data, C.DRX_TUNE2_16_64MHZ, 4)
+        elif pacSize == C.PAC_SIZE_32:
+            if pulseFrequency == C.TX_PULSE_FREQ_16MHZ:
+                writeValueToBytes(data, C.DRX_TUNE2_32_16MHZ, 4)
+            elif pulseFrequency == C.TX_PULSE_FREQ_64MHZ:
+                writeValueToBytes(data, C.DRX_TUNE2_32_64MHZ, 4)
+        elif pacSize == C.PAC_SIZE_64:
+            if pulseFrequency == C.TX_PULSE_FREQ_16MHZ:
+                writeValueToBytes(data, C.DRX_TUNE2_64_16MHZ, 4)
+            elif pulseFrequency == C.TX_PULSE_FREQ_64MHZ:
+                writeValueToBytes(data, C.DRX_TUNE2_64_64MHZ, 4)
+
+    def tuneAccToChan(self, rftxctrl, tcpgdelay, fspllcfg, fsplltune, txpower):
+        """
+        This function fills the arrays for the tuning of rftxctrl, tcpgdelay, fspllcfg, fsplltune and txpower according to the datasheet and the enabled mode.
+        """
+        channel = self._operationMode[C.CHANNEL_BIT]
+        pulseFrequency = self._operationMode[C.PULSE_FREQUENCY_BIT]
+        if channel == C.CHANNEL_1:
+            writeValueToBytes(rftxctrl, C.RF_TXCTRL_1, 4)
+            writeValueToBytes(tcpgdelay, C.TC_PGDELAY_1, 1)
+            writeValueToBytes(fspllcfg, C.FS_PLLCFG_1, 4)
+            writeValueToBytes(fsplltune, C.FS_PLLTUNE_1, 1)
+            if pulseFrequency == C.TX_PULSE_FREQ_16MHZ:
+                writeValueToBytes(txpower, C.TX_POWER_12_16MHZ, 4)
+            elif pulseFrequency == C.TX_PULSE_FREQ_64MHZ:
+                writeValueToBytes(txpower, C.TX_POWER_12_64MHZ, 4)
+        elif channel == C.CHANNEL_2:
+            writeValueToBytes(rftxctrl, C.RF_TXCTRL_2, 4)
+            writeValueToBytes(tcpgdelay, C.TC_PGDELAY_2, 1)
+            writeValueToBytes(fspllcfg, C.FS_PLLCFG_24, 4)
+            writeValueToBytes(fsplltune, C.FS_PLLTUNE_24, 1)
+            if pulseFrequency == C.TX_PULSE_FREQ_16MHZ:
+                writeValueToBytes(txpower, C.TX_POWER_12_16MHZ, 4)
+            elif pulseFrequency == C.TX_PULSE_FREQ_64MHZ:
+                writeValueToBytes(txpower, C.TX_POWER_12_64MHZ, 4)
+        elif channel == C.CHANNEL_3:
+            writeValueToBytes(rftxctrl, C.RF_TXCTRL_3, 4)
+            writeValueToBytes(tcpgdelay, C.TC_PGDELAY_3, 1)
+            writeValueToBytes(fspllcfg, C.FS_PLLCFG_3, 4)
+            writeValueToBytes(fsplltune, C.FS_PLLTUNE_3, 1)
+            if pulseFrequency == C.TX_PULSE_FREQ_16MHZ:
+                writeValueToBytes(txpower, C.TX_POWER_3_16MHZ, 4)
+            elif pulseFrequency == C.TX_PULSE_FREQ_64MHZ:
+                writeValueToBytes(txpower, C.TX_POWER_3_64MHZ, 4)
+        elif channel == C.CHANNEL_4:
+            writeValueToBytes(rftxctrl, C.RF_TXCTRL_4, 4)
+            writeValueToBytes(tcpgdelay, C.TC_PGDELAY_4, 1)
+            writeValueToBytes(fspllcfg, C.FS_PLLCFG_24, 4)
+            writeValueToBytes(fsplltune, C.FS_PLLTUNE_24, 1)
+            if pulseFrequency == C.TX_PULSE_FREQ_16MHZ:
+                writeValueToBytes(txpower, C.TX_POWER_4_16MHZ, 4)
+            elif pulseFrequency == C.TX_PULSE_FREQ_64MHZ:
+                writeValueToBytes(txpower, C.TX_POWER_4_64MHZ, 4)
+        elif channel == C.CHANNEL_5:
+            writeValueToBytes(rftxctrl, C.RF_TXCTRL_5, 4)
+            writeValueToBytes(tcpgdelay, C.TC_PGDELAY_5, 1)
+            writeValueToBytes(fspllcfg, C.FS_PLLCFG_57, 4)
+            writeValueToBytes(fsplltune, C.FS_PLLTUNE_57, 1)
+            if pulseFrequency == C.TX_PULSE_FREQ_16MHZ:
+                writeValueToBytes(txpower, C.TX_POWER_5_16MHZ, 4)
+            elif pulseFrequency == C.TX_PULSE_FREQ_64MHZ:
+                writeValueToBytes(txpower, C.TX_POWER_5_64MHZ, 4)
+        elif channel == C.CHANNEL_7:
+            writeValueToBytes(rftxctrl, C.RF_TXCTRL_7, 4)
+            writeValueToBytes(tcpgdelay, C.TC_PGDELAY_7, 1)
+            writeValueToBytes(fspllcfg, C.FS_PLLCFG_57, 4)
+            writeValueToBytes(fsplltune, C.FS_PLLTUNE_57, 1)
+            if pulseFrequency == C.TX_PULSE_FREQ_16MHZ:
+                writeValueToBytes(txpower, C.TX_POWER_7_16MHZ, 4)
+            elif pulseFrequency == C.TX_PULSE_FREQ_64MHZ:
+                writeValueToBytes(txpower, C.TX_POWER_7_64MHZ, 4)
+
+    def tunelderepc(self, data):
+        """
+        This function fills the arrays for the tuning of lderepc according to the datasheet and the enabled mode.
+
+        Args:
+                data: The array which will store the correct values for lderepC.
+        """
+        preacode = self._operationMode[C.PREAMBLE_CODE_BIT]
+        dataRate = self._operationMode[C.DATA_RATE_BIT]
+        if (preacode == C.PREAMBLE_CODE_16MHZ_1 or preacode == C.PREAMBLE_CODE_16MHZ_2):
+            if dataRate == C.TRX_RATE_110KBPS:
+                writeValueToBytes(
+                    data, ((C.LDE_REPC_1AND2 >> 3) & C.MASK_LS_2BYTES), 2)
+            else:
+                writeValueToBytes(data, C.LDE_REPC_1AND2, 2)
+        elif (preacode == C.PREAMBLE_CODE_16MHZ_3 or preacode == C.PREAMBLE_CODE_16MHZ_8):
+            if dataRate == C.TRX_RATE_110KBPS:
+                writeValueToBytes(
+                    data, ((C.LDE_REPC_3AND8 >> 3) & C.MASK_LS_2BYTES), 2)
+            else:
+                writeValueToBytes(data, C.LDE_REPC_3, 2)
+        elif preacode == C.PREAMBLE_CODE_16MHZ_4:
+            if dataRate == C.TRX_RATE_110KBPS:
+                writeValueToBytes(
+                    data, ((C.LDE_REPC_4 >> 3) & C.MASK_LS_2BYTES), 2)
+            else:
+                writeValueToBytes(data, C.LDE_REPC_4, 2)
+        elif preacode == C.PREAMBLE_CODE_16MHZ_5:
+            if dataRate == C.TRX_RATE_110KBPS:
+                writeValueToBytes(
+                    data, ((C.LDE_REPC_5 >> 3) & C.MASK_LS_2BYTES), 2)
+            else:
+                writeValueToBytes(data, C.LDE_REPC_5, 2)
+        elif preacode == C.PREAMBLE_CODE_16MHZ_6:
+            if dataRate == C.TRX_RATE_110KBPS:
+                writeValueToBytes(
+                    data, ((C.LDE_REPC_6 >> 3) & C.MASK_LS_2BYTES), 2)
+            else:
+                writeValueToBytes(data, C.LDE_REPC_6, 2)
+        elif preacode == C.PREAMBLE_CODE_16MHZ_7:
+            if dataRate == C.TRX_RATE_110KBPS:
+                writeValueToBytes(
+                    data, ((C.LDE_REPC_7 >> 3) & C.MASK_LS_2BYTES), 2)
+            else:
+                writeValueToBytes(data, C.LDE_REPC_7, 2)
+        elif preacode == C.PREAMBLE_CODE_64MHZ_9:
+            if dataRate == C.TRX_RATE_110KBPS:
+                writeValueToBytes(
+                    data, ((C.LDE_REPC_9 >> 3) & C.MASK_LS_2BYTES), 2)
+            else:
+                writeValueToBytes(data, C.LDE_REPC_9, 2)
+        elif (preacode == C.PREAMBLE_CODE_64MHZ_10 or preacode == C.PREAMBLE_CODE_64MHZ_17):
+            if dataRate == C.TRX_RATE_110KBPS:
+                writeValueToBytes(
+                    data, ((C.LDE_REPC_1017 >> 3) & C.MASK_LS_2BYTES), 2)
+            else:
+                writeValueToBytes(data, C.LDE_REPC_1017, 2)
+        elif preacode == C.PREAMBLE_CODE_64MHZ_11:
+            if dataRate == C.TRX_RATE_110KBPS:
+                writeValueToBytes(
+                    data, ((C.LDE_REPC_111321 >> 3) & C.MASK_LS_2BYTES), 2)
+            else:
+                writeValueToBytes(data, C.LDE_REPC_111321, 2)
+        elif preacode == C.PREAMBLE_CODE_64MHZ_12:
+            if dataRate == C.TRX_RATE_110KBPS:
+                writeValueToBytes(
+                    data, ((C.LDE_REPC_12 >> 3) & C.MASK_LS_2BYTES), 2)
+            else:
+                writeValueToBytes(data, C.LDE_REPC_12, 2)
+        elif preacode == C.PREAMBLE_CODE_64MHZ_18 or preacode == C.PREAMBLE_CODE_64MHZ_19:
+            if dataRate == C.TRX_RATE_110KBPS:
+                writeValueToBytes(
+                    data, ((C.LDE_REPC_14161819 >> 3) & C.MASK_LS_2BYTES), 2)
+            else:
+                writeValueToBytes(data, C.LDE_REPC_14161819, 2)
+        elif preacode == C.PREAMBLE_CODE_64MHZ_20:
+            if dataRate == C.TRX_RATE_110KBPS:
+                writeValueToBytes(
+                    data, ((C.LDE_REPC_20 >> 3) & C.MASK_LS_2BYTES), 2)
+            else:
+                writeValueToBytes(data, C.LDE_REPC_20, 2)
+
+    def enableClock(self, clock):
+        """
+        This function manages the dw1000 chip's clock by setting up the proper registers to activate the specified clock mode chosen.
+        The SPI clock frequency follows: it is lowered on XTI_CLOCK, see lowerSpiSpeed(), and the one given to setSpiSpeed() is restored on
+        AUTO_CLOCK once the PLL is locked.
+
+        Args:
+                clock: An hex value corresponding to the clock mode wanted:
+                    AUTO=0x00
+                    XTI=0x01
+                    PLL=0X02.
+        """
+        pmscctrl0 = [None] * 4
+        self.readBytes(C.PMSC, C.PMSC_CTRL0_SUB, pmscctrl0, 4)
+        if clock == C.AUTO_CLOCK:
+            pmscctrl0[0] = C.AUTO_CLOCK
+            pmscctrl0[1] = pmscctrl0[1] & C.ENABLE_CLOCK_MASK1
+        elif clock == C.XTI_CLOCK:
+            pmscctrl0[0] = pmscctrl0[0] & C.ENABLE_CLOCK_MASK2
+            pmscctrl0[0] = pmscctrl0[0] | 1
+        self.writeBytes(C.PMSC, C.PMSC_CTRL0_SUB, pmscctrl0, 2)
+        if clock == C.XTI_CLOCK:
+            self.lowerSpiSpeed()
+        elif clock == C.AUTO_CLOCK and self._fastSpeed is not None:
+            self.setSpiSpeed(self._fastSpeed)
+
+    def idle(self):
+        """
+        This function puts the chip into idle mode.
+        """
+        setArray(self._sysctrl, 4, 0x00)
+        setBit(self._sysctrl, 4, C.TRXOFF_BIT, True)
+        self._deviceMode = C.IDLE_MODE
+        self.writeBytes(C.SYS_CTRL, C.NO_SUB, self._sysctrl, 4)
+
+    """
+    Message reception functions.
+    """
+
+    def newReceive(self):
+        """
+        This function prepares the chip for a new reception. It clears the system control register and also clear the RX latched bits in the SYS_STATUS register.
+        """
+        self.idle()
+        setArray(self._sysctrl, 4, 0x00)
+        self.clearReceiveStatus()
+        self._deviceMode = C.RX_MODE
+
+    def startReceive(self):
+        """
+        This function configures the chip to start the reception of a message sent by another DW1000 chip. 
+        It turns on its receiver by setting RXENAB in the system control register.
+        """
+        setBit(self._sysctrl, 4, C.SFCST_BIT, False)
+        setBit(self._sysctrl, 4, C.RXENAB_BIT, True)
+        self.writeBytes(C.SYS_CTRL, C.NO_SUB, self._sysctrl, 4)
+
+    def receivePermanently(self):
+        """
+        This function configures the dw1000 chip to receive data permanently. 
+        """
+        self._permanentReceive = True
+        setBit(self._syscfg, 4, C.RXAUTR_BIT, True)
+        self.writeBytes(C.SYS_CFG, C.NO_SUB, self._syscfg, 4)
+
+    def enableDoubleBuffer(self, enabled=True):
+        """
+        This function enables or disables the double buffered reception, see 4.3 of the user manual. When enabled, the receiver stays on and
+        stores the next frame in the second buffer while the host reads the first one (getData, readRxDiagnostics, getReceiveTimestamp
+        read the host side buffer). The interrupt handler gives each buffer back to the chip once its frame has been handled.
+        Call it after generalConfiguration().
+
+        Args:
+                enabled: True to use both receive buffers.
+        """
+        self._doubleBuffered = enabled
+        setBit(self._syscfg, 4, C.DIS_DRXB_BIT, not enabled)
+        self.writeBytes(C.SYS_CFG, C.NO_SUB, self._syscfg, 4)
+        self.readBytes(C.SYS_MASK, C.NO_SUB, self._sysmask, 4)
+        setBit(self._sysmask, 4, C.MRXOVRR_BIT, enabled)
+        self.writeBytes(C.SYS_MASK, C.NO_SUB, self._sysmask, 4)
+        if enabled:
+            self.syncBufferPointers()
+
+    def enableFrameFiltering(self, enabled=True, frameTypes=(C.FRAME_TYPE_DATA,), coordinator=False):
+        """
+        This function enables or disables the frame filtering of the receiver, see 5.2 of the user manual. When enabled, the chip drops without
+        any interrupt the frames of the other networks (PAN ID, see generalConfiguration), the ones addressed to other devices (short address
+        or EUI) and the frame types which are not accepted. Only valid IEEE 802.15.4 frames (e.g. DW1000Frame) get through: the TDoA blinks
+        and sync beacons are raw payloads and would be dropped.
+        Call it after generalConfiguration().
+
+        Args:
+                enabled: True to filter the received frames.
+                frameTypes: The accepted frame types, C.FRAME_TYPE_*.
+                coordinator: True to also accept the frames without destination address, as a PAN coordinator.
+        """
+        setBit(self._syscfg, 4, C.FFEN_BIT, enabled)
+        setBit(self._syscfg, 4, C.FFBC_BIT, enabled and coordinator)
+        for frameType in (C.FRAME_TYPE_BEACON, C.FRAME_TYPE_DATA, C.FRAME_TYPE_ACK, C.FRAME_TYPE_MAC_COMMAND):
+            setBit(self._syscfg, 4, C.FFAB_BIT + frameType, enabled and frameType in frameTypes)
+        if not enabled:
+            # the acknowledgements rely on the filtering
+            setBit(self._syscfg, 4, C.AUTOACK_BIT, False)
+        self.writeBytes(C.SYS_CFG, C.NO_SUB, self._syscfg, 4)
+
+    def enableAutoAck(self, enabled=True, turnaround=C.ACK_TURNAROUND):
+        """
+        This function enables or disables the automatic acknowledgement, see 5.3 of the user manual: the chip answers the frames requesting
+        an acknowledgement (DW1000Frame.RangingFrame.ackRequest) addressed to it, without the host. The interrupt handler does not report
+        these transmissions as events. It requires the frame filtering, enabled with the data frames if it is not yet.
+        Call it after generalConfiguration().
+
+        Args:
+                enabled: True to acknowledge the frames automatically.
+                turnaround: The delay between the end of the received frame and the acknowledgement, in preamble symbols.
+        """
+        if enabled and not getBit(self._syscfg, 4, C.FFEN_BIT):
+            self.enableFrameFiltering()
+        setBit(self._syscfg, 4, C.AUTOACK_BIT, enabled)
+        self.writeBytes(C.SYS_CFG, C.NO_SUB, self._syscfg, 4)
+        self.writeBytes(C.ACK_RESP_T, C.ACK_TIM_SUB, [turnaround & C.MASK_LS_BYTE], 1)
+
+    def resetReceiver(self):
+        """
+        This function performs a soft reset of the receiver only, which discards the content of the receive buffers.
+        """
+        self.writeBytes(C.PMSC, C.PMSC_SOFTRESET_SUB, [C.SOFT_RESET_RX], 1)
+        self.writeBytes(C.PMSC, C.PMSC_SOFTRESET_SUB, [C.SOFT_RESET_SET], 1)
+
+    def toggleHostBuffer(self):
+        """
+        This function gives the host side receive buffer back to the chip and points the host to the other buffer, by writing the HRBPT bit.
+        """
+        sysctrl = [0] * 4
+        setBit(sysctrl, 4, C.HRBPT_BIT, True)
+        self.writeBytes(C.SYS_CTRL, C.NO_SUB, sysctrl, 4)
+
+    def syncBufferPointers(self):
+        """
+        This function aligns the host side buffer pointer with the chip side one (HSRBP and ICRBP in SYS_STATUS), e.g. after a receiver reset.
+        """
+        statusBytes = [0] * 1
+        self.readBytes(C.SYS_STATUS, 3, statusBytes, 1)
+        hsrbp = (statusBytes[0] >> (C.HSRBP_BIT - 24)) & 0x01
+        icrbp = (statusBytes[0] >> (C.ICRBP_BIT - 24)) & 0x01
+        if hsrbp != icrbp:
+            self.toggleHostBuffer()
+
+    def isReceiveFailed(self):
+        """
+        This function reads the system event status register and checks if the message reception failed. The interrupt handler decodes
+        the status it read instead, see dispatchStatus().
+
+        Returns:
+                True if the reception failed.
+                False otherwise.
+        """
+        return bool(self.readStatus() & C.RX_ERROR_STATUS_MASK)
+
+    def isReceiveTimeout(self):
+        """
+        This function reads the system event status register and checks if there was a timeout in the message reception.
+
+        Returns:
+                True if there was a timeout in the reception.
+                False otherwise.
+        """
+        return bool(self.readStatus() & C.RX_TIMEOUT_STATUS_MASK)
+
+    def readStatus(self):
+        """
+        This function reads the event bits of the system event status register (its first 4 bytes), without changing the status last read
+        by the interrupt handler.
+
+        Returns:
+                The status value.
+        """
+        status = [0] * 4
+        self.readBytes(C.SYS_STATUS, C.NO_SUB, status, 4)
+        return getTimeStamp(status, 0, 4)
+
+    def clearReceiveStatus(self):
+        """
+        This function clears the system event status register at the bits related to the reception of a message.
+        """
+        self.writeStatus(C.RX_GOOD_STATUS_MASK | C.RX_ERROR_STATUS_MASK)
+
+    def writeStatus(self, bits):
+        """
+        This function clears the given bits of the system event status register, the other ones are left untouched (writing 1 clears a bit).
+        Only the bytes holding bits to clear are written.
+
+        Args:
+                bits: The SYS_STATUS bits to clear.
+        """
+        if not bits:
+            return
+        first = 0
+        while not (bits >> (8 * first)) & C.MASK_LS_BYTE:
+            first += 1
+        last = first
+        while bits >> (8 * (last + 1)):
+            last += 1
+        statusBytes = [0] * (last - first + 1)
+        writeValueToBytes(statusBytes, bits >> (8 * first), len(statusBytes))
+        self.writeBytes(C.SYS_STATUS, first, statusBytes, len(statusBytes))
+
+    def readRxDiagnostics(self, carrierIntegrator=False):
+        """
+        This function reads the frame information, the receive timestamp and the frame quality registers of the last reception in three SPI
+        transactions, one per register, so every diagnostic value of a frame can be derived without reading the chip again. The carrier
+        integrator, in another register file, takes a fourth transaction and is only read on request.
+
+        Args:
+                carrierIntegrator: True to read the carrier integrator too, needed by getClockOffset.
+
+        Returns:
+                An RxDiagnostics record to pass to getFirstPathPower, getReceivePower, getReceiveQuality, getReceiveTimestamp and getClockOffset.
+                Its carrierIntegrator is None if it was not read.
+        """
+        rxFrameInfo = bytearray(4)
+        rxTimeBytes = bytearray(9)
+        rxQualityBytes = bytearray(8)
+        self.readBytes(C.RX_FINFO, C.NO_SUB, rxFrameInfo, 4)
+        self.readBytes(C.RX_TIME, C.RX_STAMP_SUB, rxTimeBytes, 9)
+        self.readBytes(C.RX_FQUAL, C.STD_NOISE_SUB, rxQualityBytes, 8)
+        if carrierIntegrator:
+            carrierIntegrator = self.readCarrierIntegrator()
         else:
-            writeValueToBytes(data, C.LDE_REPC_9, 2)
-    elif (preacode == C.PREAMBLE_CODE_64MHZ_10 or preacode == C.PREAMBLE_CODE_64MHZ_17):
-        if dataRate == C.TRX_RATE_110KBPS:
-            writeValueToBytes(
-                data, ((C.LDE_REPC_1017 >> 3) & C.MASK_LS_2BYTES), 2)
+            carrierIntegrator = None
+        frameInfo = getTimeStamp(rxFrameInfo, 0, 4)
+        return RxDiagnostics(
+            frameInfo & C.GET_DATA_MASK,
+            (frameInfo >> 20) & C.RXPACC_MASK,
+            getTimeStamp(rxTimeBytes, C.RX_STAMP_SUB),
+            getTimeStamp(rxTimeBytes, C.FP_AMPL1_SUB, 2),
+            getTimeStamp(rxQualityBytes, C.STD_NOISE_SUB, 2),
+            getTimeStamp(rxQualityBytes, C.FP_AMPL2_SUB, 2),
+            getTimeStamp(rxQualityBytes, C.PP_AMPL3_SUB, 2),
+            getTimeStamp(rxQualityBytes, C.CIR_PWR_SUB, 2),
+            carrierIntegrator)
+
+    def readCarrierIntegrator(self):
+        """
+        This function reads the carrier integrator (DRX_CAR_INT) of the last reception. It measures the frequency offset between the remote
+        transmitter and the local receiver, see getClockOffset.
+
+        Returns:
+                The signed value of the carrier integrator.
+        """
+        carrierIntegratorBytes = [0] * 3
+        self.readBytes(C.DRX_CONF, C.DRX_CAR_INT_SUB, carrierIntegratorBytes, 3)
+        carrierIntegrator = getTimeStamp(carrierIntegratorBytes, 0, 3) & C.DRX_CAR_INT_MASK
+        if carrierIntegrator & C.DRX_CAR_INT_SIGN:
+            carrierIntegrator -= C.DRX_CAR_INT_MASK + 1
+        return carrierIntegrator
+
+    def getClockOffset(self, diagnostics=None):
+        """
+        This function calculates the offset between the clock of the remote transmitter and the local one from the carrier integrator of the
+        last reception, for the current channel and data rate. Multiplied by 1e-6 it can be passed to DW1000Ranging.computeRangeSingleSided.
+
+        Args:
+                diagnostics: The RxDiagnostics of the frame. The carrier integrator is read from the chip if not given or not in it (see
+                             enableClockOffset), it is then the one of the last reception.
+
+        Returns:
+                The clock offset in ppm, positive when the remote clock runs faster than the local one.
+        """
+        if diagnostics is None or diagnostics.carrierIntegrator is None:
+            carrierIntegrator = self.readCarrierIntegrator()
         else:
-            writeValueToBytes(data, C.LDE_REPC_1017, 2)
-    elif preacode == C.PREAMBLE_CODE_64MHZ_11:
-        if dataRate == C.TRX_RATE_110KBPS:
-            writeValueToBytes(
-                data, ((C.LDE_REPC_111321 >> 3) & C.MASK_LS_2BYTES), 2)
+            carrierIntegrator = diagnostics.carrierIntegrator
+        return carrierIntegratorToPpm(carrierIntegrator, self._operationMode[C.CHANNEL_BIT], self._operationMode[C.DATA_RATE_BIT])
+
+    def enableClockOffset(self, enabled=True):
+        """
+        This function makes the interrupt handler read the carrier integrator with the diagnostics of every received frame (a fourth SPI
+        transaction), so getClockOffset works on the events of the queue even once the next frame has been received. Single-sided ranging
+        needs it.
+
+        Args:
+                enabled: True to read the carrier integrator of every frame.
+        """
+        self._readCarrierIntegrator = enabled
+
+    def getFirstPathPower(self, diagnostics=None):
+        """
+        This function calculates an estimate of the power in the first path signal. See section 4.7.1 of the DW1000 user manual for further details on the calculations.
+
+        Args:
+                diagnostics: The RxDiagnostics of the frame, read from the chip if not given.
+
+        Returns:
+                The estimated power in the first path signal.
+        """
+        if diagnostics is None:
+            diagnostics = self.readRxDiagnostics()
+        f1 = float(diagnostics.fpAmpl1)
+        f2 = float(diagnostics.fpAmpl2)
+        f3 = float(diagnostics.fpAmpl3)
+        N = float(diagnostics.preambleCount)
+        if self._operationMode[C.PULSE_FREQUENCY_BIT] == C.TX_PULSE_FREQ_16MHZ:
+            A = C.A_16MHZ
+            corrFac = C.CORRFAC_16MHZ
         else:
-            writeValueToBytes(data, C.LDE_REPC_111321, 2)
-    elif preacode == C.PREAMBLE_CODE_64MHZ_12:
-        if dataRate == C.TRX_RATE_110KBPS:
-            writeValueToBytes(
-                data, ((C.LDE_REPC_12 >> 3) & C.MASK_LS_2BYTES), 2)
+            A = C.A_64MHZ
+            corrFac = C.CORRFAC_64MHZ
+        estFPPower = C.PWR_COEFF2 * \
+            math.log10((f1 * f1 + f2 * f2 + f3 * f3) / (N * N)) - A
+        if estFPPower <= -C.PWR_COEFF:
+            return estFPPower
         else:
-            writeValueToBytes(data, C.LDE_REPC_12, 2)
-    elif preacode == C.PREAMBLE_CODE_64MHZ_18 or preacode == C.PREAMBLE_CODE_64MHZ_19:
-        if dataRate == C.TRX_RATE_110KBPS:
-            writeValueToBytes(
-                data, ((C.LDE_REPC_14161819 >> 3) & C.MASK_LS_2BYTES), 2)
+            estFPPower += (estFPPower + C.PWR_COEFF) * corrFac
+        return estFPPower
+
+    def getReceivePower(self, diagnostics=None):
+        """
+        This function calculates an estimate of the receive power level. See section 4.7.2 of the DW1000 user manual for further details on the calculation.
+
+        Args:
+                diagnostics: The RxDiagnostics of the frame, read from the chip if not given.
+
+        Returns:
+                The estimated receive power for the current reception.
+        """
+        if diagnostics is None:
+            diagnostics = self.readRxDiagnostics()
+        cir = float(diagnostics.cirPower)
+        N = float(diagnostics.preambleCount)
+        if self._operationMode[C.PULSE_FREQUENCY_BIT] == C.TX_PULSE_FREQ_16MHZ:
+            A = C.A_16MHZ
+            corrFac = C.CORRFAC_16MHZ
         else:
-            writeValueToBytes(data, C.LDE_REPC_14161819, 2)
-    elif preacode == C.PREAMBLE_CODE_64MHZ_20:
-        if dataRate == C.TRX_RATE_110KBPS:
-            writeValueToBytes(
-                data, ((C.LDE_REPC_20 >> 3) & C.MASK_LS_2BYTES), 2)
+            A = C.A_64MHZ
+            corrFac = C.CORRFAC_64MHZ
+        estRXPower = 0
+        if (cir * float(C.TWOPOWER17)) / (N * N) > 0:
+            estRXPower = C.PWR_COEFF2 * math.log10((cir * float(C.TWOPOWER17)) / (N * N)) - A
+        if estRXPower <= -C.PWR_COEFF:
+            return estRXPower
         else:
-            writeValueToBytes(data, C.LDE_REPC_20, 2)
-
-
-def enableClock(clock):
-    """
-    This function manages the dw1000 chip's clock by setting up the proper registers to activate the specified clock mode chosen.
-
-    Args:
-            clock: An hex value corresponding to the clock mode wanted:
-                AUTO=0x00
-                XTI=0x01
-                PLL=0X02.
-    """
-    pmscctrl0 = [None] * 4
-    readBytes(C.PMSC, C.PMSC_CTRL0_SUB, pmscctrl0, 4)
-    if clock == C.AUTO_CLOCK:
-        pmscctrl0[0] = C.AUTO_CLOCK
-        pmscctrl0[1] = pmscctrl0[1] & C.ENABLE_CLOCK_MASK1
-    elif clock == C.XTI_CLOCK:
-        pmscctrl0[0] = pmscctrl0[0] & C.ENABLE_CLOCK_MASK2
-        pmscctrl0[0] = pmscctrl0[0] | 1
-    writeBytes(C.PMSC, C.PMSC_CTRL0_SUB, pmscctrl0, 2)
-
-
-def idle():
-    """
-    This function puts the chip into idle mode.
-    """
-    global _deviceMode
-    setArray(_sysctrl, 4, 0x00)
-    setBit(_sysctrl, 4, C.TRXOFF_BIT, True)
-    _deviceMode = C.IDLE_MODE
-    writeBytes(C.SYS_CTRL, C.NO_SUB, _sysctrl, 4)
-
-
-"""
-Message reception functions.
-"""
-
-
-def newReceive():
-    """
-    This function prepares the chip for a new reception. It clears the system control register and also clear the RX latched bits in the SYS_STATUS register.
-    """
-    global _deviceMode
-    idle()
-    setArray(_sysctrl, 4, 0x00)
-    clearReceiveStatus()
-    _deviceMode = C.RX_MODE
-
+            estRXPower += (estRXPower + C.PWR_COEFF) * corrFac
+        return estRXPower
 
-def startReceive():
-    """
-    This function configures the chip to start the reception of a message sent by another DW1000 chip. 
-    It turns on its receiver by setting RXENAB in the system control register.
-    """
-    setBit(_sysctrl, 4, C.SFCST_BIT, False)
-    setBit(_sysctrl, 4, C.RXENAB_BIT, True)
-    writeBytes(C.SYS_CTRL, C.NO_SUB, _sysctrl, 4)
+    def getReceiveQuality(self, diagnostics=None):
+        """
+        This function calculates an estimate of the receive quality.
 
+        Args:
+                diagnostics: The RxDiagnostics of the frame, read from the chip if not given.
 
-def receivePermanently():
-    """
-    This function configures the dw1000 chip to receive data permanently. 
-    """
-    global _permanentReceive
-    _permanentReceive = True
-    setBit(_syscfg, 4, C.RXAUTR_BIT, True)
-    writeBytes(C.SYS_CFG, C.NO_SUB, _syscfg, 4)
+        Returns:
+                The estimated receive quality for the current reception.
+        """
+        if diagnostics is None:
+            diagnostics = self.readRxDiagnostics()
+        return float(diagnostics.fpAmpl2) / float(diagnostics.stdNoise)
 
+    def getReceiveTimestamp(self, diagnostics=None):
+        """
+        This function reads the receive timestamp from the register and returns it, corrected for the range bias.
 
-def isReceiveFailed():
-    """
-    This function reads the system event status register and checks if the message reception failed.
+        Args:
+                diagnostics: The RxDiagnostics of the frame, read from the chip if not given.
 
-    Returns:
-            True if the reception failed.
-            False otherwise.
-    """
-    ldeErr = getBit(_sysstatus, 5, C.LDEERR_BIT)
-    rxCRCErr = getBit(_sysstatus, 5, C.RXFCE_BIT)
-    rxHeaderErr = getBit(_sysstatus, 5, C.RXPHE_BIT)
-    rxDecodeErr = getBit(_sysstatus, 5, C.RXRFSL_BIT)
-    if (ldeErr or rxCRCErr or rxHeaderErr or rxDecodeErr):
-        return True
-    else:
-        return False
+        Returns:
+                The timestamp value of the last reception.
+        """
+        if diagnostics is None:
+            diagnostics = self.readRxDiagnostics()
+        timestamp = int(round(self.correctTimestamp(diagnostics.rxTimestamp, self.getReceivePower(diagnostics))))
 
+        return timestamp
 
-def isReceiveTimeout():
-    """
-    This function reads the system event status register and checks if there was a timeout in the message reception.
+    def correctTimestamp(self, timestamp, rxPower=None):
+        """
+        This function corrects the timestamp read from the RX buffer with the range bias table of the current channel and PRF.
 
-    Returns:
-            True if there was a timeout in the reception.
-            False otherwise.
-    """
-    isTimeout = getBit(_sysstatus, 5, C.RXRFTO_BIT) | getBit(
-        _sysstatus, 5, C.RXPTO_BIT) | getBit(_sysstatus, 5, C.RXSFDTO_BIT)
-    return isTimeout
+        Args: 
+                timestamp : the timestamp you want to correct
+                rxPower : the receive power of the frame, see getReceivePower. Read from the chip if not given.
+        
+        Returns: 
+                The corrected timestamp.
+        """
+        if rxPower is None:
+            rxPower = self.getReceivePower()
+        return timestamp + rangeBias(self._rangeBiasTable, rxPower)
+
+    """
+    Message transmission functions.
+    """
+
+    def newTransmit(self):
+        """
+        This function prepares the chip for a new transmission. It clears the system control register and also clears the TX latched bits in the SYS_STATUS register.
+        """
+        self.idle()
+        setArray(self._sysctrl, 4, 0x00)
+        self.clearTransmitStatus()
+        self._deviceMode = C.TX_MODE
+        self._txOrigin = None
+        # an automatic acknowledgement not reported yet was aborted or its transmit done event cleared
+        self._autoAcks = 0
+
+    def startTransmit(self):
+        """
+        This function configures the chip to start the transmission of the message previously set in the TX register. It sets TXSTRT bit in the system control register to begin transmission.
+        A delayed transmission whose time has already passed is aborted: the chip would otherwise wait for its counter to come around (~17 s).
+
+        Returns:
+                True if the transmission started, False if the delayed transmission was late.
+        """
+        self.writeBytes(C.TX_FCTRL, C.NO_SUB, self._txfctrl, 5)
+        setBit(self._sysctrl, 4, C.SFCST_BIT, False)
+        setBit(self._sysctrl, 4, C.TXSTRT_BIT, True)
+        self.writeBytes(C.SYS_CTRL, C.NO_SUB, self._sysctrl, 4)
+        if self._latencies is not None and self._txOrigin is not None:
+            sysTimeBytes = [0] * 5
+            self.readBytes(C.SYS_TIME, C.NO_SUB, sysTimeBytes, 5)
+            # an origin in the future (not a past reception) counts as no latency
+            self._latencies.append(max(DW1000Timestamp.difference(getTimeStamp(sysTimeBytes, 0), self._txOrigin), 0))
+        late = getBit(self._sysctrl, 4, C.TXDLYS_BIT) and self.isTransmitLate()
+        if late:
+            self._lateTransmits += 1
+            self.idle()
+            self.clearLateStatus()
+        if self._permanentReceive:
+            setArray(self._sysctrl, 4, 0x00)
+            self._deviceMode = C.RX_MODE
+            self.startReceive()
+        else:
+            self._deviceMode = C.IDLE_MODE
+        return not late
+
+    def isTransmitLate(self):
+        """
+        This function reads the half period delay warning (HPDWARN) of the last delayed transmission: it is set when the programmed time was
+        already past, i.e. more than half a period of the counter away. Only the byte of SYS_STATUS holding it is read.
+
+        Returns:
+                True if the delayed transmission is late.
+        """
+        status = [0]
+        self.readBytes(C.SYS_STATUS, C.HPDWARN_BIT // 8, status, 1)
+        return bool(status[0] & (1 << (C.HPDWARN_BIT % 8)))
+
+    def clearLateStatus(self):
+        """
+        This function clears the half period delay warning in SYS_STATUS.
+        """
+        self.writeStatus(1 << C.HPDWARN_BIT)
+
+    def clearTransmitStatus(self):
+        """
+        This function clears the event status register at the bits related to the transmission of a message.
+        """
+        self.writeStatus(C.TX_STATUS_MASK)
+
+    def setDelay(self, delay, unit):
+        """
+        This function configures the chip to activate a delay between transmissions or receptions.
+
+        Args:
+                delay: The delay between each transmission/reception
+                unit : The unit you want to put the delay in. Microseconds is the base unit.
+
+        Returns:
+                The timestamp's value with the added delay and antennaDelay.
+        """
+        sysTimeBytes = [None] * 5
+        self.readBytes(C.SYS_TIME, C.NO_SUB, sysTimeBytes, 5)
+        futureTimeTS = getTimeStamp(sysTimeBytes, 0)
+        futureTimeTS += (int)(delay * unit * C.TIME_RES_INV)
+        return self.setDelayedTimestamp(futureTimeTS)
+
+    def transmitAt(self, timestamp, delay=0, unit=C.MICROSECONDS):
+        """
+        This function configures the chip to send the next message at a given delay from a known system time, usually the receive timestamp
+        of the message being answered. Unlike setDelay(), SYS_TIME is not read, so the reply time does not depend on the latency of the host.
+        Call it after newTransmit(), then write the message, which may carry the returned TX timestamp, and call startTransmit(): it returns
+        False if the time has already passed.
+
+        Args:
+                timestamp: The system time the delay is counted from.
+                delay: The delay.
+                unit: The unit of the delay, see setDelay().
+
+        Returns:
+                The TX timestamp of the message, see setDelayedTimestamp().
+        """
+        self._txOrigin = timestamp
+        return self.setDelayedTimestamp(DW1000Timestamp.add(timestamp, int(delay * unit * C.TIME_RES_INV)))
+
+    def setDelayedTimestamp(self, timestamp):
+        """
+        This function configures the chip to delay the next transmission or reception until the given system time, written in DX_TIME.
+        The chip ignores the 9 low order bits of DX_TIME.
+
+        Args:
+                timestamp: The system time at which the transmission/reception starts.
+
+        Returns:
+                The timestamp's value actually programmed, with the TX antenna delay set by setAntennaDelay added: the TX timestamp of
+                a delayed transmission.
+        """
+        if self._deviceMode == C.TX_MODE:
+            setBit(self._sysctrl, 4, C.TXDLYS_BIT, True)
+        elif self._deviceMode == C.RX_MODE:
+            setBit(self._sysctrl, 4, C.RXDLYE_BIT, True)
+
+        delayBytes = [None] * 5
+        DW1000Timestamp.pack(delayBytes, int(timestamp), 0)
+        delayBytes[0] = 0
+        delayBytes[1] &= C.SET_DELAY_MASK
+        self.writeBytes(C.DX_TIME, C.NO_SUB, delayBytes, 5)
+
+        return DW1000Timestamp.add(DW1000Timestamp.unpack(delayBytes, 0), self._antennaDelay)
+
+    def clearAllStatus(self):
+        """
+        This function clears all the status register by writing a 1 to every bits in it, but CPLOCK which tells that the PLL is locked,
+        see isPllLocked().
+        """
+        self.writeBytes(C.SYS_STATUS, C.NO_SUB, [0xFF & ~(1 << C.CPLOCK_BIT)] + [0xFF] * 4, 5)
+
+    def getTransmitTimestamp(self):
+        """
+        This function reads the transmit timestamp from the register and returns it.
+
+        Returns:
+                The timestamp value of the last transmission.
+        """
+        txTimeBytes = [0] * 5
+        self.readBytes(C.TX_TIME, C.TX_STAMP_SUB, txTimeBytes, 5)
+        return DW1000Timestamp.unpack(txTimeBytes, 0)
+
+    """
+    Data functions
+    """
+
+    def getDataStr(self):
+        """
+        This function reads the RX buffer register to process the received message. First, it reads the length of the message in the RX frame info register, then
+        read the RX buffer register and converts the ASCII values into strings.
+
+        Returns:
+                The data in the RX buffer as a string.
+        """
+        len = 0
+        if self._deviceMode == C.RX_MODE:
+            rxFrameInfo = [0] * 4
+            self.readBytes(C.RX_FINFO, C.NO_SUB, rxFrameInfo, 4)
+            len = (((rxFrameInfo[1] << 8) | rxFrameInfo[0]) & C.GET_DATA_MASK)
+            len = len - 2
+
+        dataBytes = [""] * len
+        self.readBytes(C.RX_BUFFER, C.NO_SUB, dataBytes, len)
+        data = "".join(chr(i) for i in dataBytes)
+        return data
+
+    def getData(self, datalength, data=None):
+        """
+        This function reads a number of bytes in the RX buffer register, stores it into an array and return it.
+
+        Args:
+                datalength = The number of bytes you want to read from the rx buffer.
+                data = An optional preallocated array (e.g. a bytearray reused between frames) to store the bytes into.
+
+        Returns:
+                The data read in the RX buffer as an array byte.
+        """
+        if data is None:
+            data = [0] * datalength
+        time.sleep(0.000005)
+        self.readBytes(C.RX_BUFFER, C.NO_SUB, data, datalength)
+        return data
+
+    def setDataStr(self, data):
+        """
+        This function converts the specified string into an array of bytes and calls the setData function. 
+
+        Args:
+                data: The string message the transmitter will send.
+        """
+        dataLength = len(data) + 1
+        testData = [0] * dataLength
+        for i in range(0, len(data)):
+            testData[i] = ord(data[i])
+        self.setData(testData, dataLength)
+
+    def setData(self, data, dataLength):
+        """
+        This function writes the byte array into the TX buffer register to store the message which will be sent.
+
+        Args:
+                data: the byte array which contains the data to be written in the register
+                dataLength: The size of the data which will be sent.
+        """
+        self.writeBytes(C.TX_BUFFER, C.NO_SUB, data, dataLength)
+        dataLength += 2  # _frameCheck true, two bytes CRC
+        self._txfctrl[0] = (dataLength & C.MASK_LS_BYTE)
+        self._txfctrl[1] &= C.SET_DATA_MASK1
+        self._txfctrl[1] |= ((dataLength >> 8) & C.SET_DATA_MASK2)
+
+    def getDeviceModeInfo(self):
+        """
+        This function prints the various device mode operating informations such as datarate, pulse frequency, the channel used, etc
+        """
+        if self._operationMode[C.PULSE_FREQUENCY_BIT] == C.TX_PULSE_FREQ_16MHZ:
+            prf = C.PFREQ_16
+        elif self._operationMode[C.PULSE_FREQUENCY_BIT] == C.TX_PULSE_FREQ_64MHZ:
+            prf = C.PFREQ_64
+        else:
+            prf = C.PFREQ_0
 
+        if self._operationMode[C.PREAMBLE_LENGTH_BIT] == C.TX_PREAMBLE_LEN_64:
+            plen = C.PLEN_64
+        elif self._operationMode[C.PREAMBLE_LENGTH_BIT] == C.TX_PREAMBLE_LEN_2048:
+            plen = C.PLEN_2048
+        else:
+            plen = C.PLEN_0
 
-def clearReceiveStatus():
-    """
-    This function clears the system event status register at the bits related to the reception of a message.
-    """
-    setBit(_sysstatus, 5, C.RXDFR_BIT, True)
-    setBit(_sysstatus, 5, C.LDEDONE_BIT, True)
-    setBit(_sysstatus, 5, C.LDEERR_BIT, True)
-    setBit(_sysstatus, 5, C.RXPHE_BIT, True)
-    setBit(_sysstatus, 5, C.RXFCE_BIT, True)
-    setBit(_sysstatus, 5, C.RXFCG_BIT, True)
-    setBit(_sysstatus, 5, C.RXRFSL_BIT, True)
+        if self._operationMode[C.DATA_RATE_BIT] == C.TRX_RATE_110KBPS:
+            dr = C.DATA_RATE_110
+        else:
+            dr = C.DATA_RATE_0
+
+        ch = self._operationMode[C.CHANNEL_BIT]
+        pcode = self._operationMode[C.PREAMBLE_CODE_BIT]
+        print("Device mode: Data rate %d kb/s, PRF : %d MHz, Preamble: %d symbols (code %d), Channel : %d" %
+              (dr, prf, plen, pcode, ch))
+
+    """
+    Register access functions.
+    """
+
+    def readBytes(self, cmd, offset, data, n):
+        """
+        This function read n bytes from the given registers with an offset and stores them in the array given as a parameter.
+        The header and the n junk bytes are clocked out in a single SPI transaction, assembled in the preallocated transfer buffer of the
+        calling thread (see _newTransferBuffer). data can be a list or a reusable bytearray.
+
+        Args:
+                cmd: The address of the register you want to read.
+                offset: The offset for the register.
+                data: The array where you want the bytes the be stored.
+                n: The number of bytes you want to read from the register.
+        """
+        try:
+            buf, view = self._transferBuffers.read
+        except AttributeError:
+            buf, view = self._transferBuffers.read = self._newTransferBuffer()
+        # the junk bytes are left to C.JUNK past the header, only the bytes of a longer previous header have to be cleared
+        buf[1] = buf[2] = C.JUNK
+        end = writeHeader(buf, C.READ, cmd, offset) + n
+        if end > len(buf):
+            buf = bytearray(end)
+            view = memoryview(buf)
+            writeHeader(buf, C.READ, cmd, offset)
+
+        rx = self._bus.transfer(self._chipSelect, view[:end])
+
+        data[0:n] = rx[end - n:end]
+
+    def writeBytes(self, cmd, offset, data, dataSize):
+        """
+        This function writes n bytes from the specified array to the register given as a parameter and with an offset value.
+        The header and the data are sent in a single SPI transaction, assembled like in readBytes. Bytes left to None in the array are
+        skipped.
+
+        Args:
+                cmd: The address of the register you want to write into.
+                offset: The offset for the register.
+                data: The array containing the data you want written.
+                dataSize: The number of bytes you want to write into the register.
+        """
+        try:
+            buf, view = self._transferBuffers.write
+        except AttributeError:
+            buf, view = self._transferBuffers.write = self._newTransferBuffer()
+        if C.SPI_HEADER_MAX_LEN + dataSize > len(buf):
+            buf = bytearray(C.SPI_HEADER_MAX_LEN + dataSize)
+            view = memoryview(buf)
+        end = writeHeader(buf, C.WRITE, cmd, offset)
+        try:
+            # bytes only: copied at once, the buffer is left unchanged if a value is None or out of range
+            buf[end:end + dataSize] = data if len(data) == dataSize else data[:dataSize]
+            end += dataSize
+        except (TypeError, ValueError):
+            for i in range(0, dataSize):
+                value = data[i]
+                if value is not None:
+                    buf[end] = int(value) & C.MASK_LS_BYTE
+                    end += 1
+
+        self._bus.write(self._chipSelect, view[:end])
+
+    def _newTransferBuffer(self):
+        """
+        This function allocates a transfer buffer of readBytes or writeBytes, done on the first transaction of each thread: the interrupt
+        handler may run in its own thread (e.g. the RPi.GPIO callbacks) while the main thread accesses the chip.
+
+        Returns:
+                A bytearray of C.SPI_BUFFER_LEN bytes and the memoryview through which the transactions are sent.
+        """
+        buf = bytearray(C.SPI_BUFFER_LEN)
+        return buf, memoryview(buf)
+
+    def readBytesOTP(self, address, data):
+        """
+        This function reads a value from the OTP memory following 6.3.3 table 13 of the user manual 
+
+        Args:
+                address: The address to read in the OTP register.
+                data: The data that will store the value read. 
+        """
+        addressBytes = [None] * 2
+        addressBytes[0] = address & C.MASK_LS_BYTE
+        addressBytes[1] = (address >> 8) & C.MASK_LS_BYTE
+        self.writeBytes(C.OTP_IF, C.OTP_ADDR_SUB, addressBytes, 2)
+        self.writeBytes(C.OTP_IF, C.OTP_CTRL_SUB, [C.OTP_STEP2], 1)
+        self.writeBytes(C.OTP_IF, C.OTP_CTRL_SUB, [C.OTP_STEP3], 1)
+        self.readBytes(C.OTP_IF, C.OTP_RDAT_SUB, data, 4)
+        self.writeBytes(C.OTP_IF, C.OTP_CTRL_SUB, [C.OTP_STEP5], 1)
+        return data
+
+    def close(self):
+        """
+        This function closes the SPI connection and clean up the GPIOs.
+        """
+        self._bus.close()
+        print("\n Close SPI")
 
-    writeBytes(C.SYS_STATUS, C.NO_SUB, _sysstatus, 5)
 
+"""
+Helper functions
+"""
 
-def getFirstPathPower():
-    """
-    This function calculates an estimate of the power in the first path signal. See section 4.7.1 of the DW1000 user manual for further details on the calculations.
 
-    Returns:
-            The estimated power in the first path signal.
+def buildRangeBiasTable(channel, pulseFrequency):
     """
-    fpAmpl1Bytes = [None] * 2
-    fpAmpl2Bytes = [None] * 2
-    fpAmpl3Bytes = [None] * 2
-    rxFrameInfo = [None] * 4
-    readBytes(C.RX_TIME, C.FP_AMPL1_SUB, fpAmpl1Bytes, 2)
-    readBytes(C.RX_FQUAL, C.FP_AMPL2_SUB, fpAmpl2Bytes, 2)
-    readBytes(C.RX_FQUAL, C.PP_AMPL3_SUB, fpAmpl3Bytes, 2)
-    readBytes(C.RX_FINFO, C.NO_SUB, rxFrameInfo, 4)
-    f1 = fpAmpl1Bytes[0] | fpAmpl1Bytes[1] << 8
-    f2 = fpAmpl2Bytes[0] | fpAmpl2Bytes[1] << 8
-    f3 = fpAmpl3Bytes[0] | fpAmpl3Bytes[1] << 8
-    N = ((rxFrameInfo[2] >> 4) & C.MASK_LS_BYTE) | (rxFrameInfo[3] << 4)
-    if _operationMode[C.PULSE_FREQUENCY_BIT] == C.TX_PULSE_FREQ_16MHZ:
-        A = C.A_16MHZ
-        corrFac = C.CORRFAC_16MHZ
-    else:
-        A = C.A_64MHZ
-        corrFac = C.CORRFAC_64MHZ
-    estFPPower = C.PWR_COEFF2 * \
-        math.log10((f1 * f1 + f2 * f2 + f3 * f3) / (N * N)) - A
-    if estFPPower <= -C.PWR_COEFF:
-        return estFPPower
-    else:
-        estFPPower += (estFPPower + C.PWR_COEFF) * corrFac
-    return estFPPower
-
+    This function builds the range bias correction table of a channel and pulse repetition frequency: the BIAS_* values are signed
+    (negative below the zero index), doubled and converted from centimetres into timestamp units once, so correcting a timestamp
+    is a lookup plus one interpolation, see rangeBias().
 
-def getReceivePower():
-    """
-    This function calculates an estimate of the receive power level. See section 4.7.2 of the DW1000 user manual for further details on the calculation.
+    Args:
+            channel : The channel of operation.
+            pulseFrequency : The TX pulse frequency, C.TX_PULSE_FREQ_16MHZ or C.TX_PULSE_FREQ_64MHZ.
 
     Returns:
-            The estimated receive power for the current reception.
+            The table indexed by the receive power step, or None if the pulse frequency is not configured.
     """
-    cirPwrBytes = [None] * 2
-    rxFrameInfo = [None] * 4
-    readBytes(C.RX_FQUAL, C.CIR_PWR_SUB, cirPwrBytes, 2)
-    readBytes(C.RX_FINFO, C.NO_SUB, rxFrameInfo, 4)
-    cir = cirPwrBytes[0] | cirPwrBytes[1] << 8
-    N = ((rxFrameInfo[2] >> 4) & C.MASK_LS_BYTE) | rxFrameInfo[3] << 4
-    if _operationMode[C.PULSE_FREQUENCY_BIT] == C.TX_PULSE_FREQ_16MHZ:
-        A = C.A_16MHZ
-        corrFac = C.CORRFAC_16MHZ
-    else:
-        A = C.A_64MHZ
-        corrFac = C.CORRFAC_64MHZ
-    estRXPower = 0
-    if ((float(cir) * float(C.TWOPOWER17)) / (float(N) * float(N)) > 0): 
-        estRXPower = C.PWR_COEFF2 * math.log10((float(cir) * float(C.TWOPOWER17)) / (float(N) * float(N))) - A
-    if estRXPower <= -C.PWR_COEFF:
-        return estRXPower
+    if channel == C.CHANNEL_4 or channel == C.CHANNEL_7:
+        if pulseFrequency == C.TX_PULSE_FREQ_16MHZ:
+            bias, zero = C.BIAS_900_16, C.BIAS_900_16_ZERO
+        elif pulseFrequency == C.TX_PULSE_FREQ_64MHZ:
+            bias, zero = C.BIAS_900_64, C.BIAS_900_64_ZERO
+        else:
+            return None
     else:
-        estRXPower += (estRXPower + C.PWR_COEFF) * corrFac
-    return estRXPower
+        if pulseFrequency == C.TX_PULSE_FREQ_16MHZ:
+            bias, zero = C.BIAS_500_16, C.BIAS_500_16_ZERO
+        elif pulseFrequency == C.TX_PULSE_FREQ_64MHZ:
+            bias, zero = C.BIAS_500_64, C.BIAS_500_64_ZERO
+        else:
+            return None
+    scale = C.DISTANCE_OF_RADIO_INV * C.ADJUSTMENT_TIME_FACTOR
+    return [((-b if i < zero else b) << 1) * scale for i, b in enumerate(bias)]
 
 
-def getReceiveQuality():
+def rangeBias(table, rxPower):
     """
-    This function calculates an estimate of the receive quality.abs
+    This function interpolates the range bias of a frame in a table built by buildRangeBiasTable().
 
-    Returns:
-            The estimated receive quality for the current reception.
-    """
-    noiseBytes = [None] * 2
-    fpAmpl2Bytes = [None] * 2
-    readBytes(C.RX_FQUAL, C.STD_NOISE_SUB, noiseBytes, 2)
-    readBytes(C.RX_FQUAL, C.FP_AMPL2_SUB, fpAmpl2Bytes, 2)
-    noise = float(noiseBytes[0] | noiseBytes[1] << 8)
-    f2 = float(fpAmpl2Bytes[0] | fpAmpl2Bytes[1] << 8)
-    return f2 / noise
-
-
-def getReceiveTimestamp():
-    """
-    This function reads the receive timestamp from the register and returns it.
+    Args:
+            table : The range bias table of the channel and PRF used.
+            rxPower : The receive power of the frame, see getReceivePower.
 
     Returns:
-            The timestamp value of the last reception.
+            The correction to add to the receive timestamp.
     """
-    rxTimeBytes = [0] * 5
-    readBytes(C.RX_TIME, C.RX_STAMP_SUB, rxTimeBytes, 5)
-    timestamp = 0
-    for i in range(0, 5):
-        timestamp |= rxTimeBytes[i] << (i * 8)
-    timestamp = int(round(correctTimestamp(timestamp)))
-    
-    return timestamp
-
-
-def correctTimestamp(timestamp):
-    """
-    This function corrects the timestamp read from the RX buffer.
-
-    Args: 
-            timestamp : the timestamp you want to correct
-    
-    Returns: 
-            The corrected timestamp.
-    """
-    rxPowerBase = -(getReceivePower() + 61.0) * 0.5
+    rxPowerBase = -(rxPower + 61.0) * 0.5
     rxPowerBaseLow = int(math.floor(rxPowerBase))
-    rxPowerBaseHigh = rxPowerBaseLow + 1
-
+    last = len(table) - 1
     if rxPowerBaseLow < 0:
-        rxPowerBaseLow = 0
-        rxPowerBaseHigh = 0
-    elif rxPowerBaseHigh > 17:
-        rxPowerBaseLow = 17
-        rxPowerBaseHigh = 17
-
-    if _operationMode[C.CHANNEL_BIT] == C.CHANNEL_4 or _operationMode[C.CHANNEL_BIT] == C.CHANNEL_7:
-        if _operationMode[C.PULSE_FREQUENCY_BIT] == C.TX_PULSE_FREQ_16MHZ:
-            if rxPowerBaseHigh < C.BIAS_900_16_ZERO:
-                rangeBiasHigh = - C.BIAS_900_16[rxPowerBaseHigh]
-            else:
-                rangeBiasHigh = C.BIAS_900_16[rxPowerBaseHigh]
-            rangeBiasHigh <<= 1
-            if rxPowerBaseLow < C.BIAS_900_16_ZERO:
-                rangeBiasLow = -C.BIAS_900_16[rxPowerBaseLow]
-            else:
-                rangeBiasLow = C.BIAS_900_16[rxPowerBaseLow]
-            rangeBiasLow <<= 1
-        elif _operationMode[C.PULSE_FREQUENCY_BIT] == C.TX_PULSE_FREQ_64MHZ:
-            if rxPowerBaseHigh < C.BIAS_900_64_ZERO:
-                rangeBiasHigh = - C.BIAS_900_64[rxPowerBaseHigh]
-            else:
-                rangeBiasHigh = C.BIAS_900_64[rxPowerBaseHigh]
-            rangeBiasHigh <<= 1
-            if rxPowerBaseLow < C.BIAS_900_64_ZERO:
-                rangeBiasLow = -C.BIAS_900_64[rxPowerBaseLow]
-            else:
-                rangeBiasLow = C.BIAS_900_64[rxPowerBaseLow]
-            rangeBiasLow <<= 1
-    else:
-        if _operationMode[C.PULSE_FREQUENCY_BIT] == C.TX_PULSE_FREQ_16MHZ:
-            if rxPowerBaseHigh < C.BIAS_500_16_ZERO:
-                rangeBiasHigh = - C.BIAS_500_16[rxPowerBaseHigh]
-            else:
-                rangeBiasHigh = C.BIAS_500_16[rxPowerBaseHigh]
-            rangeBiasHigh <<= 1
-            if rxPowerBaseLow < C.BIAS_500_16_ZERO:
-                rangeBiasLow = -C.BIAS_500_16[rxPowerBaseLow]
-            else:
-                rangeBiasLow = C.BIAS_500_16[rxPowerBaseLow]
-            rangeBiasLow <<= 1
-        elif _operationMode[C.PULSE_FREQUENCY_BIT] == C.TX_PULSE_FREQ_64MHZ:
-            if rxPowerBaseHigh < C.BIAS_500_64_ZERO:
-                rangeBiasHigh = - C.BIAS_500_64[rxPowerBaseHigh]
-            else:
-                rangeBiasHigh = C.BIAS_500_64[rxPowerBaseHigh]
-            rangeBiasHigh <<= 1
-            if rxPowerBaseLow < C.BIAS_500_64_ZERO:
-                rangeBiasLow = -C.BIAS_500_64[rxPowerBaseLow]
-            else:
-                rangeBiasLow = C.BIAS_500_64[rxPowerBaseLow]
-            rangeBiasLow <<= 1
-
-    rangeBias = rangeBiasLow + (rxPowerBase - rxPowerBaseLow) * (rangeBiasHigh - rangeBiasLow)
-    adjustmentTimeTS = rangeBias * C.DISTANCE_OF_RADIO_INV * C.ADJUSTMENT_TIME_FACTOR
-    timestamp += adjustmentTimeTS
-    return timestamp
+        return table[0]
+    elif rxPowerBaseLow >= last:
+        return table[last]
+    biasLow = table[rxPowerBaseLow]
+    return biasLow + (rxPowerBase - rxPowerBaseLow) * (table[rxPowerBaseLow + 1] - biasLow)
 
 
-"""
-Message transmission functions.
-"""
-
-
-def newTransmit():
-    """
-    This function prepares the chip for a new transmission. It clears the system control register and also clears the TX latched bits in the SYS_STATUS register.
-    """
-    global _deviceMode
-    idle()
-    setArray(_sysctrl, 4, 0x00)
-    clearTransmitStatus()
-    _deviceMode = C.TX_MODE
-
-
-def startTransmit():
-    """
-    This function configures the chip to start the transmission of the message previously set in the TX register. It sets TXSTRT bit in the system control register to begin transmission.
-    """
-    global _sysctrl, _deviceMode
-    writeBytes(C.TX_FCTRL, C.NO_SUB, _txfctrl, 5)
-    setBit(_sysctrl, 4, C.SFCST_BIT, False)
-    setBit(_sysctrl, 4, C.TXSTRT_BIT, True)
-    writeBytes(C.SYS_CTRL, C.NO_SUB, _sysctrl, 4)
-    if _permanentReceive:
-        setArray(_sysctrl, 4, 0x00)
-        _deviceMode = C.RX_MODE
-        startReceive()
-    else:
-        _deviceMode = C.IDLE_MODE
-
-
-def clearTransmitStatus():
-    """
-    This function clears the event status register at the bits related to the transmission of a message.
+def carrierIntegratorToPpm(carrierIntegrator, channel, dataRate):
     """
-    setBit(_sysstatus, 5, C.TXFRB_BIT, True)
-    setBit(_sysstatus, 5, C.TXPRS_BIT, True)
-    setBit(_sysstatus, 5, C.TXPHS_BIT, True)
-    setBit(_sysstatus, 5, C.TXFRS_BIT, True)
-
-    writeBytes(C.SYS_STATUS, C.NO_SUB, _sysstatus, 5)
-
-
-def setDelay(delay, unit):
-    """
-    This function configures the chip to activate a delay between transmissions or receptions.
+    This function converts a carrier integrator value into a clock offset.
 
     Args:
-            delay: The delay between each transmission/reception
-            unit : The unit you want to put the delay in. Microseconds is the base unit.
+            carrierIntegrator : The signed value of DRX_CAR_INT.
+            channel : The channel of the reception.
+            dataRate : The data rate of the reception.
 
     Returns:
-            The timestamp's value with the added delay and antennaDelay.
+            The clock offset in ppm, positive when the remote clock runs faster than the local one.
     """
-    if _deviceMode == C.TX_MODE:
-        setBit(_sysctrl, 4, C.TXDLYS_BIT, True)
-    elif _deviceMode == C.RX_MODE:
-        setBit(_sysctrl, 4, C.RXDLYE_BIT, True)
-
-    delayBytes = [None] * 5
-    sysTimeBytes = [None] * 5
-    readBytes(C.SYS_TIME, C.NO_SUB, sysTimeBytes, 5)
-    futureTimeTS = 0
-    for i in range(0, 5):
-        futureTimeTS |= sysTimeBytes[i] << (i * 8)
-    futureTimeTS += (int)(delay * unit * C.TIME_RES_INV)
-
-    setArray(delayBytes, 5, 0x00)
-    for i in range(0, 5):
-        delayBytes[i] = (int)(futureTimeTS >> (i * 8)) & C.MASK_LS_BYTE
-
-    delayBytes[0] = 0
-    delayBytes[1] &= C.SET_DELAY_MASK
-    writeBytes(C.DX_TIME, C.NO_SUB, delayBytes, 5)
-
-    futureTimeTS = 0
-    for i in range(0, 5):
-        futureTimeTS |= delayBytes[i] << (i * 8)
-
-    futureTimeTS += C.ANTENNA_DELAY
-    return futureTimeTS
+    if dataRate == C.TRX_RATE_110KBPS:
+        frequencyOffset = carrierIntegrator * C.FREQ_OFFSET_MULTIPLIER_110KBPS
+    else:
+        frequencyOffset = carrierIntegrator * C.FREQ_OFFSET_MULTIPLIER
+    return -frequencyOffset * 1e6 / C.CARRIER_FREQUENCY[channel]
 
 
-def clearAllStatus():
-    """
-    This function clears all the status register by writing a 1 to every bits in it. 
+def correctTimestamps(timestamps, rxPowers, table):
     """
-    setArray(_sysstatus, 5, 0xFF)
-    writeBytes(C.SYS_STATUS, C.NO_SUB, _sysstatus, 5)
-
+    This function is the vectorized version of the timestamp correction, for batch post-processing of logged receive timestamps and powers.
+    It requires numpy.
 
-def getTransmitTimestamp():
-    """
-    This function reads the transmit timestamp from the register and returns it.
+    Args:
+            timestamps : The receive timestamps to correct.
+            rxPowers : The receive power of each frame.
+            table : The range bias table of the channel and PRF used, see buildRangeBiasTable().
 
     Returns:
-            The timestamp value of the last transmission.
+            A numpy array of the corrected timestamps.
     """
-    txTimeBytes = [0] * 5
-    readBytes(C.TX_TIME, C.TX_STAMP_SUB, txTimeBytes, 5)
-    timeStamp = 0
-    for i in range(0, 5):
-        timeStamp |= int(txTimeBytes[i] << (i * 8))
-    return timeStamp
+    import numpy
+    table = numpy.asarray(table, dtype=float)
+    last = len(table) - 1
+    rxPowerBase = -(numpy.asarray(rxPowers, dtype=float) + 61.0) * 0.5
+    rxPowerBase = numpy.clip(rxPowerBase, 0, last)
+    rxPowerBaseLow = numpy.minimum(numpy.floor(rxPowerBase).astype(int), last - 1)
+    biasLow = table[rxPowerBaseLow]
+    bias = biasLow + (rxPowerBase - rxPowerBaseLow) * (table[rxPowerBaseLow + 1] - biasLow)
+    return numpy.asarray(timestamps, dtype=float) + bias
 
 
-def setTimeStamp(data, timeStamp, index):
+def setTimeStamp(data, timeStamp, index, n=5):
     """
     This function sets the specified timestamp into the data that will be sent.
 
@@ -1162,34 +1865,32 @@ def setTimeStamp(data, timeStamp, index):
             data: The data where you will store the timestamp
             timeStamp = The timestamp's value
             index = The bit from where you will put the timestamp's value
+            n = The number of little endian bytes of the value, 5 for a timestamp
 
     Returns:
             The data with the timestamp added to it
     """
-    for i in range(0, 5):
-        data[i+index] = int((timeStamp >> (i * 8)) & C.MASK_LS_BYTE)
+    DW1000Timestamp.pack(data, timeStamp, index, n)
 
 
-def getTimeStamp(data, index):
+def getTimeStamp(data, index, n=5):
     """
     This function gets the timestamp's value written inside the specified data and returns it.
 
     Args:
             data : the data where you want to extract the timestamp from
             index : the index you want to start reading the data from
+            n : the number of little endian bytes of the value, 5 for a timestamp
 
     Returns:
             The timestamp's value read from the given data.
     """
-    timestamp = 0
-    for i in range(0, 5):
-        timestamp |= data[i+index] << (i*8)
-    return timestamp
+    return DW1000Timestamp.unpack(data, index, n)
 
 
 def wrapTimestamp(timestamp):
     """
-    This function converts the negative values of the timestamp due to the overflow into a correct one.
+    This function converts the negative values of the timestamp due to the overflow into a correct one, see DW1000Timestamp.elapsed.
 
     Args :
             timestamp : the timestamp's value you want to correct.
@@ -1197,185 +1898,33 @@ def wrapTimestamp(timestamp):
     Returns:
             The corrected timestamp's value.
     """
-    if timestamp < 0:
-        timestamp += C.TIME_OVERFLOW
-    return timestamp
+    return timestamp % C.TIME_OVERFLOW
 
         
-"""
-Data functions
-"""
-
-
-def getDataStr():
-    """
-    This function reads the RX buffer register to process the received message. First, it reads the length of the message in the RX frame info register, then
-    read the RX buffer register and converts the ASCII values into strings.
-
-    Returns:
-            The data in the RX buffer as a string.
-    """
-    len = 0
-    if _deviceMode == C.RX_MODE:
-        rxFrameInfo = [0] * 4
-        readBytes(C.RX_FINFO, C.NO_SUB, rxFrameInfo, 4)
-        len = (((rxFrameInfo[1] << 8) | rxFrameInfo[0]) & C.GET_DATA_MASK)
-        len = len - 2
-
-    dataBytes = [""] * len
-    readBytes(C.RX_BUFFER, C.NO_SUB, dataBytes, len)
-    data = "".join(chr(i) for i in dataBytes)
-    return data
-
-
-def getData(datalength):
-    """
-    This function reads a number of bytes in the RX buffer register, stores it into an array and return it.
-
-    Args:
-            datalength = The number of bytes you want to read from the rx buffer.
-
-    Returns:
-            The data read in the RX buffer as an array byte.
+def writeHeader(buf, rw, cmd, offset):
     """
-    data = [0] * datalength
-    time.sleep(0.000005)
-    readBytes(C.RX_BUFFER, C.NO_SUB, data, datalength)
-    return data
-
-
-def setDataStr(data):
-    """
-    This function converts the specified string into an array of bytes and calls the setData function. 
+    This function writes the SPI transaction header used to access a register at the start of a buffer, see 2.2.1.2 of the DW1000 user
+    manual.
 
     Args:
-            data: The string message the transmitter will send.
-    """
-    dataLength = len(data) + 1
-    testData = [0] * dataLength
-    for i in range(0, len(data)):
-        testData[i] = ord(data[i])
-    setData(testData, dataLength)
-
-
-def setData(data, dataLength):
-    """
-    This function writes the byte array into the TX buffer register to store the message which will be sent.
-
-    Args:
-            data: the byte array which contains the data to be written in the register
-            dataLength: The size of the data which will be sent.
-    """
-    global _txfctrl
-    writeBytes(C.TX_BUFFER, C.NO_SUB, data, dataLength)
-    dataLength += 2  # _frameCheck true, two bytes CRC
-    _txfctrl[0] = (dataLength & C.MASK_LS_BYTE)
-    _txfctrl[1] &= C.SET_DATA_MASK1
-    _txfctrl[1] |= ((dataLength >> 8) & C.SET_DATA_MASK2)
-
-
-def getDeviceModeInfo():
-    """
-    This function prints the various device mode operating informations such as datarate, pulse frequency, the channel used, etc
-    """
-    if _operationMode[C.PULSE_FREQUENCY_BIT] == C.TX_PULSE_FREQ_16MHZ:
-        prf = C.PFREQ_16
-    elif _operationMode[C.PULSE_FREQUENCY_BIT] == C.TX_PULSE_FREQ_64MHZ:
-        prf = C.PFREQ_64
-    else:
-        prf = C.PFREQ_0
-
-    if _operationMode[C.PREAMBLE_LENGTH_BIT] == C.TX_PREAMBLE_LEN_64:
-        plen = C.PLEN_64
-    elif _operationMode[C.PREAMBLE_LENGTH_BIT] == C.TX_PREAMBLE_LEN_2048:
-        plen = C.PLEN_2048
-    else:
-        plen = C.PLEN_0
-
-    if _operationMode[C.DATA_RATE_BIT] == C.TRX_RATE_110KBPS:
-        dr = C.DATA_RATE_110
-    else:
-        dr = C.DATA_RATE_0
-
-    ch = _operationMode[C.CHANNEL_BIT]
-    pcode = _operationMode[C.PREAMBLE_CODE_BIT]
-    print("Device mode: Data rate %d kb/s, PRF : %d MHz, Preamble: %d symbols (code %d), Channel : %d" %
-          (dr, prf, plen, pcode, ch))
-
-
-"""
-Helper functions
-"""
-
-
-def readBytes(cmd, offset, data, n):
-    """
-    This function read n bytes from the given registers with an offset and stores them in the array given as a parameter.
-
-    Args:
-            cmd: The address of the register you want to read.
+            buf: The bytearray of the transaction, at least C.SPI_HEADER_MAX_LEN bytes long.
+            rw: The access type, either C.READ or C.WRITE.
+            cmd: The address of the register.
             offset: The offset for the register.
-            data: The array where you want the bytes the be stored.
-            n: The number of bytes you want to read from the register.
-    """
-    header = [None] * 3
-    headerLen = 1
-
-    if offset == C.NO_SUB:
-        header[0] = C.READ | cmd
-    else:
-        header[0] = C.READ_SUB | cmd
-        if offset < 128:
-            header[1] = offset
-            headerLen = headerLen + 1
-        else:
-            header[1] = (C.RW_SUB_EXT | offset) & C.MASK_LS_BYTE
-            header[2] = offset >> 7
-            headerLen = headerLen + 2
-
-    GPIO.output(_chipSelect, GPIO.LOW)
-    for i in range(0, headerLen):
-        a = spi.xfer([int(header[i])])
-    for i in range(0, n):
-        data[i] = spi.xfer([C.JUNK])[0]
-
-    GPIO.output(_chipSelect, GPIO.HIGH)
 
-
-def writeBytes(cmd, offset, data, dataSize):
-    """
-    This function writes n bytes from the specified array to the register given as a parameter and with an offset value.
-
-    Args:
-            cmd: The address of the register you want to write into.
-            offset: The offset for the register.
-            data: The array containing the data you want written.
-            dataSize: The number of bytes you want to write into the register.
+    Returns:
+            The length of the header, 1, 2 or 3 bytes.
     """
-    header = [None] * 3
-    headerLen = 1
-
     if offset == C.NO_SUB:
-        header[0] = C.WRITE | cmd
-    else:
-        header[0] = C.WRITE_SUB | cmd
-        if offset < 128:
-            header[1] = offset
-            headerLen = headerLen + 1
-        else:
-            header[1] = (C.RW_SUB_EXT | offset) & C.MASK_LS_BYTE
-            header[2] = offset >> 7
-            headerLen = headerLen + 2
-
-    GPIO.output(_chipSelect, GPIO.LOW)
-    for i in range(0, headerLen):
-        spi.xfer([int(header[i])])
-
-    for i in range(0, dataSize):
-        if (data[i] != None):
-            spi.xfer([int(data[i])])
-
-    GPIO.output(_chipSelect, GPIO.HIGH)
+        buf[0] = rw | cmd
+        return 1
+    buf[0] = rw | C.READ_SUB | cmd
+    if offset < 128:
+        buf[1] = offset
+        return 2
+    buf[1] = (C.RW_SUB_EXT | offset) & C.MASK_LS_BYTE
+    buf[2] = offset >> 7
+    return 3
 
 
 def setBit(data, n, bit, val):
@@ -1391,7 +1940,7 @@ def setBit(data, n, bit, val):
     Returns:
             The modified array with the bit set according to the specified value.
     """
-    idx = bit / 8
+    idx = bit // 8
     if idx >= n:
         return
     shift = bit % 8
@@ -1416,12 +1965,10 @@ def getBit(data, n, pos):
     Returns:
             The bit in the array according to the position.
     """
-    idx = pos / 8
+    idx = pos // 8
     if idx >= n:
         return
-    shift = pos % 8
-    data[idx] = (data[idx] >> shift) & 0x01
-    return data[idx]
+    return (data[idx] >> (pos % 8)) & 0x01
 
 
 def setArray(data, size, value):
@@ -1454,25 +2001,6 @@ def writeValueToBytes(data, val, n):
     return data
 
 
-def readBytesOTP(address, data):
-    """
-    This function reads a value from the OTP memory following 6.3.3 table 13 of the user manual 
-
-    Args:
-            address: The address to read in the OTP register.
-            data: The data that will store the value read. 
-    """
-    addressBytes = [None] * 2
-    addressBytes[0] = address & C.MASK_LS_BYTE
-    addressBytes[1] = (address >> 8) & C.MASK_LS_BYTE
-    writeBytes(C.OTP_IF, C.OTP_ADDR_SUB, addressBytes, 2)
-    writeBytes(C.OTP_IF, C.OTP_CTRL_SUB, [C.OTP_STEP2], 1)
-    writeBytes(C.OTP_IF, C.OTP_CTRL_SUB, [C.OTP_STEP3], 1)
-    readBytes(C.OTP_IF, C.OTP_RDAT_SUB, data, 4)
-    writeBytes(C.OTP_IF, C.OTP_CTRL_SUB, [C.OTP_STEP5], 1)
-    return data
-
-
 def convertStringToByte(string):
     """
     This function converts the string address used for the EUI into a byte array.
@@ -1490,10 +2018,94 @@ def convertStringToByte(string):
     return data
 
 
-def close():
-    """
-    This function closes the SPI connection and clean up the GPIOs.
-    """
-    spi.close()
-    GPIO.cleanup()
-    print "\n Close SPI"
+"""
+Default radio
+The module level functions drive this instance so scripts using a single chip can keep calling DW1000.begin(), DW1000.setup(), etc.
+"""
+
+_defaultRadio = DW1000Radio()
+callbacks = _defaultRadio.callbacks
+begin = _defaultRadio.begin
+setup = _defaultRadio.setup
+handleInterrupt = _defaultRadio.handleInterrupt
+dispatchStatus = _defaultRadio.dispatchStatus
+registerCallback = _defaultRadio.registerCallback
+enableEventQueue = _defaultRadio.enableEventQueue
+pushEvent = _defaultRadio.pushEvent
+pollEvent = _defaultRadio.pollEvent
+getDroppedEventCount = _defaultRadio.getDroppedEventCount
+enableReplyDelayTuning = _defaultRadio.enableReplyDelayTuning
+getReplyDelay = _defaultRadio.getReplyDelay
+getLateTransmitCount = _defaultRadio.getLateTransmitCount
+softReset = _defaultRadio.softReset
+manageLDE = _defaultRadio.manageLDE
+setDefaultConfiguration = _defaultRadio.setDefaultConfiguration
+enableMode = _defaultRadio.enableMode
+newConfiguration = _defaultRadio.newConfiguration
+commitConfiguration = _defaultRadio.commitConfiguration
+setAntennaDelay = _defaultRadio.setAntennaDelay
+setEUI = _defaultRadio.setEUI
+setDeviceAddress = _defaultRadio.setDeviceAddress
+getDeviceAddress = _defaultRadio.getDeviceAddress
+setNetworkId = _defaultRadio.setNetworkId
+setChannel = _defaultRadio.setChannel
+setPreambleCode = _defaultRadio.setPreambleCode
+tune = _defaultRadio.tune
+generalConfiguration = _defaultRadio.generalConfiguration
+tuneAgcTune1 = _defaultRadio.tuneAgcTune1
+tuneDrxTune0b = _defaultRadio.tuneDrxTune0b
+tuneDrxTune1aAndldecfg2 = _defaultRadio.tuneDrxTune1aAndldecfg2
+tuneDrxtune1b = _defaultRadio.tuneDrxtune1b
+tuneDrxTune2 = _defaultRadio.tuneDrxTune2
+tuneAccToChan = _defaultRadio.tuneAccToChan
+tunelderepc = _defaultRadio.tunelderepc
+enableClock = _defaultRadio.enableClock
+setBusSpeed = _defaultRadio.setBusSpeed
+setSpiSpeed = _defaultRadio.setSpiSpeed
+lowerSpiSpeed = _defaultRadio.lowerSpiSpeed
+isPllLocked = _defaultRadio.isPllLocked
+getSpiSpeed = _defaultRadio.getSpiSpeed
+checkLink = _defaultRadio.checkLink
+idle = _defaultRadio.idle
+newReceive = _defaultRadio.newReceive
+startReceive = _defaultRadio.startReceive
+receivePermanently = _defaultRadio.receivePermanently
+enableDoubleBuffer = _defaultRadio.enableDoubleBuffer
+enableFrameFiltering = _defaultRadio.enableFrameFiltering
+enableAutoAck = _defaultRadio.enableAutoAck
+resetReceiver = _defaultRadio.resetReceiver
+toggleHostBuffer = _defaultRadio.toggleHostBuffer
+syncBufferPointers = _defaultRadio.syncBufferPointers
+isReceiveFailed = _defaultRadio.isReceiveFailed
+isReceiveTimeout = _defaultRadio.isReceiveTimeout
+readStatus = _defaultRadio.readStatus
+clearReceiveStatus = _defaultRadio.clearReceiveStatus
+writeStatus = _defaultRadio.writeStatus
+readRxDiagnostics = _defaultRadio.readRxDiagnostics
+readCarrierIntegrator = _defaultRadio.readCarrierIntegrator
+getClockOffset = _defaultRadio.getClockOffset
+enableClockOffset = _defaultRadio.enableClockOffset
+getFirstPathPower = _defaultRadio.getFirstPathPower
+getReceivePower = _defaultRadio.getReceivePower
+getReceiveQuality = _defaultRadio.getReceiveQuality
+getReceiveTimestamp = _defaultRadio.getReceiveTimestamp
+correctTimestamp = _defaultRadio.correctTimestamp
+newTransmit = _defaultRadio.newTransmit
+startTransmit = _defaultRadio.startTransmit
+isTransmitLate = _defaultRadio.isTransmitLate
+clearLateStatus = _defaultRadio.clearLateStatus
+clearTransmitStatus = _defaultRadio.clearTransmitStatus
+setDelay = _defaultRadio.setDelay
+transmitAt = _defaultRadio.transmitAt
+setDelayedTimestamp = _defaultRadio.setDelayedTimestamp
+clearAllStatus = _defaultRadio.clearAllStatus
+getTransmitTimestamp = _defaultRadio.getTransmitTimestamp
+getDataStr = _defaultRadio.getDataStr
+getData = _defaultRadio.getData
+setDataStr = _defaultRadio.setDataStr
+setData = _defaultRadio.setData
+getDeviceModeInfo = _defaultRadio.getDeviceModeInfo
+readBytes = _defaultRadio.readBytes
+writeBytes = _defaultRadio.writeBytes
+readBytesOTP = _defaultRadio.readBytesOTP
+close = _defaultRadio.close
@@ -0,0 +1,111 @@
+"""
+This python module provides an asyncio interface to a DW1000Radio, so applications await frames instead of polling flags in a busy loop
+and can run other asyncio tasks (e.g. an HTTP server) in the same process. It requires Python 3 and the following modules: asyncio, DW1000.
+
+The interrupt handler may run in another thread (RPi.GPIO dispatches the callbacks from its own thread): the frame payload and its
+timestamps are read there, right after the interrupt, and handed to the event loop with loop.call_soon_threadsafe(). The AsyncRadio is
+built in the coroutines' loop, from a running coroutine or with the loop argument.
+
+Usage:
+        radio = DW1000.DW1000Radio()
+        radio.begin(PIN_IRQ)
+        radio.setup(PIN_SS)
+        radio.generalConfiguration("7D:00:22:EA:82:60:3B:9C", C.MODE_LONGDATA_RANGE_LOWPOWER)
+
+        async def main():
+            asyncRadio = DW1000Async.AsyncRadio(radio)
+            asyncRadio.startReceiving()
+            frame = await asyncRadio.receive()
+            txTimestamp = await asyncRadio.transmit([1, 2, 3], at=frame.timestamp + replyDelay)    # None if late
+
+        asyncio.run(main())
+"""
+
+import asyncio
+from collections import namedtuple
+
+# A received frame: its payload (without CRC), its bias corrected receive timestamp and its RxDiagnostics.
+ReceivedFrame = namedtuple("ReceivedFrame", ["data", "timestamp", "diagnostics"])
+
+
+class AsyncRadio(object):
+    """
+    Asyncio front end of a DW1000Radio. It registers the radio's handleSent and handleReceived callbacks.
+    """
+
+    def __init__(self, radio, loop=None):
+        """
+        Args:
+                radio: The configured DW1000Radio (or the DW1000 module for the default radio).
+                loop: The event loop running the coroutines, the results are delivered to it. The running loop by default: without the
+                      argument, the AsyncRadio must be built from a coroutine (RuntimeError otherwise).
+        """
+        self.radio = radio
+        self.loop = loop if loop is not None else asyncio.get_running_loop()
+        self._received = asyncio.Queue()
+        self._sent = None
+        self._transmitLock = asyncio.Lock()
+        radio.registerCallback("handleSent", self._handleSent)
+        radio.registerCallback("handleReceived", self._handleReceived)
+
+    def _handleSent(self):
+        """
+        Callback of the interrupt handler: reads the TX timestamp and resolves the pending transmit().
+        """
+        txTimestamp = self.radio.getTransmitTimestamp()
+        self.loop.call_soon_threadsafe(self._resolveSent, txTimestamp)
+
+    def _resolveSent(self, txTimestamp):
+        if self._sent is not None and not self._sent.done():
+            self._sent.set_result(txTimestamp)
+
+    def _handleReceived(self):
+        """
+        Callback of the interrupt handler: reads the frame and its diagnostics and queues them for receive().
+        """
+        diagnostics = self.radio.readRxDiagnostics()
+        data = self.radio.getData(max(diagnostics.frameLength - 2, 0))
+        frame = ReceivedFrame(data, self.radio.getReceiveTimestamp(diagnostics), diagnostics)
+        self.loop.call_soon_threadsafe(self._received.put_nowait, frame)
+
+    def startReceiving(self):
+        """
+        This function turns the receiver on permanently.
+        """
+        self.radio.newReceive()
+        self.radio.receivePermanently()
+        self.radio.startReceive()
+
+    async def receive(self):
+        """
+        This coroutine waits for the next received frame.
+
+        Returns:
+                A ReceivedFrame.
+        """
+        return await self._received.get()
+
+    async def transmit(self, data, at=None):
+        """
+        This coroutine sends a frame and waits until it has been transmitted. Transmissions are serialized.
+
+        Args:
+                data: The payload bytes.
+                at: The system time at which the frame is sent (delayed transmission), immediately if None.
+
+        Returns:
+                The TX timestamp of the frame, None if the delayed transmission was late: its time had already passed, so it was aborted.
+        """
+        async with self._transmitLock:
+            self._sent = self.loop.create_future()
+            try:
+                self.radio.newTransmit()
+                self.radio.setData(data, len(data))
+                if at is not None:
+                    self.radio.setDelayedTimestamp(at)
+                if not self.radio.startTransmit():
+                    # no transmit done event will come
+                    return None
+                return await self._sent
+            finally:
+                self._sent = None
@@ -0,0 +1,167 @@
+"""
+This python module contains the bus backends used by the DW1000 module to talk to the chip. A backend performs the SPI transactions
+(chip select included) and delivers the rising edges of the interrupt line to the module's interrupt handler. It may also sample the
+level of the line (interruptAsserted), which spares the handler a SYS_STATUS read, and set the SPI clock frequency of a chip (setSpeed).
+SpiBus is the Raspberry Pi backend, it requires the spidev and RPi.GPIO modules. See DW1000Simulator for an in-process backend.
+A backend can be shared by several DW1000Radio instances, each one using its own chip select and interrupt pin.
+"""
+
+import threading
+
+try:
+    import spidev
+    import RPi.GPIO as GPIO
+except ImportError:
+    spidev = None
+    GPIO = None
+
+
+class SpiBus(object):
+    """
+    Backend using the spidev linux kernel driver for the SPI transactions and RPi.GPIO for the chip select and the interrupt line.
+    Normally, spidev can auto enable chip select when necessary. However, in our case, the dw1000's chip select is connected to a GPIO
+    so we have to enable/disable it manually. The transactions are serialized with a lock so several radios can share the bus.
+    With gpioChipSelect False, the chip select is the one of the SPI device and RPi.GPIO is not used: the interrupts must then be handled
+    by another backend, see DW1000Interrupt.LineEventBus.
+    """
+
+    def __init__(self, bus=0, device=0, speed=2000000, gpioChipSelect=True):
+        """
+        Args:
+                bus: The SPI bus number.
+                device: The SPI device (hardware chip select) number.
+                speed: The SPI clock frequency in Hz of the chips without their own one (see setSpeed), safe for a chip which is not
+                       initialized yet.
+                gpioChipSelect: True to drive the chip select of the DW1000 with a GPIO, False to use the SPI device's one.
+        """
+        self.bus = bus
+        self.device = device
+        self.speed = speed
+        self.speeds = {}
+        self.gpioChipSelect = gpioChipSelect
+        self.spi = None
+        self.lock = threading.Lock()
+        self._users = 0
+        self._writeBurst = None
+        self._currentSpeed = None
+
+    def open(self):
+        """
+        This function opens the SPI connection and configures the GPIO numbering. Only the first call opens the connection.
+        """
+        self._users += 1
+        if self.spi is not None:
+            return
+        if spidev is None or (GPIO is None and self.gpioChipSelect):
+            raise ImportError("SpiBus requires the spidev and RPi.GPIO modules")
+        if self.gpioChipSelect:
+            GPIO.setwarnings(False)
+            GPIO.setmode(GPIO.BCM)
+        self.spi = spidev.SpiDev()
+        self.spi.open(self.bus, self.device)
+        self.spi.max_speed_hz = self._currentSpeed = self.speed
+        # writebytes2 (spidev >= 3.3) sends a buffer without reading back, older versions fall back to xfer2.
+        self._writeBurst = getattr(self.spi, "writebytes2", None)
+
+    def setupInterrupt(self, irq, callback):
+        """
+        This function sets up the interrupt detection event on the rising edge of the interrupt pin.
+
+        Args:
+                irq: The GPIO pin number managing interrupts.
+                callback: The function called with the pin number on every rising edge.
+        """
+        GPIO.setup(irq, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+        GPIO.add_event_detect(irq, GPIO.RISING, callback=callback)
+
+    def interruptAsserted(self, irq):
+        """
+        This function samples the interrupt line, without any SPI transaction.
+
+        Args:
+                irq: The GPIO pin number managing interrupts.
+
+        Returns:
+                True if the line is high, i.e. an unmasked event is pending in SYS_STATUS.
+        """
+        return GPIO.input(irq) == GPIO.HIGH
+
+    def setupChipSelect(self, ss):
+        """
+        This function configures the chip select GPIO as an output and sets its initial state at inactive (HIGH).
+
+        Args:
+                ss: The GPIO pin number of the chip enable/select for the SPI bus.
+        """
+        if not self.gpioChipSelect:
+            return
+        GPIO.setup(ss, GPIO.OUT)
+        GPIO.output(ss, GPIO.HIGH)
+
+    def setSpeed(self, ss, speed):
+        """
+        This function sets the SPI clock frequency of the transactions with a chip. The chips sharing the bus may use different ones.
+
+        Args:
+                ss: The chip select pin of the chip.
+                speed: The SPI clock frequency in Hz.
+        """
+        with self.lock:
+            self.speeds[ss] = speed
+
+    def _applySpeed(self, ss):
+        # called with the lock held, the frequency is only written to the driver when it changes
+        speed = self.speeds.get(ss, self.speed)
+        if speed != self._currentSpeed:
+            self.spi.max_speed_hz = self._currentSpeed = speed
+
+    def transfer(self, ss, data):
+        """
+        This function performs a full duplex SPI transaction.
+
+        Args:
+                ss: The chip select pin of the addressed chip.
+                data: The bytes to send.
+
+        Returns:
+                The bytes received, as many as were sent.
+        """
+        with self.lock:
+            self._applySpeed(ss)
+            if not self.gpioChipSelect:
+                return self.spi.xfer2(data)
+            GPIO.output(ss, GPIO.LOW)
+            rx = self.spi.xfer2(data)
+            GPIO.output(ss, GPIO.HIGH)
+        return rx
+
+    def write(self, ss, data):
+        """
+        This function performs a write only SPI transaction.
+
+        Args:
+                ss: The chip select pin of the addressed chip.
+                data: The bytes to send.
+        """
+        with self.lock:
+            self._applySpeed(ss)
+            if self.gpioChipSelect:
+                GPIO.output(ss, GPIO.LOW)
+            if self._writeBurst is not None:
+                self._writeBurst(data)
+            else:
+                self.spi.xfer2(data)
+            if self.gpioChipSelect:
+                GPIO.output(ss, GPIO.HIGH)
+
+    def close(self):
+        """
+        This function closes the SPI connection and cleans up the GPIOs once every user of the bus closed it.
+        """
+        self._users -= 1
+        if self._users > 0 or self.spi is None:
+            return
+        self.spi.close()
+        self.spi = None
+        if self.gpioChipSelect:
+            GPIO.cleanup()
@@ -9,6 +9,22 @@ READ_SUB = 0x40
 WRITE_SUB = 0xC0
 RW_SUB_EXT = 0x80
 JUNK = 0x00
+# SPI clock: at most 3 MHz while the chip runs on its crystal (INIT state, XTI clock), 20 MHz once the PLL is locked, see 2.3.2 of the
+# user manual
+SPI_SLOW_SPEED = 2000000
+SPI_FAST_SPEED = 20000000
+SPI_XTI_MAX_SPEED = 3000000
+# bytes of the transfer buffers of readBytes/writeBytes: the longest header (3 bytes) and the largest register burst, the 1024 bytes
+# of TX_BUFFER and RX_BUFFER. Longer accesses get a buffer of their own.
+SPI_HEADER_MAX_LEN = 3
+SPI_BUFFER_LEN = SPI_HEADER_MAX_LEN + 1024
+# the SPI clock is only raised once CPLOCK is set in SYS_STATUS, checked at most PLL_LOCK_CHECKS times PLL_LOCK_DELAY seconds apart
+PLL_LOCK_CHECKS = 10
+PLL_LOCK_DELAY = 0.00001
+# RIDTAG and model of DEV_ID, checked by the SPI link test, see DW1000.checkLink
+DEV_ID_TAG = 0xDECA01
+# values written into and read back from OTP_WDAT (a register without effect on the radio) by the SPI link test
+LINK_TEST_PATTERNS = (0x55AA00FF, 0xA55AFF00)
 
 # Delay
 INIT_DELAY = 0.000005
@@ -106,6 +122,7 @@ RX_FQUAL = 0x12
 RX_TIME = 0x15
 TX_TIME = 0x17
 TX_ANTD = 0x18
+ACK_RESP_T = 0x1A
 TX_POWER = 0x1E
 CHAN_CTRL = 0x1F
 USR_SFD = 0x21
@@ -121,11 +138,15 @@ PMSC = 0x36
 # Registers offset
 NO_SUB = 0xFF
 PMSC_CTRL0_SUB = 0x00
+PMSC_SOFTRESET_SUB = 0x03
 SFD_LENGTH_SUB = 0x00
 # OTP_IF subregisters
+OTP_WDAT_SUB = 0x00
 OTP_ADDR_SUB = 0x04
 OTP_CTRL_SUB = 0x06
 OTP_RDAT_SUB = 0x0A
+# ACK_RESP_T subregisters
+ACK_TIM_SUB = 0x03
 # AGC_CTRL subregisters
 AGC_TUNE1_SUB = 0x04
 AGC_TUNE2_SUB = 0x0C
@@ -136,6 +157,7 @@ DRX_TUNE1a_SUB = 0x04
 DRX_TUNE1b_SUB = 0x06
 DRX_TUNE2_SUB = 0x08
 DRX_TUNE4H_SUB = 0x26
+DRX_CAR_INT_SUB = 0x28
 # LDE_IF subregisters
 LDE_CFG1_SUB = 0x0806
 LDE_RXANTD_SUB = 0x1804
@@ -169,7 +191,11 @@ HIRQ_POL_BIT = 9
 RXM110K_BIT = 22
 RXAUTR_BIT = 29
 FFEN_BIT = 0
+FFBC_BIT = 1
+# frame type filter bits, FFAB_BIT + frame type: FFAB (beacon), FFAD (data), FFAA (acknowledgement), FFAM (MAC command)
+FFAB_BIT = 2
 DIS_STXP_BIT = 18
+AUTOACK_BIT = 30
 
 # System control register bits, see 7.2.15 of User Manual
 SFCST_BIT = 0
@@ -178,6 +204,7 @@ TXDLYS_BIT = 2
 TRXOFF_BIT = 6
 RXENAB_BIT = 8
 RXDLYE_BIT = 9
+HRBPT_BIT = 24
 
 # System event mask register bits, see 7.2.16 of User Manual
 MAAT_BIT = 3
@@ -189,13 +216,19 @@ MRXFCG_BIT = 14
 MRXFCE_BIT = 15
 MRXRFSL_BIT = 16
 MLDEERR_BIT = 18
+MRXOVRR_BIT = 20
 
 # System event status register bits, see 7.2.17 of User Manual
+CPLOCK_BIT = 1
+AAT_BIT = 3
 TXFRB_BIT = 4
 TXPRS_BIT = 5
 TXPHS_BIT = 6
 TXFRS_BIT = 7
+RXPRD_BIT = 8
+RXSFDD_BIT = 9
 LDEDONE_BIT = 10
+RXPHD_BIT = 11
 RXPHE_BIT = 12
 RXDFR_BIT = 13
 RXFCG_BIT = 14
@@ -203,8 +236,23 @@ RXFCE_BIT = 15
 RXRFSL_BIT = 16
 RXRFTO_BIT = 17
 LDEERR_BIT = 18
+RXOVRR_BIT = 20
 RXPTO_BIT = 21
+CLKPLL_LL_BIT = 25
 RXSFDTO_BIT = 26
+HPDWARN_BIT = 27
+AFFREJ_BIT = 29
+HSRBP_BIT = 30
+ICRBP_BIT = 31
+# SYS_STATUS events cleared together, see DW1000.handleInterrupt
+TX_STATUS_MASK = (1 << TXFRB_BIT) | (1 << TXPRS_BIT) | (1 << TXPHS_BIT) | (1 << TXFRS_BIT)
+RX_GOOD_STATUS_MASK = ((1 << RXPRD_BIT) | (1 << RXSFDD_BIT) | (1 << LDEDONE_BIT) | (1 << RXPHD_BIT) | (1 << RXDFR_BIT)
+                       | (1 << RXFCG_BIT))
+RX_ERROR_STATUS_MASK = (1 << RXPHE_BIT) | (1 << RXFCE_BIT) | (1 << RXRFSL_BIT) | (1 << LDEERR_BIT)
+RX_TIMEOUT_STATUS_MASK = (1 << RXRFTO_BIT) | (1 << RXPTO_BIT) | (1 << RXSFDTO_BIT)
+RX_STATUS_MASK = RX_GOOD_STATUS_MASK | RX_ERROR_STATUS_MASK | RX_TIMEOUT_STATUS_MASK | (1 << RXOVRR_BIT)
+# SYS_STATUS reads of one interrupt at most, the handler stops earlier once no unmasked event is pending
+MAX_INTERRUPT_PASSES = 16
 
 # Channel control register bits, see 7.2.32 of user manual
 DWSFD_BIT = 17
@@ -220,6 +268,7 @@ ENABLE_CLOCK_MASK2 = 0xFC
 SOFT_RESET_SYSCLKS = 0x01
 SOFT_RESET_CLEAR = 0x00
 SOFT_RESET_SET = 0xF0
+SOFT_RESET_RX = 0xE0
 # Register access operations to load LDE microcode, see table 4 in 2.5.5.10 of the user manual
 LDE_L1STEP1 = 0x01
 LDE_L1STEP2 = 0x03
@@ -252,6 +301,8 @@ SET_DELAY_MASK = 0xFE
 
 # get data masks
 GET_DATA_MASK = 0x03FF
+# RX_FINFO preamble accumulation count (RXPACC) mask, see 7.2.18 of the user manual
+RXPACC_MASK = 0x0FFF
 
 # set data masks
 SET_DATA_MASK1 = 0xE0
@@ -380,6 +431,17 @@ FC_2 = 0x8C
 FC_2_SHORT = 0x88
 PAN_ID_1 = 0xCA
 PAN_ID_2 = 0xDE
+PAN_ID = (PAN_ID_2 << 8) | PAN_ID_1
+# broadcast PAN ID, accepted by every device
+BROADCAST_PAN_ID = 0xFFFF
+
+# IEEE 802.15.4 frame types, see DW1000.enableFrameFiltering
+FRAME_TYPE_BEACON = 0
+FRAME_TYPE_DATA = 1
+FRAME_TYPE_ACK = 2
+FRAME_TYPE_MAC_COMMAND = 3
+# preamble symbols between the end of a frame requesting an acknowledgement and the automatic acknowledgement, see DW1000.enableAutoAck
+ACK_TURNAROUND = 3
 
 # Frame length
 LONG_MAC_LEN = 15
@@ -391,10 +453,32 @@ POLL_ACK = 1
 RANGE = 2
 RANGE_REPORT = 3
 BLINK = 4
+SYNC = 5
 RANGE_FAILED = 255
+# short address of the messages sent to every device
+BROADCAST_ADDRESS = 0xFFFF
+
+# Ranging protocols, see DW1000Ranging
+SS_TWR = 0
+DS_TWR_3 = 1
+DS_TWR_4 = 2
 
 RESET_PERIOD = 200
 
+# Radio events, see DW1000.enableEventQueue
+EVENT_SENT = 0
+EVENT_RECEIVED = 1
+EVENT_QUEUE_SIZE = 16
+# longest wait of the scripts' main loops for an event, in seconds: their schedules have a millisecond resolution
+EVENT_WAIT = 0.001
+
+# Reply delay tuning, see DW1000.enableReplyDelayTuning: target probability of a late transmission, number of latencies kept, number of
+# latencies needed before tuning and margin added to the measured latency, in microseconds
+LATE_TX_PROBABILITY = 0.01
+LATENCY_WINDOW = 200
+LATENCY_MIN_SAMPLES = 20
+REPLY_DELAY_MARGIN = 100
+
 # Bits/Bytes operation
 MASK_LS_BYTE = 0xFF
 MASK_LS_2BITS = 0x03
@@ -415,6 +499,13 @@ ADJUSTMENT_TIME_FACTOR = 0.001
 DISTANCE_OF_RADIO = 0.0046917639786159
 DISTANCE_OF_RADIO_INV = 213.139451293
 SPEED_OF_LIGHT = 3e8
+# Clock offset from the carrier integrator (DRX_CAR_INT, 21 bits signed): frequency offset in Hz per unit of the integrator, for 850 kb/s
+# and 6.8 Mb/s then for 110 kb/s, and carrier frequency in Hz of each channel.
+DRX_CAR_INT_MASK = 0x1FFFFF
+DRX_CAR_INT_SIGN = 0x100000
+FREQ_OFFSET_MULTIPLIER = 998.4e6 / 2.0 / 1024.0 / 131072.0
+FREQ_OFFSET_MULTIPLIER_110KBPS = 998.4e6 / 2.0 / 8192.0 / 131072.0
+CARRIER_FREQUENCY = [0, 3494.4e6, 3993.6e6, 4492.8e6, 3993.6e6, 6489.6e6, 0, 6489.6e6]
 
 
 # Operation mode bits
@@ -1,11 +1,13 @@
-import DW1000
+
+import DW1000Ranging
+import DW1000Constants as C
 TAG     = 0
 ANCHOR  = 1
 class DW1000Device:
     def __init__(self, address, type_of_tag):
         self.address                = address
         self.type                   = type_of_tag
-        self.is_inactive            = False
+        self.inactive               = False
         self.timePollSent           = 0
         self.timeRangeSent          = 0
         self.timePollAckReceived    = 0
@@ -13,23 +15,33 @@ class DW1000Device:
         self.timePollReceived       = 0
         self.timeRangeReceived      = 0
         self.sequenceNumber         = 0
+        self.expectedMsgId          = None
+        self.protocolFailed         = False
+        self.protocol               = C.DS_TWR_4
+        # reply slot of the anchor in a broadcast exchange, None in a one to one exchange
+        self.slot                   = None
+        # value of millis() when the device was last heard of
+        self.lastActivity           = 0
+        # last distance to the device in meters, None if the last ranging exchange failed
+        self.range                  = None
+        # the anchor answered the last RANGE with a RANGE_FAILED: its RangeFilter rejected the range or the exchange failed on its side
+        self.rangeFailed            = False
+        # filter of the ranges to the device
+        self.rangeFilter            = DW1000Ranging.RangeFilter()
 
     def getRange(self):
         assert self.type == TAG, "Tags are not equipped to find distance from anchors"
-        round1 = DW1000.wrapTimestamp(self.timePollAckReceived - self.timePollSent)
-        reply1 = DW1000.wrapTimestamp(self.timePollAckSent - self.timePollReceived)
-        round2 = DW1000.wrapTimestamp(self.timeRangeReceived - self.timePollAckSent)
-        reply2 = DW1000.wrapTimestamp(self.timeRangeSent - timePollAckReceived)
-        return (round1 * round2 - reply1 * reply2) / (round1 + round2 + reply1 + reply2)
+        return DW1000Ranging.computeRangeAsymmetric(self.timePollSent, self.timePollReceived, self.timePollAckSent, self.timePollAckReceived,
+                                                    self.timeRangeSent, self.timeRangeReceived)
 
     def is_inactive(self):
-        return is_inactive
+        return self.inactive
 
     def activate(self):
-        self.is_inactive = False
+        self.inactive = False
 
     def deactivate(self):
-        self.is_inactive = True
+        self.inactive = True
 
     def incrementSequenceNumber(self):
         self.sequenceNumber += 1
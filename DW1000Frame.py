@@ -0,0 +1,219 @@
+"""
+This python module encodes and decodes the IEEE 802.15.4 data frames exchanged by the RangingTAG and RangingAnchor scripts.
+It requires the following modules: struct, DW1000Constants.
+
+A frame is a MAC header followed by a ranging message, the FCS being appended by the chip:
+        frame control (2 bytes): data frame, PAN ID compression, acknowledgement request, short or long (EUI-64) destination and source
+                                 addresses
+        sequence number (1 byte)
+        destination PAN ID (2 bytes)
+        destination address, then source address (2 or 8 bytes each)
+        message id (1 byte), C.POLL, C.POLL_ACK, C.RANGE, C.RANGE_REPORT or C.RANGE_FAILED, and its fields:
+            C.POLL: ranging protocol (1 byte), number of anchors (1 byte) and their short addresses, listed by a broadcast POLL only
+            C.POLL_ACK: POLL receive and POLL_ACK transmit timestamps
+            C.RANGE: POLL and RANGE transmit timestamps, number of anchors (1 byte) and the POLL_ACK receive timestamp of each of them,
+                     in the order of the broadcast POLL (0 if not received)
+            C.RANGE_REPORT: time of flight, a negative one (bias correction at short range) being sent as 0
+            C.RANGE_FAILED: no field
+The timestamps take 5 bytes, all values are little endian.
+
+A RangingFrame is encoded into its own preallocated bytearray, and decoded from the received bytes, with precompiled structs: there is no
+intermediate list. For example:
+        frame = DW1000Frame.RangingFrame(tagAddress)
+        frame.destination = anchorAddress
+        frame.protocol = C.DS_TWR_4
+        DW1000.setData(frame.buffer, frame.encode(C.POLL))
+"""
+
+import struct
+import DW1000Constants as C
+
+FRAME_TYPE_MASK = 0x0007
+ACK_REQUEST = 0x0020
+PAN_ID_COMPRESSION = 0x0040
+DESTINATION_MODE_SHIFT = 10
+SOURCE_MODE_SHIFT = 14
+SHORT_ADDRESS = 2
+LONG_ADDRESS = 3
+# aMaxPHYPacketSize without the FCS
+MAX_FRAME_LENGTH = 125
+# largest time of flight of a C.RANGE_REPORT, the field is unsigned
+MAX_TIME_OF_FLIGHT = C.TIME_OVERFLOW - 1
+
+_header = struct.Struct("<HBH")
+_short = struct.Struct("<H")
+_long = struct.Struct("<Q")
+_timestamp = struct.Struct("<IB")
+_byte = struct.Struct("<B")
+_pollHeader = struct.Struct("<BBB")
+_pollAck = struct.Struct("<BIBIB")
+_rangeHeader = struct.Struct("<BIBIBB")
+_report = struct.Struct("<BIB")
+_addressLength = {SHORT_ADDRESS: 2, LONG_ADDRESS: 8}
+
+
+class RangingFrame(object):
+    """
+    A ranging message in an IEEE 802.15.4 data frame. The fields of the message are attributes, the ones a message does not carry keep their
+    last value: messageId, sequence, panId, source, destination, protocol (C.POLL), anchors (short addresses, broadcast C.POLL),
+    timePollReceived and timePollAckSent (C.POLL_ACK), timePollSent, timeRangeSent and timePollAckReceived (one per anchor, C.RANGE),
+    timeOfFlight (C.RANGE_REPORT).
+    """
+
+    def __init__(self, source, longAddresses=False, panId=C.PAN_ID):
+        """
+        Args:
+                source: The address of the device, short or EUI-64.
+                longAddresses: True to send the EUI-64 addresses of the devices, the short ones otherwise. A broadcast destination is always
+                               short.
+                panId: The PAN ID of the network, see DW1000.generalConfiguration.
+        """
+        self.buffer = bytearray(MAX_FRAME_LENGTH)
+        self.length = 0
+        self.source = source
+        self.destination = C.BROADCAST_ADDRESS
+        self.addressMode = LONG_ADDRESS if longAddresses else SHORT_ADDRESS
+        self.panId = panId
+        # request an acknowledgement from the destination, see DW1000.enableAutoAck
+        self.ackRequest = False
+        self.sequence = 0
+        self.messageId = None
+        self.protocol = C.DS_TWR_4
+        self.anchors = []
+        self.timePollSent = 0
+        self.timePollReceived = 0
+        self.timePollAckSent = 0
+        self.timePollAckReceived = []
+        self.timeRangeSent = 0
+        self.timeOfFlight = 0
+
+    def encode(self, messageId):
+        """
+        This function encodes a message into the buffer of the frame, with the current sequence number.
+
+        Args:
+                messageId: The message to send.
+
+        Returns:
+                The length of the frame, see DW1000.setData.
+        """
+        self.messageId = messageId
+        buffer = self.buffer
+        destinationMode = SHORT_ADDRESS if self.destination == C.BROADCAST_ADDRESS else self.addressMode
+        frameControl = (C.FRAME_TYPE_DATA | PAN_ID_COMPRESSION | (destinationMode << DESTINATION_MODE_SHIFT)
+                        | (self.addressMode << SOURCE_MODE_SHIFT))
+        if self.ackRequest and self.destination != C.BROADCAST_ADDRESS:
+            frameControl |= ACK_REQUEST
+        _header.pack_into(buffer, 0, frameControl, self.sequence & C.MASK_LS_BYTE, self.panId)
+        offset = _header.size
+        offset = _packAddress(buffer, offset, destinationMode, self.destination)
+        offset = _packAddress(buffer, offset, self.addressMode, self.source)
+
+        if messageId == C.POLL:
+            _pollHeader.pack_into(buffer, offset, messageId, self.protocol, len(self.anchors))
+            offset += _pollHeader.size
+            for address in self.anchors:
+                _short.pack_into(buffer, offset, address)
+                offset += 2
+        elif messageId == C.POLL_ACK:
+            _pollAck.pack_into(buffer, offset, messageId, self.timePollReceived & 0xFFFFFFFF, (self.timePollReceived >> 32) & 0xFF,
+                               self.timePollAckSent & 0xFFFFFFFF, (self.timePollAckSent >> 32) & 0xFF)
+            offset += _pollAck.size
+        elif messageId == C.RANGE:
+            _rangeHeader.pack_into(buffer, offset, messageId, self.timePollSent & 0xFFFFFFFF, (self.timePollSent >> 32) & 0xFF,
+                                   self.timeRangeSent & 0xFFFFFFFF, (self.timeRangeSent >> 32) & 0xFF, len(self.timePollAckReceived))
+            offset += _rangeHeader.size
+            for timestamp in self.timePollAckReceived:
+                _timestamp.pack_into(buffer, offset, timestamp & 0xFFFFFFFF, (timestamp >> 32) & 0xFF)
+                offset += 5
+        elif messageId == C.RANGE_REPORT:
+            timeOfFlight = min(max(int(self.timeOfFlight), 0), MAX_TIME_OF_FLIGHT)
+            _report.pack_into(buffer, offset, messageId, timeOfFlight & 0xFFFFFFFF, timeOfFlight >> 32)
+            offset += _report.size
+        else:
+            _byte.pack_into(buffer, offset, messageId)
+            offset += 1
+        self.length = offset
+        return offset
+
+    def decode(self, data):
+        """
+        This function decodes a received frame into the fields of the message.
+
+        Args:
+                data: The received bytes, without the FCS, a bytearray or bytes (a list is converted).
+
+        Returns:
+                True if the frame is a valid ranging message, False otherwise (the fields are then undefined).
+        """
+        if isinstance(data, list):
+            data = bytearray(data)
+        length = len(data)
+        if length < _header.size:
+            return False
+        frameControl, self.sequence, self.panId = _header.unpack_from(data, 0)
+        if frameControl & FRAME_TYPE_MASK != C.FRAME_TYPE_DATA:
+            return False
+        destinationMode = (frameControl >> DESTINATION_MODE_SHIFT) & 0x03
+        sourceMode = (frameControl >> SOURCE_MODE_SHIFT) & 0x03
+        if destinationMode not in _addressLength or sourceMode not in _addressLength:
+            return False
+        # the source PAN ID is only present without PAN ID compression
+        sourcePanLength = 0 if frameControl & PAN_ID_COMPRESSION else 2
+        offset = _header.size
+        if offset + _addressLength[destinationMode] + sourcePanLength + _addressLength[sourceMode] + 1 > length:
+            return False
+        self.destination, offset = _unpackAddress(data, offset, destinationMode)
+        offset += sourcePanLength
+        self.source, offset = _unpackAddress(data, offset, sourceMode)
+
+        messageId = self.messageId = data[offset]
+        if messageId == C.POLL:
+            if offset + _pollHeader.size > length:
+                return False
+            _, self.protocol, count = _pollHeader.unpack_from(data, offset)
+            offset += _pollHeader.size
+            if offset + 2 * count > length:
+                return False
+            self.anchors = [_short.unpack_from(data, offset + 2 * i)[0] for i in range(count)]
+        elif messageId == C.POLL_ACK:
+            if offset + _pollAck.size > length:
+                return False
+            _, low, high, low2, high2 = _pollAck.unpack_from(data, offset)
+            self.timePollReceived = low | (high << 32)
+            self.timePollAckSent = low2 | (high2 << 32)
+        elif messageId == C.RANGE:
+            if offset + _rangeHeader.size > length:
+                return False
+            _, low, high, low2, high2, count = _rangeHeader.unpack_from(data, offset)
+            self.timePollSent = low | (high << 32)
+            self.timeRangeSent = low2 | (high2 << 32)
+            offset += _rangeHeader.size
+            if offset + 5 * count > length:
+                return False
+            timestamps = self.timePollAckReceived = []
+            for i in range(count):
+                low, high = _timestamp.unpack_from(data, offset + 5 * i)
+                timestamps.append(low | (high << 32))
+        elif messageId == C.RANGE_REPORT:
+            if offset + _report.size > length:
+                return False
+            _, low, high = _report.unpack_from(data, offset)
+            self.timeOfFlight = low | (high << 32)
+        elif messageId != C.RANGE_FAILED:
+            return False
+        return True
+
+
+def _packAddress(buffer, offset, mode, address):
+    if mode == SHORT_ADDRESS:
+        _short.pack_into(buffer, offset, address)
+        return offset + 2
+    _long.pack_into(buffer, offset, address)
+    return offset + 8
+
+
+def _unpackAddress(data, offset, mode):
+    if mode == SHORT_ADDRESS:
+        return _short.unpack_from(data, offset)[0], offset + 2
+    return _long.unpack_from(data, offset)[0], offset + 8
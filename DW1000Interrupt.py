@@ -0,0 +1,349 @@
+"""
+This python module contains an interrupt backend waiting for the edges of the DW1000's IRQ line on a Linux GPIO character device
+(/dev/gpiochipN) with epoll, instead of the callback thread of RPi.GPIO. It works on any board whose GPIOs are exposed by the kernel, the
+interrupt handler runs where the application wants it (a dedicated thread, its main loop or an asyncio event loop), and the latency between
+the edge, timestamped by the kernel, and the handler is measured.
+It requires the following modules: errno, fcntl, os, selectors (Python 3), struct, threading, time.
+
+LineEventBus wraps a bus backend, which keeps doing the SPI transactions, and replaces its interrupt handling:
+        bus = DW1000Interrupt.LineEventBus(DW1000Bus.SpiBus(gpioChipSelect=False), "/dev/gpiochip0")
+        DW1000.begin(PIN_IRQ, bus)    # the offset of the IRQ line on the GPIO chip
+        DW1000.setup(PIN_SS)
+        bus.start()                   # or bus.poll() from the main loop, or bus.attach(asyncioLoop)
+PipeLine is a stand-in for a GPIO line in tests: its edges are raised with trigger(), e.g. from a simulated chip.
+The edge timestamps are read from CLOCK_MONOTONIC, the clock of the line events since Linux 5.7.
+"""
+
+import errno
+import fcntl
+import os
+import struct
+import threading
+import time
+from collections import deque
+
+try:
+    import selectors
+except ImportError:
+    selectors = None
+
+DEFAULT_CHIP = "/dev/gpiochip0"
+CONSUMER = b"DW1000 IRQ"
+# latencies kept by a LineEventBus
+LATENCY_HISTORY = 1000
+# edges read at once from a line
+EVENT_BATCH = 16
+
+# GPIO character device ABI v1, see linux/gpio.h
+GPIOHANDLE_REQUEST_INPUT = 1 << 0
+GPIOEVENT_REQUEST_RISING_EDGE = 1 << 0
+GPIOEVENT_EVENT_RISING_EDGE = 0x01
+# _IOWR(0xB4, 0x04, struct gpioevent_request) and _IOWR(0xB4, 0x08, struct gpiohandle_data)
+GPIO_GET_LINEEVENT_IOCTL = 0xC030B404
+GPIOHANDLE_GET_LINE_VALUES_IOCTL = 0xC040B408
+
+_eventRequest = struct.Struct("<III32si")
+_eventData = struct.Struct("<QI4x")
+_monotonic = getattr(time, "monotonic", time.time)
+
+
+def _requireSelectors():
+    if selectors is None:
+        raise ImportError("DW1000Interrupt requires the selectors module (Python 3)")
+
+
+def _readEdges(fd):
+    """
+    This function reads the pending events of a line file descriptor, without blocking.
+
+    Returns:
+            The timestamps of the rising edges, in seconds of CLOCK_MONOTONIC.
+    """
+    try:
+        data = os.read(fd, _eventData.size * EVENT_BATCH)
+    except OSError as e:
+        if e.errno == errno.EAGAIN:
+            return []
+        raise
+    edges = []
+    for offset in range(0, len(data) - _eventData.size + 1, _eventData.size):
+        timestamp, eventId = _eventData.unpack_from(data, offset)
+        if eventId == GPIOEVENT_EVENT_RISING_EDGE:
+            edges.append(timestamp * 1e-9)
+    return edges
+
+
+def _setNonBlocking(fd):
+    fcntl.fcntl(fd, fcntl.F_SETFL, fcntl.fcntl(fd, fcntl.F_GETFL) | os.O_NONBLOCK)
+
+
+class GpioLine(object):
+    """
+    Rising edge events of an input line of a GPIO character device.
+    """
+
+    def __init__(self, offset, chip=DEFAULT_CHIP, consumer=CONSUMER):
+        """
+        Args:
+                offset: The offset of the line on the GPIO chip.
+                chip: The path of the GPIO character device.
+                consumer: The label of the line's user, shown by gpioinfo.
+        """
+        chipFd = os.open(chip, os.O_RDONLY)
+        try:
+            request = bytearray(_eventRequest.pack(offset, GPIOHANDLE_REQUEST_INPUT, GPIOEVENT_REQUEST_RISING_EDGE, consumer, 0))
+            fcntl.ioctl(chipFd, GPIO_GET_LINEEVENT_IOCTL, request)
+        finally:
+            os.close(chipFd)
+        self.fd = _eventRequest.unpack(bytes(request))[4]
+        _setNonBlocking(self.fd)
+
+    def fileno(self):
+        return self.fd
+
+    def readEdges(self):
+        """
+        This function reads the pending edges of the line.
+
+        Returns:
+                Their timestamps, in seconds of CLOCK_MONOTONIC.
+        """
+        return _readEdges(self.fd)
+
+    def isHigh(self):
+        """
+        This function reads the level of the line.
+        """
+        values = bytearray(64)
+        fcntl.ioctl(self.fd, GPIOHANDLE_GET_LINE_VALUES_IOCTL, values)
+        return values[0] != 0
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PipeLine(object):
+    """
+    Stand-in for a GpioLine in tests: trigger() writes a rising edge event into a pipe, in the format of the GPIO character device.
+    """
+
+    def __init__(self, level=None):
+        """
+        Args:
+                level: A function returning the level of the simulated line, e.g. DW1000Simulator.interruptAsserted. Low if None.
+        """
+        self.fd, self._writeFd = os.pipe()
+        _setNonBlocking(self.fd)
+        self.level = level
+
+    def fileno(self):
+        return self.fd
+
+    def trigger(self, timestamp=None):
+        """
+        This function raises a rising edge.
+
+        Args:
+                timestamp: The time of the edge in seconds of CLOCK_MONOTONIC, now if None.
+        """
+        if timestamp is None:
+            timestamp = _monotonic()
+        os.write(self._writeFd, _eventData.pack(int(timestamp * 1e9), GPIOEVENT_EVENT_RISING_EDGE))
+
+    def readEdges(self):
+        """
+        This function reads the pending edges of the line.
+
+        Returns:
+                Their timestamps, in seconds of CLOCK_MONOTONIC.
+        """
+        return _readEdges(self.fd)
+
+    def isHigh(self):
+        return bool(self.level()) if self.level is not None else False
+
+    def close(self):
+        os.close(self.fd)
+        os.close(self._writeFd)
+
+
+class LineEventBus(object):
+    """
+    Bus backend forwarding the SPI transactions to another backend and dispatching the interrupts from the edge events of GPIO lines,
+    waited for with epoll. The handler of an interrupt is called once per batch of edges (the DW1000 handler loops while the line is high,
+    see DW1000Radio.handleInterrupt) from the thread dispatching the events: the one started by start(), the one calling poll(), or the
+    asyncio event loop given to attach().
+    """
+
+    def __init__(self, bus, chip=DEFAULT_CHIP, lineFactory=None, clock=_monotonic):
+        """
+        Args:
+                bus: The backend doing the SPI transactions, e.g. DW1000Bus.SpiBus.
+                chip: The path of the GPIO character device of the interrupt lines.
+                lineFactory: A function returning the line of an interrupt pin (e.g. a PipeLine), a GpioLine of chip by default.
+                clock: The clock of the edge timestamps, used to measure the latencies.
+        """
+        _requireSelectors()
+        self.bus = bus
+        self.chip = chip
+        self.lineFactory = lineFactory
+        self.clock = clock
+        self.latencies = deque(maxlen=LATENCY_HISTORY)
+        self.edges = 0
+        self._lines = {}
+        self._selector = None
+        self._wakeRead = self._wakeWrite = None
+        self._thread = None
+        self._running = False
+        self._loop = None
+        self._users = 0
+
+    def __getattr__(self, name):
+        # setupChipSelect, transfer, write... are the wrapped backend's ones
+        return getattr(self.bus, name)
+
+    def open(self):
+        """
+        This function opens the wrapped backend, and the selector waiting for the edges on the first call.
+        """
+        if self._selector is None:
+            self._selector = selectors.DefaultSelector()
+            self._wakeRead, self._wakeWrite = os.pipe()
+            self._selector.register(self._wakeRead, selectors.EVENT_READ, None)
+        self._users += 1
+        self.bus.open()
+
+    def setupInterrupt(self, irq, callback):
+        """
+        This function opens the line of the interrupt pin and registers its handler.
+
+        Args:
+                irq: The offset of the interrupt line on the GPIO chip.
+                callback: The function called with the pin number on every batch of rising edges.
+        """
+        line = self.lineFactory(irq) if self.lineFactory is not None else GpioLine(irq, self.chip)
+        self._lines[irq] = (line, callback)
+        self._selector.register(line.fileno(), selectors.EVENT_READ, irq)
+        if self._loop is not None:
+            self._loop.add_reader(line.fileno(), self.dispatch, irq)
+
+    def interruptAsserted(self, irq):
+        """
+        This function samples the interrupt line, without any SPI transaction.
+        """
+        return self._lines[irq][0].isHigh()
+
+    def dispatch(self, irq):
+        """
+        This function reads the pending edges of an interrupt line and calls its handler.
+
+        Args:
+                irq: The interrupt pin.
+
+        Returns:
+                True if the handler was called.
+        """
+        line, callback = self._lines[irq]
+        edges = line.readEdges()
+        if not edges:
+            return False
+        self.latencies.append(self.clock() - edges[0])
+        self.edges += len(edges)
+        callback(irq)
+        return True
+
+    def poll(self, timeout=0):
+        """
+        This function dispatches the interrupts whose edges are pending, waiting for one at most timeout seconds. Call it from the main
+        loop when neither start() nor attach() is used.
+
+        Args:
+                timeout: The maximum waiting time in seconds, 0 to return at once, None to wait for an interrupt.
+
+        Returns:
+                The number of interrupts dispatched.
+        """
+        count = 0
+        for key, _ in self._selector.select(timeout):
+            if key.data is None:
+                os.read(self._wakeRead, 64)
+            elif self.dispatch(key.data):
+                count += 1
+        return count
+
+    def start(self):
+        """
+        This function starts a dedicated thread dispatching the interrupts.
+        """
+        if self._thread is not None:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="DW1000Interrupt")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self):
+        while self._running:
+            self.poll(None)
+
+    def stop(self):
+        """
+        This function stops the thread started by start().
+        """
+        if self._thread is None:
+            return
+        self._running = False
+        os.write(self._wakeWrite, b"\0")
+        self._thread.join()
+        self._thread = None
+
+    def attach(self, loop):
+        """
+        This function dispatches the interrupts from an asyncio event loop (loop.add_reader), the handlers then run in the loop's thread.
+
+        Args:
+                loop: The asyncio event loop.
+        """
+        self._loop = loop
+        for irq, (line, _) in self._lines.items():
+            loop.add_reader(line.fileno(), self.dispatch, irq)
+
+    def detach(self):
+        """
+        This function stops dispatching the interrupts from the asyncio event loop given to attach().
+        """
+        if self._loop is None:
+            return
+        for line, _ in self._lines.values():
+            self._loop.remove_reader(line.fileno())
+        self._loop = None
+
+    def getLatencies(self):
+        """
+        This function returns the latencies between the last edges and the calls of their handlers.
+
+        Returns:
+                A list of latencies in seconds, the oldest first.
+        """
+        return list(self.latencies)
+
+    def close(self):
+        """
+        This function closes the wrapped backend. Once every user of the bus closed it, the dispatching stops and the lines and the
+        selector are closed.
+        """
+        self._users -= 1
+        self.bus.close()
+        if self._users > 0 or self._selector is None:
+            return
+        self.stop()
+        self.detach()
+        for line, _ in self._lines.values():
+            self._selector.unregister(line.fileno())
+            line.close()
+        self._lines = {}
+        self._selector.close()
+        os.close(self._wakeRead)
+        os.close(self._wakeWrite)
+        self._selector = None
+        self._wakeRead = self._wakeWrite = None
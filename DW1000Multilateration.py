@@ -0,0 +1,131 @@
+"""
+This python module computes position fixes from the ranges measured between the tags and anchors of known positions, in 2D or 3D.
+It requires the following module: numpy.
+
+The solver is vectorized over the tags: solvePositions() takes the ranges of N tags to A anchors as an (N, A) array and solves all of
+them at once, a linear least squares solution being refined by a few damped Gauss-Newton iterations. A missing range is NaN. For example:
+        anchors = [(0, 0), (10, 0), (0, 8), (10, 8)]
+        positions, residuals = DW1000Multilateration.solvePositions(anchors, ranges)
+With all the anchors in one plane (e.g. on the ceiling), both sides of the plane fit the ranges: pass initial positions on the right side,
+such as the previous fixes of the tags.
+"""
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+MAX_ITERATIONS = 10
+# meters, the iterations stop once every position moves less
+TOLERANCE = 1e-4
+# Levenberg-Marquardt damping of the Gauss-Newton steps, keeps them bounded when the geometry is degenerate
+DAMPING = 1e-6
+# meters, a tag closer to an anchor is considered at this distance to avoid a division by zero
+MIN_DISTANCE = 1e-6
+
+
+def _requireNumpy():
+    if numpy is None:
+        raise ImportError("DW1000Multilateration requires the numpy module")
+
+
+def linearPositions(anchorPositions, ranges):
+    """
+    This function computes the linear least squares positions of the tags: ||x||^2 - 2 * a.x + ||a||^2 = r^2 is linear in (x, ||x||^2).
+    It is the starting point of solvePositions().
+
+    Args:
+            anchorPositions: The (A, D) coordinates of the anchors, D being 2 or 3, in meters.
+            ranges: The (N, A) ranges of the tags to the anchors, in meters, NaN when missing.
+
+    Returns:
+            The (N, D) positions.
+    """
+    _requireNumpy()
+    anchors = numpy.asarray(anchorPositions, dtype=float)
+    ranges = numpy.atleast_2d(numpy.asarray(ranges, dtype=float))
+    valid = numpy.isfinite(ranges)
+    design = numpy.hstack((-2 * anchors, numpy.ones((len(anchors), 1))))
+    target = numpy.where(valid, ranges, 0.0) ** 2 - numpy.sum(anchors ** 2, axis=1)
+    weighted = valid[:, :, None] * design
+    normal = numpy.matmul(weighted.transpose(0, 2, 1), design)
+    rhs = numpy.einsum("nai,na->ni", weighted, target)
+    # the pseudo-inverse also copes with the singular systems (coplanar anchors, missing ranges)
+    solution = numpy.einsum("nij,nj->ni", numpy.linalg.pinv(normal), rhs)
+    return solution[:, :-1]
+
+
+def solvePositions(anchorPositions, ranges, initial=None, iterations=MAX_ITERATIONS, tolerance=TOLERANCE):
+    """
+    This function computes the positions of the tags minimizing the squared range errors.
+
+    Args:
+            anchorPositions: The (A, D) coordinates of the anchors, D being 2 or 3, in meters.
+            ranges: The (N, A) ranges of the tags to the anchors, in meters, NaN when missing.
+            initial: The (N, D) starting positions, e.g. the previous fixes, linearPositions() by default.
+            iterations: The maximum number of Gauss-Newton iterations.
+            tolerance: The step, in meters, below which a position is final.
+
+    Returns:
+            The (N, D) positions and the (N,) root mean square range residuals, in meters. Both are NaN for the tags with D ranges or less:
+            D circles (spheres) cross at two mirror positions, both fitting the ranges.
+    """
+    _requireNumpy()
+    anchors = numpy.asarray(anchorPositions, dtype=float)
+    ranges = numpy.atleast_2d(numpy.asarray(ranges, dtype=float))
+    valid = numpy.isfinite(ranges)
+    measured = numpy.where(valid, ranges, 0.0)
+    dimensions = anchors.shape[1]
+    if initial is None:
+        positions = linearPositions(anchors, ranges)
+    else:
+        positions = numpy.array(initial, dtype=float).reshape(len(ranges), dimensions)
+    damping = DAMPING * numpy.eye(dimensions)
+
+    # only the positions which still move are iterated
+    active = numpy.arange(len(ranges))
+    for _ in range(iterations):
+        if not len(active):
+            break
+        weights = valid[active]
+        delta = positions[active, None, :] - anchors
+        predicted = numpy.maximum(numpy.sqrt(numpy.sum(delta ** 2, axis=2)), MIN_DISTANCE)
+        jacobian = delta / predicted[:, :, None]
+        residual = numpy.where(weights, predicted - measured[active], 0.0)
+        weighted = weights[:, :, None] * jacobian
+        normal = numpy.matmul(weighted.transpose(0, 2, 1), jacobian) + damping
+        gradient = numpy.einsum("nad,na->nd", weighted, residual)
+        step = numpy.linalg.solve(normal, gradient[:, :, None])[:, :, 0]
+        positions[active] -= step
+        active = active[numpy.max(numpy.abs(step), axis=1) >= tolerance]
+
+    distances = numpy.sqrt(numpy.sum((positions[:, None, :] - anchors) ** 2, axis=2))
+    counts = numpy.sum(valid, axis=1)
+    squared = numpy.sum(numpy.where(valid, distances - measured, 0.0) ** 2, axis=1)
+    residuals = numpy.sqrt(squared / numpy.maximum(counts, 1))
+    solved = counts > dimensions
+    positions[~solved] = numpy.nan
+    residuals[~solved] = numpy.nan
+    return positions, residuals
+
+
+def solveRanges(anchorPositions, ranges, initial=None):
+    """
+    This function computes the position of one tag from its ranges keyed by anchor, as measured by the RangingTAG script.
+
+    Args:
+            anchorPositions: The coordinates of the anchors, by short address.
+            ranges: The ranges to the anchors, in meters, by short address. The anchors without a known position are ignored.
+            initial: The starting position, e.g. the previous fix.
+
+    Returns:
+            The position and the root mean square range residual, None if there are not enough ranges.
+    """
+    addresses = [address for address in ranges if address in anchorPositions]
+    if not addresses:
+        return None
+    anchors = [anchorPositions[address] for address in addresses]
+    if len(addresses) <= len(anchors[0]):
+        return None
+    positions, residuals = solvePositions(anchors, [[ranges[address] for address in addresses]], initial)
+    return positions[0], residuals[0]
@@ -0,0 +1,177 @@
+"""
+This python module contains the two way ranging (TWR) protocols used by the RangingTAG and RangingAnchor scripts and their range computations.
+It requires the following modules: DW1000Constants, DW1000Timestamp.
+
+The protocol of an exchange is chosen by the tag and sent in its POLL, so it can change from one session to the other:
+        C.SS_TWR: single-sided, 2 messages. POLL, then POLL_ACK carrying the anchor's receive and transmit timestamps. The tag computes the range,
+                  the clock offset between the devices is corrected from the carrier integrator.
+        C.DS_TWR_3: double-sided, 3 messages. POLL, POLL_ACK, then RANGE carrying the tag's timestamps. The anchor computes the range.
+        C.DS_TWR_4: double-sided, 4 messages. The 3 messages of C.DS_TWR_3, then RANGE_REPORT sending the range back to the tag.
+
+The ranges of each device are smoothed by a RangeFilter, kept in its DW1000Device, before being reported.
+"""
+
+
+from collections import deque
+import DW1000Constants as C
+import DW1000Timestamp
+
+# Range filter: the ranges outside [MIN_RANGE, MAX_RANGE] meters are rejected (e.g. wrapped timestamps), as are the ones measured with a frame
+# whose receive power exceeds the first path power by more than NLOS_THRESHOLD dB (non line of sight). The median of the last MEDIAN_WINDOW
+# ranges feeds an alpha-beta tracker, restarted after FILTER_TIMEOUT milliseconds without a range.
+MIN_RANGE = -1.0
+MAX_RANGE = 300.0
+NLOS_THRESHOLD = 10.0
+MEDIAN_WINDOW = 5
+ALPHA = 0.5
+BETA = 0.1
+FILTER_TIMEOUT = 1000
+
+
+def hasFinalMessage(protocol):
+    """
+    This function tells if the tag sends a RANGE message after the POLL_ACK.
+
+    Args:
+            protocol: The ranging protocol of the exchange.
+
+    Returns:
+            True for the double-sided protocols.
+    """
+    return protocol != C.SS_TWR
+
+
+def hasReport(protocol):
+    """
+    This function tells if the anchor sends the range back to the tag in a RANGE_REPORT message.
+
+    Args:
+            protocol: The ranging protocol of the exchange.
+
+    Returns:
+            True for the four messages double-sided protocol.
+    """
+    return protocol == C.DS_TWR_4
+
+
+def computeRangeSingleSided(timePollSent, timePollAckReceived, timePollReceived, timePollAckSent, clockOffset=0.0):
+    """
+    This function computes the time of flight of a single-sided exchange, seen from the tag. The anchor's reply time is converted to the tag's
+    clock, otherwise an offset of a few ppm between the crystals would bias the result by tens of centimeters with a reply time of a few ms.
+
+    Args:
+            timePollSent: The transmit timestamp of the POLL (tag clock).
+            timePollAckReceived: The receive timestamp of the POLL_ACK (tag clock).
+            timePollReceived: The receive timestamp of the POLL (anchor clock).
+            timePollAckSent: The transmit timestamp of the POLL_ACK (anchor clock).
+            clockOffset: The offset of the anchor's clock relative to the tag's one, as a ratio (positive when the anchor's clock is faster).
+
+    Returns:
+            The time of flight in DW1000 time units.
+    """
+    round1 = DW1000Timestamp.elapsed(timePollAckReceived, timePollSent)
+    reply1 = DW1000Timestamp.elapsed(timePollAckSent, timePollReceived)
+    return (round1 - reply1 * (1 - clockOffset)) / 2.0
+
+
+def computeRangeAsymmetric(timePollSent, timePollReceived, timePollAckSent, timePollAckReceived, timeRangeSent, timeRangeReceived):
+    """
+    This function computes the time of flight of a double-sided exchange with asymmetric reply times. The clock offset cancels out. The
+    computation is exact, in integers: the products of the intervals exceed the precision of floating point numbers.
+
+    Args:
+            timePollSent: The transmit timestamp of the POLL (tag clock).
+            timePollReceived: The receive timestamp of the POLL (anchor clock).
+            timePollAckSent: The transmit timestamp of the POLL_ACK (anchor clock).
+            timePollAckReceived: The receive timestamp of the POLL_ACK (tag clock).
+            timeRangeSent: The transmit timestamp of the RANGE (tag clock).
+            timeRangeReceived: The receive timestamp of the RANGE (anchor clock).
+
+    Returns:
+            The time of flight in DW1000 time units, rounded to the nearest one. It is negative when the range bias correction exceeds the
+            distance.
+    """
+    round1 = DW1000Timestamp.elapsed(timePollAckReceived, timePollSent)
+    reply1 = DW1000Timestamp.elapsed(timePollAckSent, timePollReceived)
+    round2 = DW1000Timestamp.elapsed(timeRangeReceived, timePollAckSent)
+    reply2 = DW1000Timestamp.elapsed(timeRangeSent, timePollAckReceived)
+    return DW1000Timestamp.divide(round1 * round2 - reply1 * reply2, round1 + round2 + reply1 + reply2)
+
+
+def isLineOfSight(firstPathPower, rxPower, threshold=NLOS_THRESHOLD):
+    """
+    This function tells if a frame was received in line of sight: the first path then carries most of the receive power, while it is
+    attenuated when the direct path is blocked and the timestamp is late.
+
+    Args:
+            firstPathPower: The first path power of the frame in dBm, see DW1000.getFirstPathPower.
+            rxPower: The receive power of the frame in dBm, see DW1000.getReceivePower.
+            threshold: The largest difference between both powers in dB.
+
+    Returns:
+            True if the difference is within the threshold.
+    """
+    return rxPower - firstPathPower <= threshold
+
+
+class RangeFilter(object):
+    """
+    Streaming filter of the ranges to one device: outlier rejection, median of the last ranges and alpha-beta tracking of the range and of
+    its rate. Each update takes O(1) time and the state has a fixed size.
+    """
+
+    def __init__(self, window=MEDIAN_WINDOW, alpha=ALPHA, beta=BETA, nlosThreshold=NLOS_THRESHOLD):
+        """
+        Args:
+                window: The number of ranges of the median.
+                alpha: The gain of the range of the tracker.
+                beta: The gain of the rate of the tracker.
+                nlosThreshold: The threshold of isLineOfSight, None to keep the non line of sight ranges.
+        """
+        self.samples = deque(maxlen=window)
+        self.alpha = alpha
+        self.beta = beta
+        self.nlosThreshold = nlosThreshold
+        self.reset()
+
+    def reset(self):
+        """
+        This function forgets the past ranges.
+        """
+        self.samples.clear()
+        self.range = None
+        self.rate = 0.0
+        self.lastUpdate = None
+
+    def update(self, distance, now, firstPathPower=None, rxPower=None):
+        """
+        This function filters a new range.
+
+        Args:
+                distance: The measured distance in meters.
+                now: The value of millis() when the range was measured.
+                firstPathPower: The first path power of the last frame of the exchange, to detect the non line of sight ranges.
+                rxPower: The receive power of the same frame.
+
+        Returns:
+                The filtered distance in meters, None if the range is rejected.
+        """
+        if not MIN_RANGE <= distance <= MAX_RANGE:
+            return None
+        if (self.nlosThreshold is not None and firstPathPower is not None and rxPower is not None
+                and not isLineOfSight(firstPathPower, rxPower, self.nlosThreshold)):
+            return None
+        if self.lastUpdate is not None and now - self.lastUpdate > FILTER_TIMEOUT:
+            self.reset()
+        self.samples.append(distance)
+        median = sorted(self.samples)[len(self.samples) // 2]
+        if self.range is None:
+            self.range = median
+        else:
+            dt = max(now - self.lastUpdate, 1) / float(C.MILLISECONDS)
+            predicted = self.range + self.rate * dt
+            residual = median - predicted
+            self.range = predicted + self.alpha * residual
+            self.rate += self.beta * residual / dt
+        self.lastUpdate = now
+        return self.range
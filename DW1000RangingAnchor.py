@@ -1,30 +1,43 @@
 """
 This python script is used to configure the DW1000 chip as an anchor for ranging functionalities. It must be used in conjunction with the RangingTAG script.
-It requires the following modules: DW1000, DW1000Constants and monotonic.
+It requires the following modules: DW1000, DW1000Constants, DW1000Device, DW1000Frame, DW1000Ranging and monotonic.
+
+The anchor only answers the messages addressed to its short address, ANCHOR_ADDRESS, which must be unique and listed in the tag's
+ANCHOR_ADDRESSES. It follows the ranging protocol requested in the tag's POLL, see DW1000Ranging. The messages are IEEE 802.15.4 data frames,
+see DW1000Frame.
+It also answers the broadcast POLLs listing its address: it then replies in the slot given by its position in the list, SLOT_DELAY_TIME_US
+later per slot, and finds the receive timestamp of its reply at the same position in the broadcast RANGE.
+Each tag gets its own session (a DW1000Device keyed by the tag's short address), so the exchanges of several tags polling the anchor do not
+interfere. The sessions are kept in order of last activity and dropped after SESSION_TIMEOUT milliseconds without a message.
+The ranges of each tag go through the session's RangeFilter: the outliers and non line of sight ranges are answered with a RANGE_FAILED, the
+other ones are smoothed before being printed and reported.
 """
 
 
 import DW1000
 import monotonic
 import DW1000Constants as C
+import DW1000Frame
+import DW1000Ranging
+from collections import OrderedDict
+from DW1000Device import DW1000Device, TAG
 
 
 lastActivity = 0
-expectedMsgId = C.POLL
-protocolFailed = False
-sentAck = False
-receivedAck = False
-LEN_DATA = 20
-data = [0] * LEN_DATA
-timePollAckSentTS = 0
-timePollAckReceivedTS = 0
-timePollReceivedTS = 0
-timeRangeReceivedTS = 0
-timePollSentTS = 0
-timeRangeSentTS = 0
-timeComputedRangeTS = 0
-REPLY_DELAY_TIME_US = 7000 
-SEQ_NO = 0
+sentMsgId = None
+sentTo = None
+# a broadcast POLL lists up to BROADCAST_SLOTS anchors
+BROADCAST_SLOTS = 8
+REPLY_DELAY_TIME_US = 7000
+# must match the tag's one
+SLOT_DELAY_TIME_US = 3000
+ANCHOR_ADDRESS = 0x0001
+SESSION_TIMEOUT = 1000
+# the sessions of the tags, by short address, the least recently active first
+tags = OrderedDict()
+# the frame sent by the anchor and the last one received
+frame = DW1000Frame.RangingFrame(ANCHOR_ADDRESS)
+received = DW1000Frame.RangingFrame(ANCHOR_ADDRESS)
 
 
 def millis():
@@ -35,162 +48,253 @@ def millis():
     return int(round(monotonic.monotonic() * C.MILLISECONDS))
 
 
-def handleSent():
+def noteActivity():
     """
-    This is a callback called from the module's interrupt handler when a transmission was successful.
-    It sets the sentAck variable as True so the loop can continue.
+    This function records the time of the last activity so we can know if the device is inactive or not.
     """
-    global sentAck
-    sentAck = True
+    global lastActivity
+    lastActivity = millis()
 
 
-def handleReceived():
+def resetInactive():
     """
-    This is a callback called from the module's interrupt handler when a reception was successful.
-    It sets the received receivedAck as True so the loop can continue.
+    This function restarts the reception when the device is deemed inactive.
     """
-    global receivedAck
-    receivedAck = True
+    print("reset inactive")
+    receiver()
+    noteActivity()
 
 
-def noteActivity():
+def getSession(address):
     """
-    This function records the time of the last activity so we can know if the device is inactive or not.
+    This function returns the session of a tag, a new one if the tag is unknown, and marks it as the most recently active one.
+
+    Args:
+            address: The short address of the tag.
+
+    Returns:
+            The DW1000Device holding the state of the exchange with the tag.
     """
-    global lastActivity
-    lastActivity = millis()
+    session = tags.pop(address, None)
+    if session is None:
+        session = DW1000Device(address, TAG)
+        session.expectedMsgId = C.POLL
+    session.lastActivity = millis()
+    tags[address] = session
+    return session
 
 
-def resetInactive():
+def expireSessions():
     """
-    This function restarts the default polling operation when the device is deemed inactive.
+    This function drops the sessions of the tags which have not sent anything for SESSION_TIMEOUT milliseconds. Only the stale sessions
+    at the front of the table are visited.
     """
-    global expectedMsgId
-    print "reset inactive"
-    expectedMsgId = C.POLL
-    receiver()
-    noteActivity()
+    now = millis()
+    while tags:
+        address = next(iter(tags))
+        if now - tags[address].lastActivity <= SESSION_TIMEOUT:
+            break
+        del tags[address]
 
 
-def transmitPollAck():
+def findSlot(message):
+    """
+    This function returns the position of the anchor in the list of a broadcast POLL, None if it is not polled.
     """
-    This function sends the polling acknowledge message which is used to confirm the reception of the polling message. 
-    """        
-    global data, SEQ_NO
+    polled = message.anchors[:BROADCAST_SLOTS]
+    if ANCHOR_ADDRESS in polled:
+        return polled.index(ANCHOR_ADDRESS)
+    return None
+
+
+def replyDelay(session):
+    """
+    This function returns the delay in microseconds between the reception of a message of the tag and the anchor's reply. It is tuned to
+    the latency of this host in a one to one exchange (at most REPLY_DELAY_TIME_US), and depends on the anchor's slot in a broadcast one.
+    """
+    if session.slot is None:
+        return DW1000.getReplyDelay(REPLY_DELAY_TIME_US)
+    return REPLY_DELAY_TIME_US + session.slot * SLOT_DELAY_TIME_US
+
+
+def scheduleReply(session, origin, late):
+    """
+    This function configures the delayed transmission of a reply to the tag, replyDelay() after the reception of its message. If that time
+    has already passed (late), the delay is counted from now instead.
+
+    Args:
+            session: The DW1000Device of the tag.
+            origin: The receive timestamp of the message of the tag.
+            late: True if the reply delay is counted from now.
+
+    Returns:
+            The TX timestamp of the reply.
+    """
+    if late:
+        return DW1000.setDelay(replyDelay(session), C.MICROSECONDS)
+    return DW1000.transmitAt(origin, replyDelay(session), C.MICROSECONDS)
+
+
+def transmitPollAck(session, late=False):
+    """
+    This function sends the polling acknowledge message which is used to confirm the reception of the polling message. It carries the
+    receive timestamp of the POLL and its own transmit timestamp, used by single-sided ranging. It is sent again with late set if its time
+    had already passed, see scheduleReply().
+    """
+    global sentTo
     ##print "transmitPollAck"
     DW1000.newTransmit()
-    data[0] = C.POLL_ACK
-    data[19] = SEQ_NO
-    SEQ_NO += 1
-    if SEQ_NO == 256:
-        SEQ_NO = 0
-    DW1000.setDelay(REPLY_DELAY_TIME_US, C.MICROSECONDS)
-    DW1000.setData(data, LEN_DATA)
-    DW1000.startTransmit()
+    sentTo = session
+    session.timePollAckSent = scheduleReply(session, session.timePollReceived, late)
+    frame.timePollReceived = session.timePollReceived
+    frame.timePollAckSent = session.timePollAckSent
+    setFrame(session, C.POLL_ACK)
+    if not DW1000.startTransmit() and not late:
+        transmitPollAck(session, True)
 
 
-def transmitRangeAcknowledge():
+def transmitRangeAcknowledge(session, timeOfFlight, late=False):
     """
     This functions sends the range acknowledge message which tells the tag that the ranging function was successful and another ranging transmission can begin.
+    In a broadcast exchange, it is delayed to the anchor's slot, see scheduleReply().
     """
-    global data, SEQ_NO
+    global sentTo
     ##print "transmitRangeAcknowledge"
     DW1000.newTransmit()
-    data[0] = C.RANGE_REPORT
-    data[19] = SEQ_NO
-    SEQ_NO += 1
-    if SEQ_NO == 256:
-        SEQ_NO = 0
-    DW1000.setData(data, LEN_DATA)
-    DW1000.startTransmit()
+    sentTo = session
+    if session.slot is not None:
+        scheduleReply(session, session.timeRangeReceived, late)
+    frame.timeOfFlight = timeOfFlight
+    setFrame(session, C.RANGE_REPORT)
+    if not DW1000.startTransmit() and not late:
+        transmitRangeAcknowledge(session, timeOfFlight, True)
 
 
-def transmitRangeFailed():
+def transmitRangeFailed(session, late=False):
     """
     This functions sends the range failed message which tells the tag that the ranging function has failed and to start another ranging transmission.
+    In a broadcast exchange, it is delayed to the anchor's slot, see scheduleReply().
     """
-    global data
+    global sentTo
     ##print "transmitRangeFailed"
     DW1000.newTransmit()
-    data[0] = C.RANGE_FAILED
-    DW1000.setData(data, LEN_DATA)
-    DW1000.startTransmit()
+    sentTo = session
+    if session.slot is not None:
+        scheduleReply(session, session.timeRangeReceived, late)
+    setFrame(session, C.RANGE_FAILED)
+    if not DW1000.startTransmit() and not late:
+        transmitRangeFailed(session, True)
+
+
+def setFrame(session, messageId):
+    """
+    This function encodes a message to the tag of a session, with the session's next sequence number, into the TX buffer.
+    """
+    global sentMsgId
+    sentMsgId = messageId
+    frame.destination = session.address
+    frame.sequence = session.sequenceNumber
+    session.incrementSequenceNumber()
+    DW1000.setData(frame.buffer, frame.encode(messageId))
 
 
 def receiver():
     """
     This function configures the chip to prepare for a message reception.
     """
-    global data
     ##print "receiver"
     DW1000.newReceive()
     DW1000.receivePermanently()
     DW1000.startReceive()
 
 
-def computeRangeAsymmetric():
+def loop():
     """
-    This is the function which calculates the timestamp used to determine the range between the devices.
+    This function handles the next event captured by the module's interrupt handler, in order of arrival. It waits for one at most
+    C.EVENT_WAIT seconds, so the main loop sleeps while the radio is idle.
     """
-    global timeComputedRangeTS
-    round1 = DW1000.wrapTimestamp(timePollAckReceivedTS - timePollSentTS)
-    reply1 = DW1000.wrapTimestamp(timePollAckSentTS - timePollReceivedTS)
-    round2 = DW1000.wrapTimestamp(timeRangeReceivedTS - timePollAckSentTS)
-    reply2 = DW1000.wrapTimestamp(timeRangeSentTS - timePollAckReceivedTS)
-    #print "ROUND 1: ", round1,reply1
-    #print "ROUND 2: ", round2,reply2
-    timeComputedRangeTS = (round1 * round2 - reply1 * reply2) / (round1 + round2 + reply1 + reply2)
-    # timeComputedRangeTS = (round2 + round1 - reply1 - reply2)/2
-
-
-def loop():
-    global sentAck, receivedAck, timePollAckSentTS, timePollReceivedTS, timePollSentTS, timePollAckReceivedTS, timeRangeReceivedTS, protocolFailed, data, expectedMsgId, timeRangeSentTS, SEQ_NO
-    if (sentAck == False and receivedAck == False):
+    event = DW1000.pollEvent(C.EVENT_WAIT)
+    if event is None:
+        expireSessions()
         if ((millis() - lastActivity) > C.RESET_PERIOD):
             resetInactive()
         return
 
-    if sentAck:
-        sentAck = False
-        msgId = data[0]
-        ##print msgId
-        if msgId == C.POLL_ACK:
+    if event.kind == C.EVENT_SENT:
+        ##print sentMsgId
+        if sentMsgId == C.POLL_ACK:
             ##print "pollack"
-            timePollAckSentTS = DW1000.getTransmitTimestamp()
-            #print "timePollAckSentTS for SEQ_NO {} : {}".format(SEQ_NO, timePollAckSentTS)
+            sentTo.timePollAckSent = event.timestamp
+            #print "timePollAckSentTS for {:04X} : {}".format(sentTo.address, sentTo.timePollAckSent)
             noteActivity()
 
-    if receivedAck:
-        receivedAck = False
-        data = DW1000.getData(LEN_DATA)
-        #print "getting data ", data
-        msgId = data[0]
-        if msgId != expectedMsgId:
+    elif event.kind == C.EVENT_RECEIVED:
+        if not received.decode(event.data):
+            return
+        destination = received.destination
+        source = received.source
+        msgId = received.messageId
+        slot = None
+        if destination == C.BROADCAST_ADDRESS:
+            if msgId == C.POLL:
+                slot = findSlot(received)
+            elif source in tags:
+                slot = tags[source].slot
+            if slot is None:
+                # a broadcast exchange without this anchor
+                return
+        elif destination != ANCHOR_ADDRESS:
+            # addressed to another anchor or to a tag
+            return
+        session = getSession(source)
+        session.slot = slot
+        if msgId != session.expectedMsgId:
             #print "protocolFailed"
-            protocolFailed = True
+            session.protocolFailed = True
         if msgId == C.POLL:
-            protocolFailed = False
-            timePollReceivedTS = DW1000.getReceiveTimestamp()
-            #print "timePollReceivedTS for SEQ_NO {} : {}".format(SEQ_NO, timePollReceivedTS)
-            expectedMsgId = C.RANGE
-            transmitPollAck()
+            session.protocolFailed = False
+            session.protocol = received.protocol
+            session.timePollReceived = event.timestamp
+            #print "timePollReceivedTS for {:04X} : {}".format(session.address, session.timePollReceived)
+            if DW1000Ranging.hasFinalMessage(session.protocol):
+                session.expectedMsgId = C.RANGE
+            else:
+                # single-sided: the tag computes the range from the POLL_ACK
+                session.expectedMsgId = C.POLL
+            transmitPollAck(session)
             noteActivity()
         elif msgId == C.RANGE:
-            timeRangeReceivedTS = DW1000.getReceiveTimestamp()
-            expectedMsgId = C.POLL
-            if protocolFailed == False:
-                timePollSentTS = DW1000.getTimeStamp(data, 1)
-                timePollAckReceivedTS = DW1000.getTimeStamp(data, 6)
-                timeRangeSentTS = DW1000.getTimeStamp(data, 11)
-                computeRangeAsymmetric()
-                transmitRangeAcknowledge()
-                distance = (timeComputedRangeTS % C.TIME_OVERFLOW) * C.DISTANCE_OF_RADIO
+            session.timeRangeReceived = event.timestamp
+            session.expectedMsgId = C.POLL
+            # one timestamp in a one to one exchange, one per slot in a broadcast one
+            index = 0 if slot is None else slot
+            if index < len(received.timePollAckReceived):
+                session.timePollAckReceived = received.timePollAckReceived[index]
+            else:
+                session.timePollAckReceived = 0
+            if session.timePollAckReceived == 0:
+                # the tag did not receive the POLL_ACK
+                session.protocolFailed = True
+            if session.protocolFailed == False:
+                session.timePollSent = received.timePollSent
+                session.timeRangeSent = received.timeRangeSent
+                timeComputedRangeTS = session.getRange()
                 # distance = (timeComputedRangeTS % C.TIME_OVERFLOW) * C.SPEED_OF_LIGHT / 1000
                 #print timeComputedRangeTS
-                print("Distance: %.2f m" %(distance))
-
-            else:
-                transmitRangeFailed()
+                session.range = session.rangeFilter.update(timeComputedRangeTS * C.DISTANCE_OF_RADIO, millis(),
+                                                           DW1000.getFirstPathPower(event.diagnostics),
+                                                           DW1000.getReceivePower(event.diagnostics))
+                if session.range is None:
+                    # outlier or non line of sight range
+                    session.protocolFailed = True
+                else:
+                    print("Distance to %04X: %.2f m" % (session.address, session.range))
+                    if DW1000Ranging.hasReport(session.protocol):
+                        # the filtered range is reported, a negative one as 0, see DW1000Frame
+                        transmitRangeAcknowledge(session, int(round(session.range * C.DISTANCE_OF_RADIO_INV)))
+
+            if session.protocolFailed and DW1000Ranging.hasReport(session.protocol):
+                transmitRangeFailed(session)
 
             noteActivity()
 
@@ -204,9 +308,11 @@ try:
     ##print("DW1000 initialized")
     ##print("############### ANCHOR ##############")
 
-    DW1000.generalConfiguration("82:17:5B:D5:A9:9A:E2:9C", C.MODE_LONGDATA_FAST_ACCURACY)
-    DW1000.registerCallback("handleSent", handleSent)
-    DW1000.registerCallback("handleReceived", handleReceived)
+    DW1000.generalConfiguration("82:17:5B:D5:A9:9A:E2:9C", C.MODE_LONGDATA_FAST_ACCURACY, ANCHOR_ADDRESS)
+    DW1000.enableEventQueue()
+    DW1000.enableReplyDelayTuning()
+    # the frames of the other networks and the ones addressed to other devices are dropped by the chip, without interrupt
+    DW1000.enableFrameFiltering()
     DW1000.setAntennaDelay(C.ANTENNA_DELAY_RASPI)
 
     receiver()
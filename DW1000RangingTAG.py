@@ -1,27 +1,62 @@
 """
-This python script is used to configure the DW1000 chip as a tag for ranging functionalities. It must be used in conjunction with the RangingAnchor script. 
-It requires the following modules: DW1000, DW1000Constants and monotonic.
+This python script is used to configure the DW1000 chip as a tag for ranging functionalities. It must be used in conjunction with the RangingAnchor script.
+It requires the following modules: DW1000, DW1000Constants, DW1000Device, DW1000Frame, DW1000Ranging and monotonic.
+
+The tag ranges with every anchor of ANCHOR_ADDRESSES once per epoch (POLL_RANGE_FREQ), one exchange at a time, and prints the set of ranges at
+the end of each epoch. The anchors are polled either one after the other (round-robin) or at the start of their own slot of the epoch (TDMA).
+The messages are IEEE 802.15.4 data frames between short addresses, see DW1000Frame.
+The ranging protocol of each anchor (DW1000Device.protocol, RANGING_PROTOCOL by default) is sent in the POLL, see DW1000Ranging. With the
+three messages double-sided protocol only the anchor knows the range.
+With BROADCAST_POLL, a single POLL listing the anchors is sent to all of them and the i-th anchor of the list replies in its own slot,
+SLOT_DELAY_TIME_US * i after the usual reply delay. The double-sided protocols then end with a single RANGE carrying the receive timestamps
+of all the replies, so ranging with N anchors takes N + 2 messages instead of 3 * N (plus N range reports with C.DS_TWR_4).
+When ANCHOR_POSITIONS gives the coordinates of the anchors, the position of the tag is also computed and printed at the end of each epoch
+with ranges to at least 3 (2D) or 4 (3D) of them, see DW1000Multilateration (which requires numpy).
 """
 
 
 import DW1000
 import monotonic
 import DW1000Constants as C
+import DW1000Frame
+import DW1000Ranging
+import DW1000Multilateration
+from DW1000Device import DW1000Device, ANCHOR
 
-LEN_DATA = 20
-data = [0] * LEN_DATA
-lastActivity = 0
+# a broadcast POLL lists up to BROADCAST_SLOTS anchors
+BROADCAST_SLOTS = 8
+# the frame sent by the tag and the last one received
+frame = None
+received = None
 lastPoll = 0
-sentAck = False
-receivedAck = False
+sentMsgId = None
 expectedMsgId = C.POLL_ACK
-timePollSentTS = 0
-timeRangeSentTS = 0
-timePollAckReceivedTS = 0
 REPLY_DELAY_TIME_US = 7000
-# The polling range frequency defines the time interval between every distance poll in milliseconds. Feel free to change its value. 
-POLL_RANGE_FREQ = 100 # the distance between the tag and the anchor will be estimated every second.
+# The polling range frequency defines the time interval between every distance poll in milliseconds. Feel free to change its value.
+POLL_RANGE_FREQ = 100 # the distances between the tag and the anchors will be estimated 10 times per second.
+# The short addresses of the anchors, see ANCHOR_ADDRESS in the RangingAnchor script.
+ANCHOR_ADDRESSES = [0x0001, 0x0002, 0x0003, 0x0004]
+# With TDMA the i-th anchor is polled SLOT_TIME * i milliseconds after the start of the epoch, otherwise as soon as the previous exchange is over.
+# In both cases an exchange is given up after SLOT_TIME milliseconds. len(ANCHOR_ADDRESSES) * SLOT_TIME must not exceed POLL_RANGE_FREQ.
+TDMA = False
+SLOT_TIME = 25
+RANGING_PROTOCOL = C.DS_TWR_4
+BROADCAST_POLL = False
+# must match the anchors' one
+SLOT_DELAY_TIME_US = 3000
+# The coordinates of the anchors in meters, (x, y) or (x, y, z), by short address. Leave it empty to only print the ranges.
+ANCHOR_POSITIONS = {}
+position = None
 anchors = {}
+tagAddress = 0
+slot = 0
+currentAnchor = None
+epochStart = 0
+# broadcast mode: the anchors whose answer is awaited and the ones which answered the POLL
+pending = []
+answered = []
+# broadcast mode: milliseconds after a message of the tag until the slot of the last anchor polled is over
+replyWindow = 0
 
 
 def millis():
@@ -32,124 +67,375 @@ def millis():
     return int(round(monotonic.monotonic()*C.MILLISECONDS))
 
 
-def handleSent():
-    """
-    This is a callback called from the module's interrupt handler when a transmission was successful. 
-    It sets the sentAck variable as True so the loop can continue.
-    """        
-    global sentAck
-    sentAck = True
-
-
-def handleReceived():
-    """
-    This is a callback called from the module's interrupt handler when a reception was successful. 
-    It sets the received receivedAck as True so the loop can continue.
-    """            
-    global receivedAck
-    receivedAck = True
-
 def receiver():
     """
     This function configures the chip to prepare for a message reception.
-    """    
+    """
     DW1000.newReceive()
     DW1000.receivePermanently()
     DW1000.startReceive()
 
 
-def noteActivity():
+def startEpoch():
+    """
+    This function starts a new ranging epoch: the anchors are polled again from the first one.
     """
-    This function records the time of the last activity so we can know if the device is inactive or not.
-    """    
-    global lastActivity
-    lastActivity = millis()
+    global epochStart, slot
+    now = millis()
+    epochStart += POLL_RANGE_FREQ
+    if now - epochStart >= POLL_RANGE_FREQ:
+        # too late, the missed epochs are skipped
+        epochStart = now
+    slot = 0
 
 
-def resetInactive():
+def setFrame(messageId):
     """
-    This function restarts the default polling operation when the device is deemed inactive.
+    This function encodes the next message of the tag, with a new sequence number, into the TX buffer.
     """
-    global expectedMsgId
-    print("Reset inactive")	
-    expectedMsgId = C.POLL_ACK
-    transmitPoll()
-    noteActivity()
+    global sentMsgId
+    sentMsgId = messageId
+    frame.sequence = (frame.sequence + 1) & C.MASK_LS_BYTE
+    DW1000.setData(frame.buffer, frame.encode(messageId))
 
 
-def transmitPoll():
+def transmitPoll(anchor):
     """
-    This function sends the polling message which is the first transaction to enable ranging functionalities. 
+    This function sends the polling message which is the first transaction to enable ranging functionalities.
     It checks if an anchor is operational.
-    """    
-    global data, lastPoll
+
+    Args:
+            anchor: The DW1000Device of the polled anchor.
+    """
+    global lastPoll, currentAnchor, expectedMsgId
     #print "polling"
-    while (millis() - lastPoll < POLL_RANGE_FREQ):
-        pass
+    currentAnchor = anchor
+    anchor.rangeFailed = False
+    expectedMsgId = C.POLL_ACK
     DW1000.newTransmit()
-    data[0] = C.POLL
-    data[18] = data[19]
-    DW1000.setData(data, LEN_DATA)
+    frame.destination = anchor.address
+    frame.protocol = anchor.protocol
+    frame.anchors = []
+    setFrame(C.POLL)
     DW1000.startTransmit()
     lastPoll = millis()
 
 
-def transmitRange():
+def replyDelay():
+    """
+    This function returns the delay in microseconds between the reception of a POLL_ACK and the RANGE message, tuned to the latency of
+    this host (at most REPLY_DELAY_TIME_US), see DW1000.getReplyDelay.
+    """
+    return DW1000.getReplyDelay(REPLY_DELAY_TIME_US)
+
+
+def transmitRange(anchor, late=False):
     """
-    This function sends the range message containing the timestamps used to calculate the range between the devices.
+    This function sends the range message containing the timestamps used to calculate the range between the devices. It is sent
+    replyDelay() after the reception of the POLL_ACK, or after now if that time has already passed.
+
+    Args:
+            anchor: The DW1000Device of the polled anchor.
+            late: True if the reply delay is counted from now.
     """
-    global data, timeRangeSentTS
     #print "transmitting range"
     DW1000.newTransmit()
-    data[0] = C.RANGE
-    data[18] = data[19]
-    timeRangeSentTS = DW1000.setDelay(REPLY_DELAY_TIME_US, C.MICROSECONDS)
-    DW1000.setTimeStamp(data, timePollSentTS, 1)
-    DW1000.setTimeStamp(data, timePollAckReceivedTS, 6)
-    DW1000.setTimeStamp(data, timeRangeSentTS, 11)
-    DW1000.setData(data, LEN_DATA)
+    if late:
+        anchor.timeRangeSent = DW1000.setDelay(replyDelay(), C.MICROSECONDS)
+    else:
+        anchor.timeRangeSent = DW1000.transmitAt(anchor.timePollAckReceived, replyDelay(), C.MICROSECONDS)
+    frame.destination = anchor.address
+    frame.timePollSent = anchor.timePollSent
+    frame.timeRangeSent = anchor.timeRangeSent
+    frame.timePollAckReceived = [anchor.timePollAckReceived]
+    setFrame(C.RANGE)
+    if not DW1000.startTransmit() and not late:
+        transmitRange(anchor, True)
+
+
+def transmitBroadcastPoll():
+    """
+    This function sends a POLL to every anchor of ANCHOR_ADDRESSES at once. Their position in the list gives their reply slot.
+    """
+    global lastPoll, expectedMsgId, pending, answered, slot, replyWindow
+    pending = [anchors[address] for address in ANCHOR_ADDRESSES[:BROADCAST_SLOTS]]
+    answered = []
+    for anchor in pending:
+        anchor.rangeFailed = False
+    # the anchors answer in the slot of their position in the POLL, whichever of them already answered
+    replyWindow = (REPLY_DELAY_TIME_US + len(pending) * SLOT_DELAY_TIME_US) // C.MILLISECONDS + SLOT_TIME
+    expectedMsgId = C.POLL_ACK
+    DW1000.newTransmit()
+    frame.destination = C.BROADCAST_ADDRESS
+    frame.protocol = RANGING_PROTOCOL
+    frame.anchors = ANCHOR_ADDRESSES[:BROADCAST_SLOTS]
+    setFrame(C.POLL)
     DW1000.startTransmit()
+    lastPoll = millis()
+    slot = len(ANCHOR_ADDRESSES)
+
+
+def transmitBroadcastRange(late=False):
+    """
+    This function sends the range message of a broadcast exchange to the anchors which answered the POLL. It carries the receive timestamps
+    of all their replies. It is sent replyDelay() after the reception of the last reply, or after now if that time has already passed
+    (e.g. an anchor did not answer).
+
+    Args:
+            late: True if the reply delay is counted from now.
+    """
+    global lastPoll, expectedMsgId, pending
+    DW1000.newTransmit()
+    if late:
+        timeRangeSent = DW1000.setDelay(replyDelay(), C.MICROSECONDS)
+    else:
+        timeRangeSent = DW1000.transmitAt(answered[-1].timePollAckReceived, replyDelay(), C.MICROSECONDS)
+    frame.destination = C.BROADCAST_ADDRESS
+    frame.timePollSent = answered[0].timePollSent
+    frame.timeRangeSent = timeRangeSent
+    # the receive timestamps in the order of the POLL, 0 for the anchors which did not answer
+    frame.timePollAckReceived = []
+    for address in ANCHOR_ADDRESSES[:BROADCAST_SLOTS]:
+        anchor = anchors[address]
+        if anchor in answered:
+            anchor.timeRangeSent = timeRangeSent
+            frame.timePollAckReceived.append(anchor.timePollAckReceived)
+            # known by the anchor only, unless it reports it
+            anchor.range = None
+            anchor.activate()
+        else:
+            frame.timePollAckReceived.append(0)
+    setFrame(C.RANGE)
+    if not DW1000.startTransmit() and not late:
+        transmitBroadcastRange(True)
+        return
+    lastPoll = millis()
+    if DW1000Ranging.hasReport(RANGING_PROTOCOL):
+        pending = list(answered)
+        expectedMsgId = C.RANGE_REPORT
+    else:
+        pending = []
+        expectedMsgId = None
+
+
+def endBroadcastStage():
+    """
+    This function is called once every anchor answered the last message of the tag or their slots are over. The anchors which did not
+    answer are marked as failed and the range message is sent after the replies to the POLL.
+    """
+    global expectedMsgId, pending
+    for anchor in pending:
+        anchor.range = None
+        anchor.deactivate()
+    pending = []
+    if expectedMsgId == C.POLL_ACK and answered and DW1000Ranging.hasFinalMessage(RANGING_PROTOCOL):
+        transmitBroadcastRange()
+    else:
+        expectedMsgId = None
+
+
+def computeSingleSided(anchor, message, event):
+    """
+    This function computes the distance to an anchor from its POLL_ACK in single-sided ranging.
+
+    Args:
+            anchor: The DW1000Device of the anchor, with the transmit timestamp of the POLL.
+            message: The decoded RangingFrame of the POLL_ACK.
+            event: The RadioEvent of the POLL_ACK.
+
+    Returns:
+            The distance in meters filtered by the anchor's RangeFilter, None if the range is rejected.
+    """
+    anchor.timePollAckReceived = event.timestamp
+    anchor.timePollReceived = message.timePollReceived
+    anchor.timePollAckSent = message.timePollAckSent
+    # the anchor's reply time is measured with its own crystal, converted with the offset seen by the carrier integrator
+    clockOffset = DW1000.getClockOffset(event.diagnostics) * 1e-6
+    timeOfFlight = DW1000Ranging.computeRangeSingleSided(anchor.timePollSent, anchor.timePollAckReceived,
+                                                         anchor.timePollReceived, anchor.timePollAckSent, clockOffset)
+    return anchor.rangeFilter.update(timeOfFlight * C.DISTANCE_OF_RADIO, millis(), DW1000.getFirstPathPower(event.diagnostics),
+                                     DW1000.getReceivePower(event.diagnostics))
+
+
+def finishExchange(distance, success=True, rangeFailed=False):
+    """
+    This function ends the exchange with the current anchor and records its outcome.
+
+    Args:
+            distance: The distance to the anchor in meters, None if it is unknown.
+            success: False if the exchange failed.
+            rangeFailed: True if the anchor answered the RANGE with a RANGE_FAILED.
+    """
+    global currentAnchor, slot
+    currentAnchor.range = distance
+    currentAnchor.rangeFailed = rangeFailed
+    if success:
+        currentAnchor.activate()
+    else:
+        currentAnchor.deactivate()
+    currentAnchor = None
+    slot += 1
+
+
+def reportRanges():
+    """
+    This function prints the ranges measured during the epoch, in the order of ANCHOR_ADDRESSES, and the position of the tag computed from
+    them when the positions of the anchors are known.
+    """
+    global position
+    ranges = []
+    for address in ANCHOR_ADDRESSES:
+        anchor = anchors[address]
+        if anchor.range is not None:
+            ranges.append("%04X: %.2f m" % (address, anchor.range))
+        elif anchor.rangeFailed:
+            ranges.append("%04X: failed" % address)
+        elif not anchor.is_inactive():
+            ranges.append("%04X: at anchor" % address)
+        else:
+            ranges.append("%04X: -" % address)
+    print("Ranges: " + ", ".join(ranges))
+    if ANCHOR_POSITIONS:
+        measured = dict((address, anchors[address].range) for address in ANCHOR_ADDRESSES if anchors[address].range is not None)
+        fix = DW1000Multilateration.solveRanges(ANCHOR_POSITIONS, measured, position)
+        if fix is not None:
+            position = fix[0]
+            print("Position: (%s) m, residual %.2f m" % (", ".join("%.2f" % x for x in position), fix[1]))
+
+
+def schedule():
+    """
+    This function is called when there is no event to handle. It gives up the current exchange once its slot is over, polls the next anchor
+    when its turn has come and starts a new epoch once every anchor of the current one was polled.
+    """
+    now = millis()
+    if BROADCAST_POLL:
+        scheduleBroadcast(now)
+        return
+    if currentAnchor is not None:
+        if now - lastPoll > SLOT_TIME:
+            finishExchange(None, False)
+        return
+    if slot < len(ANCHOR_ADDRESSES):
+        if not TDMA or now - epochStart >= slot * SLOT_TIME:
+            transmitPoll(anchors[ANCHOR_ADDRESSES[slot]])
+    elif now - epochStart >= POLL_RANGE_FREQ:
+        reportRanges()
+        startEpoch()
+
+
+def scheduleBroadcast(now):
+    """
+    This function is the schedule() of the broadcast mode: one broadcast exchange per epoch. The replies to a message of the tag are awaited
+    until the slot of the last anchor is over.
+    """
+    if expectedMsgId is not None:
+        if now - lastPoll > replyWindow:
+            endBroadcastStage()
+    elif slot == 0:
+        transmitBroadcastPoll()
+    elif now - epochStart >= POLL_RANGE_FREQ:
+        reportRanges()
+        startEpoch()
+
+
+def handleBroadcast(event, message):
+    """
+    This function handles the events of the broadcast mode.
+
+    Args:
+            event: The RadioEvent.
+            message: The decoded RangingFrame of a received message.
+    """
+    if event.kind == C.EVENT_SENT:
+        if sentMsgId == C.POLL:
+            for anchor in pending:
+                anchor.timePollSent = event.timestamp
+        return
+    anchor = anchors.get(message.source)
+    if anchor not in pending:
+        return
+    if message.messageId == C.RANGE_FAILED and expectedMsgId == C.RANGE_REPORT:
+        # the anchor could not compute the range, see DW1000Device.rangeFailed
+        anchor.range = None
+        anchor.rangeFailed = True
+        anchor.activate()
+    elif message.messageId != expectedMsgId:
+        return
+    pending.remove(anchor)
+    if message.messageId == C.POLL_ACK:
+        answered.append(anchor)
+        anchor.timePollAckReceived = event.timestamp
+        if not DW1000Ranging.hasFinalMessage(RANGING_PROTOCOL):
+            anchor.range = computeSingleSided(anchor, message, event)
+            if anchor.range is None:
+                anchor.deactivate()
+            else:
+                anchor.activate()
+    elif message.messageId == C.RANGE_REPORT:
+        anchor.range = message.timeOfFlight * C.DISTANCE_OF_RADIO
+        anchor.activate()
+    if not pending:
+        endBroadcastStage()
 
 
 def loop():
-    global sentAck, receivedAck, data, timePollAckReceivedTS, timePollSentTS, timeRangeSentTS, expectedMsgId
-    if (sentAck == False and receivedAck == False):
-        if ((millis() - lastActivity) > C.RESET_PERIOD):
-            resetInactive()
+    """
+    This function handles the next event captured by the module's interrupt handler, in order of arrival. It waits for one at most
+    C.EVENT_WAIT seconds, so the main loop sleeps between the scheduled messages.
+    """
+    global expectedMsgId
+    event = DW1000.pollEvent(C.EVENT_WAIT)
+    if event is None:
+        schedule()
+        return
+
+    if BROADCAST_POLL:
+        if event.kind == C.EVENT_SENT:
+            handleBroadcast(event, None)
+        elif received.decode(event.data) and received.destination == tagAddress:
+            handleBroadcast(event, received)
         return
 
-    if sentAck:
-        sentAck = False
-        msgID = data[0]      
-        if msgID == C.POLL:
-            timePollSentTS = DW1000.getTransmitTimestamp()
-            #print "timePollSentTS : {}".format(timePollSentTS)
-        elif msgID == C.RANGE:
-            timeRangeSentTS = DW1000.getTransmitTimestamp()
-            noteActivity()
-
-    if receivedAck:
-        receivedAck = False
-        data = DW1000.getData(LEN_DATA)
-        msgID = data[0]
+    if event.kind == C.EVENT_SENT:
+        if currentAnchor is None:
+            return
+        if sentMsgId == C.POLL:
+            currentAnchor.timePollSent = event.timestamp
+            #print "timePollSentTS : {}".format(currentAnchor.timePollSent)
+        elif sentMsgId == C.RANGE:
+            currentAnchor.timeRangeSent = event.timestamp
+            if not DW1000Ranging.hasReport(currentAnchor.protocol):
+                # the anchor keeps the range
+                finishExchange(None)
+
+    elif event.kind == C.EVENT_RECEIVED:
+        if not received.decode(event.data) or received.destination != tagAddress:
+            return
+        if currentAnchor is None or received.source != currentAnchor.address:
+            # late answer of an anchor whose exchange was given up
+            return
+        msgID = received.messageId
+        if msgID == C.RANGE_FAILED and expectedMsgId == C.RANGE_REPORT:
+            # the anchor could not compute the range, see DW1000Device.rangeFailed
+            finishExchange(None, True, True)
+            return
         if msgID != expectedMsgId:
-            expectedMsgId = C.POLL_ACK
-            transmitPoll()
+            # protocol error
+            finishExchange(None, False)
             return
         if msgID == C.POLL_ACK:
-            timePollAckReceivedTS = DW1000.getReceiveTimestamp()
-            #print "timePollAckReceivedTS : {}".format(timePollAckReceivedTS)
-            expectedMsgId = C.RANGE_REPORT
-            transmitRange()
-            noteActivity()
+            currentAnchor.timePollAckReceived = event.timestamp
+            #print "timePollAckReceivedTS : {}".format(currentAnchor.timePollAckReceived)
+            if DW1000Ranging.hasFinalMessage(currentAnchor.protocol):
+                expectedMsgId = C.RANGE_REPORT
+                transmitRange(currentAnchor)
+            else:
+                distance = computeSingleSided(currentAnchor, received, event)
+                finishExchange(distance, distance is not None)
         elif msgID == C.RANGE_REPORT:
-            expectedMsgId = C.POLL_ACK
-            transmitPoll()
-            noteActivity()
-        elif msgID == C.RANGE_FAILED:
-            expectedMsgId = C.POLL_ACK
-            transmitPoll()
-            noteActivity()
+            # the anchor sends back the time of flight it computed
+            finishExchange(received.timeOfFlight * C.DISTANCE_OF_RADIO)
 
 
 try:
@@ -158,16 +444,29 @@ try:
     DW1000.begin(PIN_IRQ)
     DW1000.setup(PIN_SS)
     #print("DW1000 initialized")
-    #print("############### TAG ##############")	
+    #print("############### TAG ##############")
 
     DW1000.generalConfiguration("7D:00:22:EA:82:60:3B:9C", C.MODE_LONGDATA_FAST_ACCURACY)
-    DW1000.registerCallback("handleSent", handleSent)
-    DW1000.registerCallback("handleReceived", handleReceived)
+    DW1000.enableEventQueue()
+    DW1000.enableReplyDelayTuning()
+    # the frames of the other networks and the ones addressed to other devices are dropped by the chip, without interrupt
+    DW1000.enableFrameFiltering()
+    if not DW1000Ranging.hasFinalMessage(RANGING_PROTOCOL):
+        # the single-sided ranges are corrected with the clock offset of the POLL_ACK
+        DW1000.enableClockOffset()
+    if BROADCAST_POLL:
+        # the replies of the anchors follow each other closely
+        DW1000.enableDoubleBuffer()
     DW1000.setAntennaDelay(C.ANTENNA_DELAY_RASPI)
+    tagAddress = DW1000.getDeviceAddress()
+    frame = DW1000Frame.RangingFrame(tagAddress)
+    received = DW1000Frame.RangingFrame(tagAddress)
+    for address in ANCHOR_ADDRESSES:
+        anchors[address] = DW1000Device(address, ANCHOR)
+        anchors[address].protocol = RANGING_PROTOCOL
 
     receiver()
-    transmitPoll()
-    noteActivity()
+    epochStart = millis()
     while 1:
         loop()
 
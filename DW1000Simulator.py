@@ -0,0 +1,555 @@
+"""
+This python module contains an in-process model of the DW1000 chip and a bus backend using it, so the DW1000 module can run without
+a radio (benchmarks, CI machines). Only the behaviour the driver relies on is modelled: a register file accessed with the SPI header
+format of the user manual, the write-1-to-clear SYS_STATUS register, SYS_TIME, the TX/RX buffers, immediate and delayed transmissions
+with their TX_TIME (HPDWARN when late), receptions with their RX_TIME and diagnostics, single or double buffered (HSRBP/ICRBP, HRBPT,
+RXOVRR), the frame filtering (AFFREJ) and automatic acknowledgement (AAT) of the IEEE 802.15.4 frames, the interrupt line
+(SYS_STATUS & SYS_MASK) and the SPI clock limit (C.SPI_XTI_MAX_SPEED on the crystal, maxSpiSpeed otherwise): faster transactions read
+bit shifted bytes and lose their writes.
+The chips sharing a SimulatedBus also share the air: a frame sent by one of them is received by the others which are listening. Each chip
+may have a crystal offset (clockOffset, in ppm): its SYS_TIME runs accordingly and the receivers report the offset in DRX_CAR_INT.
+It requires the following modules: time, threading, DW1000Constants.
+
+Usage:
+        bus = DW1000Simulator.SimulatedBus()
+        DW1000.begin(PIN_IRQ, bus)
+        DW1000.setup(PIN_SS)
+        bus.chips[PIN_SS].receiveFrame([1, 2, 3])
+"""
+
+import time
+import threading
+import DW1000Constants as C
+
+DEV_ID_VALUE = [0x30, 0x01, 0xCA, 0xDE]
+# Diagnostics reported for every simulated reception, around -80 dBm with the 64 MHz PRF.
+PREAMBLE_COUNT = 500
+CIR_POWER = 28473
+FP_AMPLITUDE = 28000
+STD_NOISE = 50
+# Registers swapped between the two receive buffer sets in double buffered mode
+RX_BUFFER_SET = [C.RX_FINFO, C.RX_BUFFER, C.RX_FQUAL, C.RX_TIME]
+# SYS_STATUS bits which are not cleared by writing 1
+STATUS_READ_ONLY = (1 << C.HSRBP_BIT) | (1 << C.ICRBP_BIT)
+
+_monotonic = getattr(time, "monotonic", time.time)
+
+
+def _toValue(data):
+    """
+    This function converts little endian bytes into an integer.
+    """
+    value = 0
+    for i in range(len(data) - 1, -1, -1):
+        value = (value << 8) | data[i]
+    return value
+
+
+def _toBytes(value, n):
+    """
+    This function converts an integer into n little endian bytes.
+    """
+    return bytearray([(value >> (i * 8)) & C.MASK_LS_BYTE for i in range(0, n)])
+
+
+class DW1000Simulator(object):
+    """
+    Register file model of one DW1000 chip.
+    """
+
+    def __init__(self, clock=None):
+        """
+        Args:
+                clock: A function returning the current time in seconds, used to run SYS_TIME. Defaults to a monotonic clock.
+        """
+        self.clock = clock or _monotonic
+        self.registers = {}
+        self.receiving = False
+        self.transmitted = []
+        self.onTransmit = None
+        self.air = None
+        self.rxSets = [None, None]
+        self.hostBuffer = 0
+        self.chipBuffer = 0
+        self.irq = None
+        self.clockOffset = 0.0
+        self.spiSpeed = C.SPI_SLOW_SPEED
+        # highest SPI clock frequency of the link on the PLL, lower to model bad wiring
+        self.maxSpiSpeed = C.SPI_FAST_SPEED
+        # the PLL locks as soon as the chip leaves the crystal clock, set to False to model a PLL which never locks
+        self.pllLocks = True
+        self._irqLevel = False
+        self._edge = False
+        self.register(C.DEV_ID, 4)[:] = bytearray(DEV_ID_VALUE)
+        self.setValue(C.SYS_STATUS, 0, 1 << C.CPLOCK_BIT, 5)
+
+    def register(self, reg, length):
+        """
+        This function returns the storage of a register, grown to at least the given length.
+        """
+        data = self.registers.setdefault(reg, bytearray())
+        if len(data) < length:
+            data.extend(bytearray(length - len(data)))
+        return data
+
+    def getValue(self, reg, offset, n):
+        """
+        This function returns the n bytes at the given offset of a register as an integer.
+        """
+        return _toValue(self.register(reg, offset + n)[offset:offset + n])
+
+    def setValue(self, reg, offset, value, n):
+        """
+        This function stores an integer into the n bytes at the given offset of a register.
+        """
+        self.register(reg, offset + n)[offset:offset + n] = _toBytes(value, n)
+
+    def systemTime(self):
+        """
+        This function returns the value of the SYS_TIME counter. The 9 low order bits are always zero, see 7.2.9 of the user manual.
+        """
+        return int(self.ticksAt(self.clock())) & (C.TIME_OVERFLOW - 1) & ~0x1FF
+
+    def ticksAt(self, seconds):
+        """
+        This function returns the unwrapped value of the chip's time counter at the given time of the clock, in DW1000 time units.
+        """
+        return seconds * 1000000 * C.TIME_RES_INV * (1 + self.clockOffset * 1e-6)
+
+    def setStatus(self, *bits):
+        """
+        This function sets event bits in SYS_STATUS, which raises the interrupt line if one of them is unmasked.
+        """
+        status = self.getValue(C.SYS_STATUS, 0, 5)
+        for bit in bits:
+            status |= 1 << bit
+        self.setValue(C.SYS_STATUS, 0, status, 5)
+        self.updateInterrupt()
+
+    def interruptAsserted(self):
+        """
+        This function returns the level of the IRQ line: high while an unmasked event is pending in SYS_STATUS.
+        """
+        return (self.getValue(C.SYS_STATUS, 0, 4) & self.getValue(C.SYS_MASK, 0, 4)) != 0
+
+    def updateInterrupt(self):
+        """
+        This function samples the IRQ line and latches a rising edge.
+        """
+        level = self.interruptAsserted()
+        if level and not self._irqLevel:
+            self._edge = True
+        self._irqLevel = level
+
+    def takeEdge(self):
+        """
+        This function returns True once for every rising edge of the IRQ line.
+        """
+        edge = self._edge
+        self._edge = False
+        return edge
+
+    def transfer(self, data):
+        """
+        This function decodes and executes one SPI transaction, see 2.2.1.2 of the user manual.
+
+        Args:
+                data: The bytes clocked in by the host (header followed by the payload or junk bytes).
+
+        Returns:
+                The bytes clocked out by the chip.
+        """
+        header = data[0]
+        reg = header & 0x3F
+        headerLen = 1
+        offset = 0
+        if header & C.READ_SUB:
+            offset = data[1]
+            headerLen = 2
+            if offset & C.RW_SUB_EXT:
+                offset = (offset & 0x7F) | (data[2] << 7)
+                headerLen = 3
+        payload = bytearray(data[headerLen:])
+        rx = [0] * len(data)
+        tooFast = self.spiSpeed > self.maxSpeed()
+        if header & C.WRITE:
+            if not tooFast:
+                self.write(reg, offset, payload)
+        else:
+            rx[headerLen:] = self.read(reg, offset, len(payload))
+            if tooFast:
+                # the host samples MISO one bit late
+                rx[headerLen:] = [((rx[i] << 1) | (rx[i + 1] >> 7 if i + 1 < len(rx) else 0)) & C.MASK_LS_BYTE
+                                  for i in range(headerLen, len(rx))]
+        self.updateInterrupt()
+        return rx
+
+    def maxSpeed(self):
+        """
+        This function returns the highest SPI clock frequency of the chip in its current clock mode (PMSC_CTRL0 SYSCLKS). Without a PLL lock,
+        the chip stays on its crystal.
+        """
+        if self.getValue(C.PMSC, C.PMSC_CTRL0_SUB, 1) & 0x03 == C.XTI_CLOCK or not self.pllLocks:
+            return min(self.maxSpiSpeed, C.SPI_XTI_MAX_SPEED)
+        return self.maxSpiSpeed
+
+    def read(self, reg, offset, n):
+        """
+        This function returns n bytes of a register, SYS_TIME is sampled on every read.
+        """
+        if reg == C.SYS_TIME:
+            self.setValue(C.SYS_TIME, 0, self.systemTime(), 5)
+        return self.register(reg, offset + n)[offset:offset + n]
+
+    def write(self, reg, offset, data):
+        """
+        This function writes bytes into a register and performs the actions of SYS_STATUS, SYS_CTRL and PMSC writes.
+        """
+        if reg == C.SYS_STATUS:
+            # status bits are cleared by writing 1 to them
+            status = self.register(C.SYS_STATUS, offset + len(data))
+            for i in range(0, len(data)):
+                readOnly = (STATUS_READ_ONLY >> ((offset + i) * 8)) & C.MASK_LS_BYTE
+                status[offset + i] &= ~(data[i] & ~readOnly) & C.MASK_LS_BYTE
+            return
+        self.register(reg, offset + len(data))[offset:offset + len(data)] = data
+        if reg == C.SYS_CTRL:
+            self.systemControl(self.getValue(C.SYS_CTRL, 0, 4))
+            # the control bits are self clearing
+            self.setValue(C.SYS_CTRL, 0, 0, 4)
+        elif reg == C.PMSC and offset <= 3 < offset + len(data) and data[3 - offset] == C.SOFT_RESET_RX:
+            # receiver soft reset: both receive buffers are discarded
+            self.receiving = False
+            self.rxSets = [None, None]
+        if reg == C.PMSC and offset == C.PMSC_CTRL0_SUB and data[0] & 0x03 != C.XTI_CLOCK and self.pllLocks:
+            # leaving the crystal clock, the PLL locks at once
+            self.setStatus(C.CPLOCK_BIT)
+
+    def systemControl(self, sysctrl):
+        """
+        This function executes the receiver and transmitter commands written into SYS_CTRL.
+        """
+        if sysctrl & (1 << C.TRXOFF_BIT):
+            self.receiving = False
+        if sysctrl & (1 << C.TXSTRT_BIT):
+            self.transmit(sysctrl & (1 << C.TXDLYS_BIT))
+        if sysctrl & (1 << C.RXENAB_BIT):
+            self.receiving = True
+        if sysctrl & (1 << C.HRBPT_BIT):
+            self.toggleHostBuffer()
+
+    def carrierIntegrator(self, clockOffset):
+        """
+        This function returns the DRX_CAR_INT value measured for a transmitter whose clock is clockOffset ppm faster, at the channel and the
+        data rate configured in CHAN_CTRL and TX_FCTRL.
+        """
+        channel = self.getValue(C.CHAN_CTRL, 0, 1) & C.MASK_NIBBLE
+        if channel >= len(C.CARRIER_FREQUENCY) or not C.CARRIER_FREQUENCY[channel]:
+            # not configured yet
+            return 0
+        if (self.getValue(C.TX_FCTRL, 0, 2) >> 13) & 0x03 == C.TRX_RATE_110KBPS:
+            multiplier = C.FREQ_OFFSET_MULTIPLIER_110KBPS
+        else:
+            multiplier = C.FREQ_OFFSET_MULTIPLIER
+        return int(round(-clockOffset * 1e-6 * C.CARRIER_FREQUENCY[channel] / multiplier))
+
+    def doubleBuffered(self):
+        """
+        This function returns True if the double buffered reception is enabled (DIS_DRXB cleared in SYS_CFG).
+        """
+        return not self.getValue(C.SYS_CFG, 0, 4) & (1 << C.DIS_DRXB_BIT)
+
+    def updateBufferPointers(self):
+        """
+        This function reports the host and chip side buffer pointers in SYS_STATUS.
+        """
+        status = self.getValue(C.SYS_STATUS, 0, 4) & ~STATUS_READ_ONLY
+        status |= (self.hostBuffer << C.HSRBP_BIT) | (self.chipBuffer << C.ICRBP_BIT)
+        self.setValue(C.SYS_STATUS, 0, status, 4)
+
+    def showBuffer(self):
+        """
+        This function maps the buffer set pointed by the host into the RX registers and raises its frame events.
+        """
+        rxSet = self.rxSets[self.hostBuffer]
+        for reg in RX_BUFFER_SET:
+            self.registers[reg] = bytearray(rxSet[reg])
+        self.setStatus(C.RXDFR_BIT, C.RXFCG_BIT, C.LDEDONE_BIT)
+
+    def toggleHostBuffer(self):
+        """
+        This function releases the buffer set read by the host and points the host to the other one (HRBPT).
+        """
+        self.rxSets[self.hostBuffer] = None
+        self.hostBuffer ^= 1
+        self.updateBufferPointers()
+        if self.rxSets[self.hostBuffer] is not None:
+            self.showBuffer()
+
+    def transmit(self, delayed):
+        """
+        This function sends the frame held in the TX buffer, reports its TX_TIME and sets the transmit done events.
+        """
+        length = self.getValue(C.TX_FCTRL, 0, 2) & C.GET_DATA_MASK
+        frame = bytearray(self.register(C.TX_BUFFER, length)[:max(length - 2, 0)])
+        if delayed:
+            txTime = self.getValue(C.DX_TIME, 0, 5) & ~0x1FF
+            if (txTime - int(self.ticksAt(self.clock()))) % C.TIME_OVERFLOW > C.TIME_OVERFLOW // 2:
+                # already past: the chip would wait for its counter to come around, the frame is not sent
+                self.setStatus(C.HPDWARN_BIT)
+                return
+        else:
+            txTime = self.systemTime()
+        txTime = (txTime + self.getValue(C.TX_ANTD, 0, 2)) % C.TIME_OVERFLOW
+        self.setValue(C.TX_TIME, C.TX_STAMP_SUB, txTime, 5)
+        self.transmitted.append(frame)
+        self.setStatus(C.TXFRB_BIT, C.TXPRS_BIT, C.TXPHS_BIT, C.TXFRS_BIT)
+        if self.onTransmit is not None:
+            self.onTransmit(frame, txTime)
+        if self.air is not None:
+            self.air.broadcast(self, frame, txTime)
+
+    def receiveFrame(self, data, timestamp=None, clockOffset=0.0):
+        """
+        This function simulates the reception of a frame: it fills the RX buffer, RX_FINFO, RX_TIME, RX_FQUAL and DRX_CAR_INT and sets the
+        good frame events. The frame is lost if the receiver is not enabled.
+
+        Args:
+                data: The frame payload, without the CRC.
+                timestamp: The RX timestamp to report, defaults to the current system time.
+                clockOffset: The offset of the transmitter's clock relative to this chip's one, in ppm.
+
+        Returns:
+                True if the frame was received.
+        """
+        if not self.receiving:
+            return False
+        if not self.acceptsFrame(data):
+            # dropped by the frame filter, the receiver stays on
+            self.setStatus(C.AFFREJ_BIT)
+            return False
+        if timestamp is None:
+            timestamp = self.systemTime()
+        doubleBuffered = self.doubleBuffered()
+        if doubleBuffered and self.rxSets[self.chipBuffer] is not None:
+            # the host still holds both buffers
+            self.setStatus(C.RXOVRR_BIT)
+            return False
+        if not doubleBuffered:
+            # the receiver is turned off after a good frame in single buffered mode
+            self.receiving = False
+        self.register(C.RX_BUFFER, len(data))[0:len(data)] = bytearray(data)
+        self.setValue(C.RX_FINFO, 0, ((len(data) + 2) & C.GET_DATA_MASK) | (PREAMBLE_COUNT << 20), 4)
+        self.setValue(C.RX_TIME, C.RX_STAMP_SUB, timestamp % C.TIME_OVERFLOW, 5)
+        self.setValue(C.RX_TIME, C.FP_AMPL1_SUB, FP_AMPLITUDE, 2)
+        self.setValue(C.RX_FQUAL, C.STD_NOISE_SUB, STD_NOISE, 2)
+        self.setValue(C.RX_FQUAL, C.FP_AMPL2_SUB, FP_AMPLITUDE, 2)
+        self.setValue(C.RX_FQUAL, C.PP_AMPL3_SUB, FP_AMPLITUDE, 2)
+        self.setValue(C.RX_FQUAL, C.CIR_PWR_SUB, CIR_POWER, 2)
+        self.setValue(C.DRX_CONF, C.DRX_CAR_INT_SUB, self.carrierIntegrator(clockOffset) & C.DRX_CAR_INT_MASK, 3)
+        if not doubleBuffered:
+            self.setStatus(C.RXDFR_BIT, C.RXFCG_BIT, C.LDEDONE_BIT)
+            self.acknowledge(data)
+            return True
+        rxSet = dict((reg, bytearray(self.registers[reg])) for reg in RX_BUFFER_SET)
+        self.rxSets[self.chipBuffer] = rxSet
+        self.chipBuffer ^= 1
+        self.updateBufferPointers()
+        if self.rxSets[self.hostBuffer] is rxSet:
+            self.showBuffer()
+        else:
+            # the host is reading the other buffer, keep its registers
+            hostSet = self.rxSets[self.hostBuffer] or rxSet
+            for reg in RX_BUFFER_SET:
+                self.registers[reg] = bytearray(hostSet[reg])
+        self.acknowledge(data)
+        return True
+
+    def acceptsFrame(self, data):
+        """
+        This function applies the frame filtering configured in SYS_CFG to a received frame, see 5.2 of the user manual.
+
+        Returns:
+                True if the frame is accepted, always when the filtering is disabled.
+        """
+        syscfg = self.getValue(C.SYS_CFG, 0, 4)
+        if not syscfg & (1 << C.FFEN_BIT):
+            return True
+        if len(data) < 3:
+            return False
+        frameControl = data[0] | (data[1] << 8)
+        frameType = frameControl & 0x07
+        if frameType > C.FRAME_TYPE_MAC_COMMAND or not syscfg & (1 << (C.FFAB_BIT + frameType)):
+            return False
+        if frameType == C.FRAME_TYPE_ACK:
+            return True
+        destinationMode = (frameControl >> 10) & 0x03
+        if destinationMode == 0:
+            return frameType == C.FRAME_TYPE_BEACON or bool(syscfg & (1 << C.FFBC_BIT))
+        addressLength = 2 if destinationMode == 2 else 8
+        if destinationMode == 1 or len(data) < 5 + addressLength:
+            return False
+        panId = data[3] | (data[4] << 8)
+        if panId != C.BROADCAST_PAN_ID and panId != self.getValue(C.PANADR, 2, 2):
+            return False
+        if destinationMode == 2:
+            address = data[5] | (data[6] << 8)
+            return address == C.BROADCAST_ADDRESS or address == self.getValue(C.PANADR, 0, 2)
+        return _toValue(bytearray(data[5:13])) == self.getValue(C.EUI, 0, 8)
+
+    def acknowledge(self, data):
+        """
+        This function sends the automatic acknowledgement of a received frame requesting one, when enabled in SYS_CFG, see 5.3 of the user
+        manual. The frame is assumed to have passed the frame filter.
+        """
+        syscfg = self.getValue(C.SYS_CFG, 0, 4)
+        if not syscfg & (1 << C.AUTOACK_BIT) or not syscfg & (1 << C.FFEN_BIT) or len(data) < 7:
+            return
+        frameControl = data[0] | (data[1] << 8)
+        if not frameControl & 0x20 or frameControl & 0x07 not in (C.FRAME_TYPE_DATA, C.FRAME_TYPE_MAC_COMMAND):
+            return
+        if (frameControl >> 10) & 0x03 == 2 and data[5] | (data[6] << 8) == C.BROADCAST_ADDRESS:
+            return
+        self.setStatus(C.AAT_BIT)
+        ack = bytearray([C.FRAME_TYPE_ACK, 0, data[2]])
+        txTime = self.systemTime()
+        self.setValue(C.TX_TIME, C.TX_STAMP_SUB, txTime, 5)
+        self.transmitted.append(ack)
+        self.setStatus(C.TXFRB_BIT, C.TXPRS_BIT, C.TXPHS_BIT, C.TXFRS_BIT)
+        if self.air is not None:
+            self.air.broadcast(self, ack, txTime)
+
+
+class SimulatedBus(object):
+    """
+    Bus backend connecting the DW1000 module to simulated chips, one per chip select. Interrupt callbacks are dispatched synchronously
+    once the SPI transaction or the simulated event which raised the IRQ line has completed, never from inside another callback. When
+    several threads do transactions, the callbacks run in the thread already dispatching, one at a time.
+    The chips all run from the same clock and hear each other's frames timeOfFlight ticks after they were sent.
+    """
+
+    def __init__(self, clock=None, timeOfFlight=0):
+        """
+        Args:
+                clock: The clock given to the simulated chips, see DW1000Simulator.
+                timeOfFlight: The propagation delay between the chips, in DW1000 time units (~15.65 ps).
+        """
+        self.clock = clock
+        self.timeOfFlight = timeOfFlight
+        self.lock = threading.RLock()
+        self.chips = {}
+        self._interrupts = {}
+        self._lastIrq = None
+        self._dispatching = False
+        self._redispatch = False
+
+    def open(self):
+        """
+        Nothing to open, the chips are simulated.
+        """
+        pass
+
+    def close(self):
+        """
+        Nothing to close, the chips are simulated.
+        """
+        pass
+
+    def setupInterrupt(self, irq, callback):
+        """
+        This function registers the interrupt callback of a pin. The next chip select set up is wired to this pin.
+        """
+        self._interrupts[irq] = callback
+        self._lastIrq = irq
+
+    def interruptAsserted(self, irq):
+        """
+        This function returns the level of the interrupt line of a pin.
+        """
+        for chip in self.chips.values():
+            if chip.irq == irq:
+                return chip.interruptAsserted()
+        return False
+
+    def setupChipSelect(self, ss):
+        """
+        This function creates the simulated chip answering on the given chip select, unless it was added beforehand.
+        """
+        chip = self.chips.get(ss)
+        if chip is None:
+            chip = self.chips[ss] = DW1000Simulator(self.clock)
+        chip.air = self
+        if chip.irq is None:
+            chip.irq = self._lastIrq
+        return chip
+
+    def setSpeed(self, ss, speed):
+        """
+        This function sets the SPI clock frequency of the transactions with the chip on the given chip select.
+        """
+        self.chips[ss].spiSpeed = speed
+
+    def transfer(self, ss, data):
+        """
+        This function performs a full duplex SPI transaction with the chip on the given chip select, see DW1000Bus.SpiBus.transfer.
+        """
+        with self.lock:
+            rx = self.chips[ss].transfer(data)
+        self.dispatch()
+        return rx
+
+    def write(self, ss, data):
+        """
+        This function performs a write only SPI transaction with the chip on the given chip select.
+        """
+        with self.lock:
+            self.chips[ss].transfer(data)
+        self.dispatch()
+
+    def broadcast(self, sender, frame, txTime):
+        """
+        This function delivers a frame sent by one chip to the other chips of the bus. The TX timestamp is converted to the time counter of
+        each receiver, which may run at a different rate.
+        """
+        now = sender.clock()
+        delay = (txTime - sender.ticksAt(now)) % C.TIME_OVERFLOW
+        if delay > C.TIME_OVERFLOW // 2:
+            delay -= C.TIME_OVERFLOW
+        for chip in self.chips.values():
+            if chip is not sender:
+                rate = (1 + chip.clockOffset * 1e-6) / (1 + sender.clockOffset * 1e-6)
+                timestamp = int(round(chip.ticksAt(now) + delay * rate + self.timeOfFlight))
+                chip.receiveFrame(frame, timestamp, sender.clockOffset - chip.clockOffset)
+
+    def dispatch(self):
+        """
+        This function calls the interrupt callbacks of the chips whose IRQ line had a rising edge. Call it after injecting events
+        (e.g. receiveFrame) from outside the driver.
+        """
+        with self.lock:
+            if self._dispatching:
+                # the callback running, or another thread's dispatch, goes on with the edges raised meanwhile
+                self._redispatch = True
+                return
+            self._dispatching = True
+        try:
+            while True:
+                pending = True
+                while pending:
+                    pending = False
+                    for chip in list(self.chips.values()):
+                        # the edges are latched by the transactions, under the lock
+                        with self.lock:
+                            edge = chip.takeEdge()
+                        if edge and chip.irq in self._interrupts:
+                            pending = True
+                            self._interrupts[chip.irq](chip.irq)
+                with self.lock:
+                    if not self._redispatch:
+                        self._dispatching = False
+                        return
+                    self._redispatch = False
+        except BaseException:
+            with self.lock:
+                self._dispatching = self._redispatch = False
+            raise
@@ -0,0 +1,258 @@
+"""
+This python module contains the time difference of arrival (TDoA) helpers used by the TDoATAG and TDoAAnchor scripts: the blink message sent
+by the tags, the records the anchors stream to a collector, one per received blink, and the synchronization of the anchors' clocks.
+It requires the following modules: socket, struct, DW1000Constants, DW1000Timestamp.
+
+A blink payload is C.BLINK, the sequence number of the blink and the short address of the tag (little endian), LEN_BLINK bytes.
+A sync beacon payload, sent periodically by the reference anchor, is C.SYNC, its sequence number, the short address of the reference anchor
+and its TX timestamp (5 bytes), LEN_SYNC bytes. Every other anchor feeds the beacons it receives to a ClockModel, which translates its
+timestamps into the reference anchor's timebase.
+A record is packed with RECORD_FORMAT (anchor address, tag address, sequence number, bias corrected RX timestamp, receive power in dBm) and
+several records are sent in one UDP datagram. On the collector side:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.bind(("", DW1000TDoA.COLLECTOR_PORT))
+        for record in DW1000TDoA.unpackRecords(sock.recv(65536)):
+                ...
+"""
+
+import socket
+import struct
+from collections import namedtuple
+import DW1000Constants as C
+import DW1000Timestamp
+
+LEN_BLINK = 4
+LEN_SYNC = 9
+RECORD_FORMAT = "<HHBQf"
+COLLECTOR_PORT = 5005
+# records sent in one datagram at most
+RECORD_BATCH = 32
+# Clock model: standard deviation of the timestamps (~0.15 ns), random walk of the drift (0.01 ppm per square root of second) and initial
+# uncertainty of the drift (20 ppm), in DW1000 time units. An innovation above RESYNC_THRESHOLD (~16 us) restarts the synchronization.
+MEASUREMENT_NOISE = 10.0 ** 2
+DRIFT_NOISE = 0.01e-6 ** 2 / (C.TIME_RES_INV * 1000000)
+INITIAL_DRIFT_VARIANCE = 20e-6 ** 2
+RESYNC_THRESHOLD = 1000000
+
+BlinkRecord = namedtuple("BlinkRecord", ["anchor", "tag", "sequence", "rxTimestamp", "rxPower"])
+
+_record = struct.Struct(RECORD_FORMAT)
+
+
+def setBlink(data, tagAddress, sequence):
+    """
+    This function writes a blink into the data that will be sent.
+
+    Args:
+            data: The payload, at least LEN_BLINK bytes long.
+            tagAddress: The short address of the tag.
+            sequence: The sequence number of the blink, modulo 256.
+    """
+    data[0] = C.BLINK
+    data[1] = sequence & C.MASK_LS_BYTE
+    data[2] = tagAddress & C.MASK_LS_BYTE
+    data[3] = (tagAddress >> 8) & C.MASK_LS_BYTE
+
+
+def getBlink(data):
+    """
+    This function reads a blink from a received payload.
+
+    Args:
+            data: The received payload.
+
+    Returns:
+            The (tag address, sequence number) of the blink, None if the payload is not a blink.
+    """
+    if len(data) < LEN_BLINK or data[0] != C.BLINK:
+        return None
+    return (data[2] | (data[3] << 8), data[1])
+
+
+def setSync(data, referenceAddress, sequence, txTimestamp):
+    """
+    This function writes a sync beacon into the data that will be sent.
+
+    Args:
+            data: The payload, at least LEN_SYNC bytes long.
+            referenceAddress: The short address of the reference anchor.
+            sequence: The sequence number of the beacon, modulo 256.
+            txTimestamp: The TX timestamp of the beacon, see DW1000.setDelay.
+    """
+    data[0] = C.SYNC
+    data[1] = sequence & C.MASK_LS_BYTE
+    data[2] = referenceAddress & C.MASK_LS_BYTE
+    data[3] = (referenceAddress >> 8) & C.MASK_LS_BYTE
+    DW1000Timestamp.pack(data, txTimestamp, 4)
+
+
+def getSync(data):
+    """
+    This function reads a sync beacon from a received payload.
+
+    Args:
+            data: The received payload.
+
+    Returns:
+            The (reference address, sequence number, TX timestamp) of the beacon, None if the payload is not a beacon.
+    """
+    if len(data) < LEN_SYNC or data[0] != C.SYNC:
+        return None
+    return (data[2] | (data[3] << 8), data[1], DW1000Timestamp.unpack(data, 4))
+
+
+def unpackRecords(datagram):
+    """
+    This function decodes the records of a datagram sent by a UdpCollector.
+
+    Args:
+            datagram: The received bytes.
+
+    Returns:
+            A list of BlinkRecord.
+    """
+    size = _record.size
+    return [BlinkRecord(*_record.unpack_from(datagram, offset)) for offset in range(0, len(datagram) - size + 1, size)]
+
+
+class UdpCollector(object):
+    """
+    Sink streaming the records of an anchor to the collector over UDP. The records are packed into a preallocated buffer and sent by batches
+    of RECORD_BATCH, or when flush() is called: call it when the anchor is idle so the records are not delayed.
+    """
+
+    def __init__(self, host, port=COLLECTOR_PORT, batch=RECORD_BATCH):
+        """
+        Args:
+                host: The host name or IP address of the collector.
+                port: The UDP port of the collector.
+                batch: The number of records sent in one datagram at most.
+        """
+        self.address = (host, port)
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.buffer = bytearray(_record.size * batch)
+        self.length = 0
+
+    def send(self, record):
+        """
+        This function queues a record, the batch is sent once it is full.
+
+        Args:
+                record: The BlinkRecord. Its RX timestamp is sent modulo C.TIME_OVERFLOW: a range bias correction may take it out of the
+                        40 bits.
+        """
+        _record.pack_into(self.buffer, self.length, record.anchor, record.tag, record.sequence, record.rxTimestamp % C.TIME_OVERFLOW,
+                          record.rxPower)
+        self.length += _record.size
+        if self.length == len(self.buffer):
+            self.flush()
+
+    def flush(self):
+        """
+        This function sends the queued records.
+        """
+        if self.length:
+            self.socket.sendto(bytes(self.buffer[:self.length]), self.address)
+            self.length = 0
+
+    def close(self):
+        """
+        This function sends the queued records and closes the socket.
+        """
+        self.flush()
+        self.socket.close()
+
+
+class ClockModel(object):
+    """
+    Model of the clock of an anchor relative to the reference anchor's one: reference time = local time + offset, the offset changing by
+    drift per local time unit. It is a two states (offset, drift) Kalman filter updated with each sync beacon, in O(1) time and constant
+    memory. The offset is kept modulo C.TIME_OVERFLOW and every time interval is a modular difference, so the counters may overflow
+    between beacons, as long as the beacons are less than ~8 s apart.
+    """
+
+    def __init__(self, timeOfFlight=0, measurementNoise=MEASUREMENT_NOISE, driftNoise=DRIFT_NOISE):
+        """
+        Args:
+                timeOfFlight: The propagation time from the reference anchor, in DW1000 time units (distance * C.DISTANCE_OF_RADIO_INV).
+                measurementNoise: The variance of the timestamps.
+                driftNoise: The variance of the random walk of the drift, per time unit.
+        """
+        self.timeOfFlight = timeOfFlight
+        self.measurementNoise = measurementNoise
+        self.driftNoise = driftNoise
+        self.reset()
+
+    def reset(self):
+        """
+        This function forgets the synchronization, e.g. when the reference anchor restarted.
+        """
+        self.lastLocal = None
+        self.offset = 0.0
+        self.drift = 0.0
+        self.p00 = 0.0
+        self.p01 = 0.0
+        self.p11 = 0.0
+        self.updates = 0
+
+    def isSynchronized(self):
+        """
+        This function tells if enough beacons were received to estimate both the offset and the drift.
+        """
+        return self.updates >= 2
+
+    def update(self, localTimestamp, referenceTimestamp):
+        """
+        This function updates the model with a sync beacon.
+
+        Args:
+                localTimestamp: The receive timestamp of the beacon.
+                referenceTimestamp: The TX timestamp of the beacon, carried in it.
+
+        Returns:
+                The difference between the measured offset and the predicted one, in DW1000 time units.
+        """
+        measured = DW1000Timestamp.elapsed(referenceTimestamp + self.timeOfFlight, localTimestamp)
+        if self.lastLocal is None:
+            self.offset = float(measured)
+            self.p00 = self.measurementNoise
+            self.p11 = INITIAL_DRIFT_VARIANCE
+            self.lastLocal = localTimestamp
+            self.updates = 1
+            return 0.0
+        dt = DW1000Timestamp.difference(localTimestamp, self.lastLocal)
+        # prediction, the drift following a random walk
+        offset = self.offset + self.drift * dt
+        q = self.driftNoise * abs(dt)
+        p00 = self.p00 + 2 * dt * self.p01 + dt * dt * self.p11 + q * dt * dt / 3
+        p01 = self.p01 + dt * self.p11 + q * dt / 2
+        p11 = self.p11 + q
+        innovation = DW1000Timestamp.difference(measured, offset)
+        if self.isSynchronized() and abs(innovation) > RESYNC_THRESHOLD:
+            self.reset()
+            return self.update(localTimestamp, referenceTimestamp)
+        # correction with the measured offset
+        s = p00 + self.measurementNoise
+        k0 = p00 / s
+        k1 = p01 / s
+        self.offset = (offset + k0 * innovation) % C.TIME_OVERFLOW
+        self.drift += k1 * innovation
+        self.p00 = (1 - k0) * p00
+        self.p01 = (1 - k0) * p01
+        self.p11 = p11 - k1 * p01
+        self.lastLocal = localTimestamp
+        self.updates += 1
+        return innovation
+
+    def toReference(self, localTimestamp):
+        """
+        This function translates a local timestamp into the reference anchor's timebase.
+
+        Args:
+                localTimestamp: A timestamp of this anchor, e.g. the receive timestamp of a blink.
+
+        Returns:
+                The 40 bits timestamp in the reference timebase.
+        """
+        dt = DW1000Timestamp.difference(localTimestamp, self.lastLocal)
+        return int(round(localTimestamp + self.offset + self.drift * dt)) % C.TIME_OVERFLOW
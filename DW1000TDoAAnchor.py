@@ -0,0 +1,149 @@
+"""
+This python script is used to configure the DW1000 chip as an anchor for time difference of arrival (TDoA) positioning. It must be used in
+conjunction with the TDoATAG script.
+The anchor listens permanently: every blink is timestamped (receive timestamp corrected for the range bias) and a record (anchor, tag,
+sequence number, RX timestamp, receive power) is streamed to the collector at COLLECTOR_HOST, see DW1000TDoA.
+The timestamps of the records are in the timebase of the reference anchor (REFERENCE_ADDRESS). The reference anchor sends a sync beacon every
+SYNC_PERIOD milliseconds; the other anchors track their clock offset and drift with these beacons and only stream records once synchronized.
+REFERENCE_DISTANCE is the distance to the reference anchor, in meters.
+It requires the following modules: DW1000, DW1000Constants, DW1000TDoA and monotonic.
+"""
+
+
+import DW1000
+import monotonic
+import DW1000Constants as C
+import DW1000TDoA
+
+lastActivity = 0
+ANCHOR_ADDRESS = 0x0001
+REFERENCE_ADDRESS = 0x0001
+REFERENCE_DISTANCE = 0.0
+COLLECTOR_HOST = "127.0.0.1"
+SYNC_PERIOD = 200
+SYNC_DELAY_TIME_US = 1000
+collector = None
+clock = None
+data = [0] * DW1000TDoA.LEN_SYNC
+syncSequence = 0
+nextSync = 0
+
+
+def millis():
+    """
+    This function returns the value (in milliseconds) of a clock which never goes backwards. It detects the inactivity of the chip and
+    is used to avoid having the chip stuck in an undesirable state.
+    """
+    return int(round(monotonic.monotonic() * C.MILLISECONDS))
+
+
+def noteActivity():
+    """
+    This function records the time of the last activity so we can know if the device is inactive or not.
+    """
+    global lastActivity
+    lastActivity = millis()
+
+
+def receiver():
+    """
+    This function configures the chip to prepare for a message reception.
+    """
+    DW1000.newReceive()
+    DW1000.receivePermanently()
+    DW1000.startReceive()
+
+
+def transmitSync():
+    """
+    This function sends a sync beacon of the reference anchor. The transmission is delayed so its TX timestamp is known and carried in
+    the beacon.
+    """
+    global syncSequence, nextSync
+    DW1000.newTransmit()
+    txTimestamp = DW1000.setDelay(SYNC_DELAY_TIME_US, C.MICROSECONDS)
+    DW1000TDoA.setSync(data, ANCHOR_ADDRESS, syncSequence, txTimestamp)
+    DW1000.setData(data, DW1000TDoA.LEN_SYNC)
+    DW1000.startTransmit()
+    # the receiver is restarted once the beacon is sent, not by the inactivity reset
+    noteActivity()
+    syncSequence = (syncSequence + 1) & C.MASK_LS_BYTE
+    # after a stall of the loop, the missed periods are skipped rather than sent back to back
+    nextSync += SYNC_PERIOD * ((millis() - nextSync) // SYNC_PERIOD + 1)
+
+
+def loop():
+    """
+    This function handles the next event captured by the module's interrupt handler, see handleEvent(). The pending records are sent when
+    no event came within C.EVENT_WAIT seconds. The reference anchor sends its sync beacon once SYNC_PERIOD is elapsed, on every pass: a
+    steady flow of blinks does not delay it.
+    """
+    event = DW1000.pollEvent(C.EVENT_WAIT)
+    if event is None:
+        collector.flush()
+        if ((millis() - lastActivity) > C.RESET_PERIOD):
+            receiver()
+            noteActivity()
+    else:
+        handleEvent(event)
+    if clock is None and millis() >= nextSync:
+        transmitSync()
+
+
+def handleEvent(event):
+    """
+    This function turns a blink into a record for the collector, feeds the sync beacons of the reference anchor to the clock model and
+    restarts the receiver once a beacon is sent.
+
+    Args:
+            event: The RadioEvent.
+    """
+    if event.kind == C.EVENT_SENT:
+        # the beacon is sent, back to listening
+        receiver()
+
+    elif event.kind == C.EVENT_RECEIVED:
+        blink = DW1000TDoA.getBlink(event.data)
+        if blink is None:
+            sync = DW1000TDoA.getSync(event.data)
+            if sync is not None and clock is not None and sync[0] == REFERENCE_ADDRESS:
+                clock.update(event.timestamp, sync[2])
+                noteActivity()
+            return
+        if clock is None:
+            # the range bias correction may take the timestamp out of the 40 bits of the counter
+            rxTimestamp = event.timestamp % C.TIME_OVERFLOW
+        elif clock.isSynchronized():
+            rxTimestamp = clock.toReference(event.timestamp)
+        else:
+            return
+        tag, sequence = blink
+        rxPower = DW1000.getReceivePower(event.diagnostics)
+        collector.send(DW1000TDoA.BlinkRecord(ANCHOR_ADDRESS, tag, sequence, rxTimestamp, rxPower))
+        noteActivity()
+
+
+try:
+    PIN_IRQ = 19
+    PIN_SS = 16
+    DW1000.begin(PIN_IRQ)
+    DW1000.setup(PIN_SS)
+
+    DW1000.generalConfiguration("82:17:5B:D5:A9:9A:E2:9C", C.MODE_LONGDATA_FAST_ACCURACY, ANCHOR_ADDRESS)
+    DW1000.enableEventQueue()
+    # the blinks of many tags may follow each other closely
+    DW1000.enableDoubleBuffer()
+    DW1000.setAntennaDelay(C.ANTENNA_DELAY_RASPI)
+    collector = DW1000TDoA.UdpCollector(COLLECTOR_HOST)
+    if ANCHOR_ADDRESS != REFERENCE_ADDRESS:
+        clock = DW1000TDoA.ClockModel(int(round(REFERENCE_DISTANCE * C.DISTANCE_OF_RADIO_INV)))
+
+    receiver()
+    noteActivity()
+    nextSync = millis()
+    while 1:
+        loop()
+
+except KeyboardInterrupt:
+    collector.close()
+    DW1000.close()
@@ -0,0 +1,70 @@
+"""
+This python script is used to configure the DW1000 chip as a tag for time difference of arrival (TDoA) positioning. It must be used in
+conjunction with the TDoAAnchor script.
+The tag only transmits: it sends a blink every BLINK_PERIOD milliseconds, with a random jitter so the blinks of two tags do not keep colliding.
+It requires the following modules: DW1000, DW1000Constants, DW1000TDoA and monotonic.
+"""
+
+
+import DW1000
+import monotonic
+import DW1000Constants as C
+import DW1000TDoA
+from random import randint
+
+data = [0] * DW1000TDoA.LEN_BLINK
+sequence = 0
+tagAddress = 0
+nextBlink = 0
+# The blink period in milliseconds, i.e. the period of the position fixes.
+BLINK_PERIOD = 100
+BLINK_JITTER = 10
+
+
+def millis():
+    """
+    This function returns the value (in milliseconds) of a clock which never goes backwards.
+    """
+    return int(round(monotonic.monotonic() * C.MILLISECONDS))
+
+
+def transmitBlink():
+    """
+    This function sends a blink and schedules the next one.
+    """
+    global sequence, nextBlink
+    DW1000.newTransmit()
+    DW1000TDoA.setBlink(data, tagAddress, sequence)
+    DW1000.setData(data, DW1000TDoA.LEN_BLINK)
+    DW1000.startTransmit()
+    sequence = (sequence + 1) & C.MASK_LS_BYTE
+    nextBlink += BLINK_PERIOD + randint(-BLINK_JITTER, BLINK_JITTER)
+
+
+def loop():
+    """
+    This function sends the next blink when its time has come and discards the transmission events, waiting for them at most C.EVENT_WAIT
+    seconds so the main loop sleeps between the blinks.
+    """
+    DW1000.pollEvent(C.EVENT_WAIT)
+    if millis() >= nextBlink:
+        transmitBlink()
+
+
+try:
+    PIN_IRQ = 19
+    PIN_SS = 16
+    DW1000.begin(PIN_IRQ)
+    DW1000.setup(PIN_SS)
+
+    DW1000.generalConfiguration("7D:00:22:EA:82:60:3B:9C", C.MODE_LONGDATA_FAST_ACCURACY)
+    DW1000.enableEventQueue()
+    DW1000.setAntennaDelay(C.ANTENNA_DELAY_RASPI)
+    tagAddress = DW1000.getDeviceAddress()
+
+    nextBlink = millis()
+    while 1:
+        loop()
+
+except KeyboardInterrupt:
+    DW1000.close()
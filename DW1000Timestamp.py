@@ -0,0 +1,138 @@
+"""
+This python module contains the arithmetic of the 40 bits timestamps of the DW1000, shared by the driver, the ranging and the TDoA modules.
+It requires the following module: DW1000Constants.
+
+The timestamps are Python integers, so the computations are exact. The system counter of the chip wraps around every C.TIME_OVERFLOW time
+units (~17.2 s): the intervals are computed modulo C.TIME_OVERFLOW with elapsed() or difference(), and an Unwrapper extends a series of
+timestamps beyond 40 bits. pack() and unpack() convert them to and from the little endian bytes of the registers and payloads.
+"""
+
+import DW1000Constants as C
+
+LENGTH = 5
+# int.from_bytes() and int.to_bytes() are not available with Python 2
+_NATIVE = hasattr(int, "from_bytes")
+
+
+def unpack(data, index, n=LENGTH):
+    """
+    This function reads a little endian value, a timestamp by default, from a payload or the bytes read from a register.
+
+    Args:
+            data: The bytes, a list of integers or a bytearray.
+            index: The index of the first byte of the value.
+            n: The number of bytes of the value.
+
+    Returns:
+            The value.
+    """
+    if _NATIVE:
+        # a slice of a bytearray or of a list of integers is taken as is, without another copy
+        return int.from_bytes(data[index:index + n], "little")
+    value = 0
+    for i in range(0, n):
+        value |= data[index + i] << (i * 8)
+    return value
+
+
+def pack(data, value, index, n=LENGTH):
+    """
+    This function writes a little endian value, a timestamp by default, into a payload or the bytes written to a register. The value is
+    truncated to n bytes.
+
+    Args:
+            data: The bytes, a list of integers or a bytearray.
+            value: The value.
+            index: The index of the first byte of the value.
+            n: The number of bytes of the value.
+    """
+    if _NATIVE:
+        data[index:index + n] = (value % (1 << (8 * n))).to_bytes(n, "little")
+        return
+    for i in range(0, n):
+        data[index + i] = (value >> (i * 8)) & C.MASK_LS_BYTE
+
+
+def add(timestamp, delay):
+    """
+    This function computes the timestamp at a given delay from another one.
+
+    Args:
+            timestamp: The timestamp.
+            delay: The delay in DW1000 time units, possibly negative.
+
+    Returns:
+            The 40 bits timestamp.
+    """
+    return (timestamp + delay) % C.TIME_OVERFLOW
+
+
+def elapsed(timestamp, origin):
+    """
+    This function computes the time elapsed between two timestamps, the counter having possibly overflowed in between.
+
+    Args:
+            timestamp: The later timestamp.
+            origin: The earlier timestamp.
+
+    Returns:
+            The difference, between 0 and C.TIME_OVERFLOW - 1.
+    """
+    return (timestamp - origin) % C.TIME_OVERFLOW
+
+
+def difference(timestamp, origin):
+    """
+    This function computes the signed difference between two timestamps less than C.TIME_OVERFLOW / 2 apart, in any order.
+
+    Args:
+            timestamp: The timestamp.
+            origin: The timestamp it is compared to.
+
+    Returns:
+            The difference, between -C.TIME_OVERFLOW / 2 and C.TIME_OVERFLOW / 2 - 1.
+    """
+    value = (timestamp - origin) % C.TIME_OVERFLOW
+    if value >= C.TIME_OVERFLOW // 2:
+        value -= C.TIME_OVERFLOW
+    return value
+
+
+def divide(numerator, denominator):
+    """
+    This function divides two integers, rounding to the nearest integer, without going through floating point numbers.
+
+    Args:
+            numerator: The numerator.
+            denominator: The denominator, positive.
+
+    Returns:
+            The rounded quotient.
+    """
+    return (2 * numerator + denominator) // (2 * denominator)
+
+
+class Unwrapper(object):
+    """
+    Extension of a series of timestamps beyond 40 bits: each timestamp is placed after (or before) the previous one, counting the
+    overflows of the counter. Two successive timestamps must be less than C.TIME_OVERFLOW / 2 (~8.6 s) apart. O(1) time and memory.
+    """
+
+    def __init__(self):
+        self.last = None
+
+    def unwrap(self, timestamp):
+        """
+        This function unwraps the next timestamp of the series.
+
+        Args:
+                timestamp: The 40 bits timestamp.
+
+        Returns:
+                The unwrapped timestamp, the first one of the series being unchanged.
+        """
+        if self.last is None:
+            self.last = timestamp
+        else:
+            self.last += difference(timestamp, self.last)
+        return self.last
@@ -9,26 +9,9 @@ import DW1000
 import DW1000Constants as C
 
 msg = ""
-trxAck = False
 # Change this value to set the chip as either a receiver or transmitter
 trxToggle = C.RECEIVER
 
-def handleSent():
-    """
-    This is a callback called from the module's interrupt handler when a transmission was successful. 
-    It sets the sent trxAck as True so the loop can continue.
-    """    
-    global trxAck
-    trxAck = True
-
-def handleReceived():
-    """
-    This is a callback called from the module's interrupt handler when a reception was successful. 
-    It sets the received trxAck as True so the loop can continue.
-    """        
-    global trxAck
-    trxAck = True
-
 def receiver():
     """
     This function configures the chip to prepare for a message reception.
@@ -47,35 +30,42 @@ def transmitter():
     DW1000.setDelay(2000, C.MILLISECONDS)
     DW1000.startTransmit()
 
-try:
-    PIN_IRQ = 19
-    PIN_SS = 16
-    DW1000.begin(PIN_IRQ)
-    DW1000.setup(PIN_SS)
-    print("DW1000 initialized ...")
-
-    DW1000.generalConfiguration("FF:FF:FF:FF:00:00:00:00", C.MODE_LONGDATA_RANGE_LOWPOWER)
-    DW1000.registerCallback("handleSent", handleSent)
-    DW1000.registerCallback("handleReceived", handleReceived)
-    if (trxToggle == C.TRANSMITTER):
-        msg = "Ping...."
-        receiver()
+def loop():
+    """
+    This function handles the next event captured by the module's interrupt handler: a received message is answered, a transmitted one is
+    printed. It waits for one at most C.EVENT_WAIT seconds, so the main loop sleeps while the radio is idle.
+    """
+    event = DW1000.pollEvent(C.EVENT_WAIT)
+    if event is None:
+        return
+    if event.kind == C.EVENT_RECEIVED:
+        rxMsg = "".join(chr(i) for i in event.data)
+        print("Received : " + rxMsg)
         transmitter()
     else:
-        msg = "... and Pong"
-        receiver()
+        print("Transmitted: " + msg)
+
+
+if __name__ == "__main__":
+    try:
+        PIN_IRQ = 19
+        PIN_SS = 16
+        DW1000.begin(PIN_IRQ)
+        DW1000.setup(PIN_SS)
+        print("DW1000 initialized ...")
 
-    while 1:
-        if trxAck:
-            trxAck = False
-            trxToggle = not trxToggle
-            if trxToggle:
-                rxMsg = DW1000.getDataStr()
-                print("Received : " + rxMsg)
-                transmitter()
-            else:
-                print("Transmitted: " + msg)
+        DW1000.generalConfiguration("FF:FF:FF:FF:00:00:00:00", C.MODE_LONGDATA_RANGE_LOWPOWER)
+        DW1000.enableEventQueue()
+        if (trxToggle == C.TRANSMITTER):
+            msg = "Ping...."
+            receiver()
+            transmitter()
+        else:
+            msg = "... and Pong"
+            receiver()
 
+        while 1:
+            loop()
 
-except KeyboardInterrupt:
-    DW1000.close()    
\ No newline at end of file
+    except KeyboardInterrupt:
+        DW1000.close()
@@ -8,16 +8,6 @@ It requires the following modules: DW1000, DW1000Constants
 import DW1000
 import DW1000Constants as C
 
-received = False
-
-def handleReceived():
-    """
-    This is a callback called from the module's interrupt handler when a reception was successful. 
-    It sets the received variable as True so the loop can continue.
-    """    
-    global received
-    received = True
-
 
 def receiver():
     """
@@ -28,27 +18,37 @@ def receiver():
     DW1000.startReceive()
 
 
-try:
-    PIN_IRQ = 19
-    PIN_SS = 16 
-    DW1000.begin(PIN_IRQ)
-    DW1000.setup(PIN_SS)
-    print("DW1000 initialized")    
-
-    DW1000.generalConfiguration("7D:00:22:EA:82:60:3B:9C", C.MODE_LONGDATA_RANGE_LOWPOWER)
-    DW1000.registerCallback("handleReceived", handleReceived)
-    receiver()
-    while 1:
-        if received:
-            fpPwr = DW1000.getFirstPathPower()
-            rxPwr = DW1000.getReceivePower()
-            rcvQuality = DW1000.getReceiveQuality()
-            msg = DW1000.getDataStr()
-            print(msg)
-            print("FP power: %f dBm" % (fpPwr))
-            print("RX power: %f dBm" % (rxPwr))
-            print("Signal quality: %f \n" % (rcvQuality))
-            received = False
-            
-except KeyboardInterrupt:
-    DW1000.close()
+def loop():
+    """
+    This function prints the next frame captured by the module's interrupt handler with its diagnostics. It waits for one at most
+    C.EVENT_WAIT seconds, so the main loop sleeps while the radio is idle.
+    """
+    event = DW1000.pollEvent(C.EVENT_WAIT)
+    if event is None or event.kind != C.EVENT_RECEIVED:
+        return
+    fpPwr = DW1000.getFirstPathPower(event.diagnostics)
+    rxPwr = DW1000.getReceivePower(event.diagnostics)
+    rcvQuality = DW1000.getReceiveQuality(event.diagnostics)
+    msg = "".join(chr(i) for i in event.data)
+    print(msg)
+    print("FP power: %f dBm" % (fpPwr))
+    print("RX power: %f dBm" % (rxPwr))
+    print("Signal quality: %f \n" % (rcvQuality))
+
+
+if __name__ == "__main__":
+    try:
+        PIN_IRQ = 19
+        PIN_SS = 16 
+        DW1000.begin(PIN_IRQ)
+        DW1000.setup(PIN_SS)
+        print("DW1000 initialized")    
+
+        DW1000.generalConfiguration("7D:00:22:EA:82:60:3B:9C", C.MODE_LONGDATA_RANGE_LOWPOWER)
+        DW1000.enableEventQueue()
+        receiver()
+        while 1:
+            loop()
+
+    except KeyboardInterrupt:
+        DW1000.close()
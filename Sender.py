@@ -9,18 +9,9 @@ import DW1000
 import DW1000Constants as C
 
 number = 1
-sent = False
 SEND_DELAY = 2000
 
 
-def handleSent():
-    """
-    This is a callback called from the module's interrupt handler when a transmission was successful. 
-    It sets the sent variable as True so the loop can continue.
-    """
-    global sent
-    sent = True
-
 def transmitter():
     """
     This function configures the chip to prepare for a transmission.
@@ -34,19 +25,28 @@ def transmitter():
     DW1000.startTransmit()
     number += 1
 
-try:
-    PIN_IRQ = 19
-    PIN_SS = 16
-    DW1000.begin(PIN_IRQ)
-    DW1000.setup(PIN_SS)
-    print("DW1000 initialized ...")
-    DW1000.generalConfiguration("7D:00:22:EA:82:60:3B:9C", C.MODE_LONGDATA_RANGE_LOWPOWER)    
-    DW1000.registerCallback("handleSent", handleSent)
-    transmitter()
-    while 1:
-        if sent:
-            transmitter()
-            sent=False
-
-except KeyboardInterrupt:
-    DW1000.close()
+def loop():
+    """
+    This function sends the next message once the previous one was transmitted. It waits for the transmission at most C.EVENT_WAIT seconds,
+    so the main loop sleeps in the meantime.
+    """
+    event = DW1000.pollEvent(C.EVENT_WAIT)
+    if event is not None and event.kind == C.EVENT_SENT:
+        transmitter()
+
+
+if __name__ == "__main__":
+    try:
+        PIN_IRQ = 19
+        PIN_SS = 16
+        DW1000.begin(PIN_IRQ)
+        DW1000.setup(PIN_SS)
+        print("DW1000 initialized ...")
+        DW1000.generalConfiguration("7D:00:22:EA:82:60:3B:9C", C.MODE_LONGDATA_RANGE_LOWPOWER)    
+        DW1000.enableEventQueue()
+        transmitter()
+        while 1:
+            loop()
+
+    except KeyboardInterrupt:
+        DW1000.close()
@@ -0,0 +1,43 @@
+"""
+This python script measures the time to encode and decode the ranging messages with DW1000Frame.RangingFrame, the payload handling done
+for every frame of an exchange.
+Usage: python benchmarks/bench_frame.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import DW1000Constants as C
+import DW1000Frame
+
+NUMBER = 100000
+REPEAT = 5
+
+
+def measure(statement):
+    """
+    This function returns the best time per call of a statement, in microseconds.
+    """
+    return min(timeit.repeat(statement, number=NUMBER, repeat=REPEAT)) / NUMBER * 1e6
+
+
+def main():
+    frame = DW1000Frame.RangingFrame(0x1234)
+    frame.destination = 0x0001
+    frame.timePollSent = 0x0102030405
+    frame.timeRangeSent = 0x1112131415
+    frame.timePollAckReceived = [0x2122232425]
+    frame.timePollReceived = 0x3132333435
+    frame.timePollAckSent = 0x4142434445
+    received = DW1000Frame.RangingFrame(0x0001)
+    data = bytearray(frame.buffer[:frame.encode(C.RANGE)])
+    print("encode RANGE     %.2f us" % measure(lambda: frame.encode(C.RANGE)))
+    print("decode RANGE     %.2f us" % measure(lambda: received.decode(data)))
+    print("encode POLL_ACK  %.2f us" % measure(lambda: frame.encode(C.POLL_ACK)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+This python script measures the latency between the rising edge of the interrupt line and the call of the interrupt handler with
+DW1000Interrupt.LineEventBus, in its three dispatching modes: a dedicated thread (start), the main loop (poll) and an asyncio event loop
+(attach). Two simulated radios exchange frames, their interrupt lines raising the edges of PipeLines.
+Usage: python benchmarks/bench_interrupt_latency.py [frames]
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import DW1000
+import DW1000Constants as C
+import DW1000Interrupt
+import DW1000Simulator
+
+FRAMES = 500
+
+
+def makeBus():
+    simulated = DW1000Simulator.SimulatedBus()
+
+    def lineFactory(irq):
+        line = DW1000Interrupt.PipeLine(level=lambda: simulated.interruptAsserted(irq))
+        simulated.setupInterrupt(irq, lambda _: line.trigger())
+        return line
+    return DW1000Interrupt.LineEventBus(simulated, lineFactory=lineFactory)
+
+
+def makeRadio(bus, irq, ss, address):
+    radio = DW1000.DW1000Radio()
+    radio.begin(irq, bus)
+    radio.setup(ss)
+    radio.generalConfiguration("82:17:5B:D5:A9:9A:E2:%02X" % address, C.MODE_LONGDATA_FAST_ACCURACY, address)
+    radio.enableEventQueue()
+    radio.newReceive()
+    radio.receivePermanently()
+    radio.startReceive()
+    return radio
+
+
+def send(radio):
+    radio.newTransmit()
+    radio.setData([1, 2, 3, 4], 4)
+    radio.startTransmit()
+
+
+def received(radio, timeout=0):
+    """
+    This function tells if the radio received a frame, discarding the other events.
+
+    Args:
+            timeout: The time in seconds to wait for each event, 0 to return at once.
+    """
+    event = radio.pollEvent(timeout)
+    while event is not None and event.kind != C.EVENT_RECEIVED:
+        event = radio.pollEvent(timeout)
+    return event is not None
+
+
+def runThread(bus, sender, receiver, frames):
+    bus.start()
+    for _ in range(frames):
+        send(sender)
+        while not received(receiver, 1):
+            pass
+    bus.stop()
+
+
+def runPoll(bus, sender, receiver, frames):
+    for _ in range(frames):
+        send(sender)
+        while not received(receiver):
+            bus.poll(1)
+
+
+def runAsyncio(bus, sender, receiver, frames):
+    async def exchange():
+        bus.attach(asyncio.get_running_loop())
+        for _ in range(frames):
+            send(sender)
+            while not received(receiver):
+                await asyncio.sleep(0)
+        bus.detach()
+    asyncio.run(exchange())
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else FRAMES
+    for name, run in (("thread", runThread), ("poll", runPoll), ("asyncio", runAsyncio)):
+        bus = makeBus()
+        sender = makeRadio(bus, 20, 10, 1)
+        receiver = makeRadio(bus, 21, 11, 2)
+        run(bus, sender, receiver, frames)
+        latencies = sorted(bus.getLatencies())
+        print("%-8s %5d edges  latency median %4.0f us  p99 %5.0f us" % (
+            name, bus.edges, latencies[len(latencies) // 2] * 1e6, latencies[int(len(latencies) * 0.99)] * 1e6))
+        sender.close()
+        receiver.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+This python script measures the time to solve the positions of many tags at once with DW1000Multilateration.solvePositions(), from
+noisy ranges to four anchors in 2D and six anchors in 3D.
+It requires the following module: numpy.
+Usage: python benchmarks/bench_multilateration.py [tags]
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy
+
+import DW1000Multilateration
+
+TAGS = 5000
+REPEAT = 5
+# meters, standard deviation of the range errors
+RANGE_NOISE = 0.1
+ANCHORS_2D = [(0, 0), (10, 0), (0, 8), (10, 8)]
+ANCHORS_3D = [(0, 0, 3), (10, 0, 3), (0, 8, 3), (10, 8, 3), (5, 0, 0.5), (5, 8, 0.5)]
+
+
+def makeRanges(anchors, tags, random):
+    """
+    This function draws random tag positions inside the anchors' bounding box and their noisy ranges to the anchors.
+
+    Returns:
+            The (N, D) positions and the (N, A) ranges.
+    """
+    anchors = numpy.asarray(anchors, dtype=float)
+    positions = random.uniform(anchors.min(axis=0), anchors.max(axis=0), (tags, anchors.shape[1]))
+    ranges = numpy.linalg.norm(positions[:, None, :] - anchors[None, :, :], axis=2)
+    return positions, ranges + random.normal(0, RANGE_NOISE, ranges.shape)
+
+
+def main():
+    tags = int(sys.argv[1]) if len(sys.argv) > 1 else TAGS
+    random = numpy.random.default_rng(0)
+    for name, anchors in (("2D", ANCHORS_2D), ("3D", ANCHORS_3D)):
+        positions, ranges = makeRanges(anchors, tags, random)
+        seconds = min(timeit.repeat(lambda: DW1000Multilateration.solvePositions(anchors, ranges), number=1, repeat=REPEAT))
+        solved, _ = DW1000Multilateration.solvePositions(anchors, ranges)
+        error = numpy.median(numpy.linalg.norm(solved - positions, axis=1))
+        print("%s %d tags, %d anchors  %6.1f ms  median error %.3f m" % (name, tags, len(anchors), seconds * 1e3, error))
+
+
+if __name__ == "__main__":
+    main()
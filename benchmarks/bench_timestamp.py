@@ -0,0 +1,83 @@
+"""
+This python script measures the time per call of the timestamp helpers used on every frame, against the implementation they replaced:
+reading and writing a 40 bits timestamp in a payload (DW1000.getTimeStamp, DW1000.setTimeStamp), correcting an interval for the overflow
+(DW1000.wrapTimestamp) and the double-sided range computation (DW1000Ranging.computeRangeAsymmetric). The former byte loops and float
+computation are kept below as they were in DW1000.py and DW1000RangingAnchor.py.
+Usage: python benchmarks/bench_timestamp.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import DW1000
+import DW1000Constants as C
+import DW1000Ranging
+import DW1000Timestamp
+
+NUMBER = 100000
+REPEAT = 5
+
+
+def baselineSetTimeStamp(data, timeStamp, index):
+    for i in range(0, 5):
+        data[i+index] = int((timeStamp >> (i * 8)) & C.MASK_LS_BYTE)
+
+
+def baselineGetTimeStamp(data, index):
+    timestamp = 0
+    for i in range(0, 5):
+        timestamp |= data[i+index] << (i*8)
+    return timestamp
+
+
+def baselineWrapTimestamp(timestamp):
+    if timestamp < 0:
+        timestamp += C.TIME_OVERFLOW
+    return timestamp
+
+
+def baselineComputeRangeAsymmetric(timePollSentTS, timePollReceivedTS, timePollAckSentTS, timePollAckReceivedTS, timeRangeSentTS,
+                                   timeRangeReceivedTS):
+    round1 = baselineWrapTimestamp(timePollAckReceivedTS - timePollSentTS)
+    reply1 = baselineWrapTimestamp(timePollAckSentTS - timePollReceivedTS)
+    round2 = baselineWrapTimestamp(timeRangeReceivedTS - timePollAckSentTS)
+    reply2 = baselineWrapTimestamp(timeRangeSentTS - timePollAckReceivedTS)
+    return (round1 * round2 - reply1 * reply2) / (round1 + round2 + reply1 + reply2)
+
+
+def measure(statement):
+    """
+    This function returns the best time per call of a statement, in nanoseconds.
+    """
+    return min(timeit.repeat(statement, number=NUMBER, repeat=REPEAT)) / NUMBER * 1e9
+
+
+def compare(name, baseline, current):
+    """
+    This function prints the time per call of the baseline and current versions of a statement.
+    """
+    before = measure(baseline)
+    after = measure(current)
+    print("%-14s baseline %6.0f ns  current %6.0f ns  x%.2f" % (name, before, after, before / after))
+
+
+def main():
+    payload = bytearray(16)
+    DW1000.setTimeStamp(payload, 0x123456789A, 3)
+    # registers are read into lists of integers by the driver
+    register = list(payload)
+    timestamps = (1000, 64000000, 64001500, 128000900, 128002000, 192000800)
+    compare("get (payload)", lambda: baselineGetTimeStamp(payload, 3), lambda: DW1000.getTimeStamp(payload, 3))
+    compare("get (register)", lambda: baselineGetTimeStamp(register, 3), lambda: DW1000.getTimeStamp(register, 3))
+    compare("unpack", lambda: baselineGetTimeStamp(payload, 3), lambda: DW1000Timestamp.unpack(payload, 3))
+    compare("set", lambda: baselineSetTimeStamp(payload, 0x123456789A, 3), lambda: DW1000.setTimeStamp(payload, 0x123456789A, 3))
+    compare("wrap", lambda: baselineWrapTimestamp(-1000), lambda: DW1000.wrapTimestamp(-1000))
+    compare("DS-TWR range", lambda: baselineComputeRangeAsymmetric(*timestamps),
+            lambda: DW1000Ranging.computeRangeAsymmetric(*timestamps))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+import DW1000Constants as C
+import DW1000Async
+import DW1000Simulator
+import DW1000Timestamp
+from test_simulator import makeRadio
+
+TIMEOUT = 5
+
+
+def run(coroutine):
+    return asyncio.run(asyncio.wait_for(coroutine, TIMEOUT))
+
+
+def test_transmit_and_receive():
+    bus = DW1000Simulator.SimulatedBus()
+    sender = makeRadio(bus, 20, 10, 1)
+    receiver = makeRadio(bus, 21, 11, 2)
+
+    async def exchange():
+        asyncSender = DW1000Async.AsyncRadio(sender)
+        asyncReceiver = DW1000Async.AsyncRadio(receiver)
+        asyncReceiver.startReceiving()
+        at = DW1000Timestamp.add(bus.chips[10].systemTime(), int(1000 * C.TIME_RES_INV))
+        txTimestamp = await asyncSender.transmit([1, 2, 3], at=at)
+        frame = await asyncReceiver.receive()
+        return at, txTimestamp, frame
+
+    at, txTimestamp, frame = run(exchange())
+    assert txTimestamp == sender.getTransmitTimestamp()
+    assert DW1000Timestamp.elapsed(txTimestamp, at) < 1 << 16
+    assert list(frame.data[:3]) == [1, 2, 3]
+
+
+def test_late_transmit_returns_none():
+    bus = DW1000Simulator.SimulatedBus()
+    radio = makeRadio(bus, 20, 10, 1)
+
+    async def late():
+        asyncRadio = DW1000Async.AsyncRadio(radio)
+        past = DW1000Timestamp.add(bus.chips[10].systemTime(), -int(1000 * C.TIME_RES_INV))
+        first = await asyncRadio.transmit([1, 2, 3], at=past)
+        # the radio is usable again
+        second = await asyncRadio.transmit([4, 5, 6])
+        return first, second, asyncRadio._sent
+
+    first, second, sent = run(late())
+    assert first is None
+    assert second is not None
+    assert sent is None
+    assert radio.getLateTransmitCount() == 1
+
+
+def test_loop_is_the_running_one():
+    bus = DW1000Simulator.SimulatedBus()
+    radio = makeRadio(bus, 20, 10, 1)
+    with pytest.raises(RuntimeError):
+        DW1000Async.AsyncRadio(radio)
+
+    async def build():
+        return DW1000Async.AsyncRadio(radio).loop is asyncio.get_running_loop()
+
+    assert run(build())
+    loop = asyncio.new_event_loop()
+    try:
+        assert DW1000Async.AsyncRadio(radio, loop).loop is loop
+    finally:
+        loop.close()
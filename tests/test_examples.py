@@ -0,0 +1,49 @@
+import DW1000
+import DW1000Constants as C
+import DW1000Simulator
+import PingPong
+import Receiver
+from test_simulator import makeRadio, nextEvent, send
+
+
+def beginDefaultRadio(bus):
+    DW1000.begin(19, bus)
+    DW1000.setup(16)
+    DW1000.generalConfiguration("7D:00:22:EA:82:60:3B:9C", C.MODE_LONGDATA_RANGE_LOWPOWER)
+    DW1000.enableEventQueue()
+
+
+def test_receiver_prints_the_frames(capsys):
+    bus = DW1000Simulator.SimulatedBus()
+    beginDefaultRadio(bus)
+    sender = makeRadio(bus, 20, 10, 1)
+    capsys.readouterr()
+    try:
+        Receiver.receiver()
+        Receiver.loop()
+        assert capsys.readouterr().out == ""
+        send(sender, [ord(c) for c in "Hello"])
+        Receiver.loop()
+        lines = capsys.readouterr().out.splitlines()
+        assert lines[0] == "Hello"
+        assert lines[1].startswith("FP power")
+    finally:
+        DW1000.close()
+
+
+def test_ping_pong_answers_the_ping(capsys, monkeypatch):
+    bus = DW1000Simulator.SimulatedBus()
+    beginDefaultRadio(bus)
+    pinger = makeRadio(bus, 20, 10, 1)
+    monkeypatch.setattr(PingPong, "msg", "... and Pong")
+    capsys.readouterr()
+    try:
+        PingPong.receiver()
+        send(pinger, [ord(c) for c in "Ping...."])
+        PingPong.loop()
+        PingPong.loop()
+        assert capsys.readouterr().out.splitlines() == ["Received : Ping....", "Transmitted: ... and Pong"]
+        # setDataStr sends the string with a null terminator
+        assert bytes(nextEvent(pinger, C.EVENT_RECEIVED).data) == b"... and Pong\0"
+    finally:
+        DW1000.close()
@@ -0,0 +1,103 @@
+import struct
+
+import DW1000Constants as C
+import DW1000Frame
+
+TAG = 0x1234
+ANCHOR = 0x0001
+
+
+def encoded(frame, messageId):
+    return bytes(frame.buffer[:frame.encode(messageId)])
+
+
+def roundTrip(frame, messageId):
+    received = DW1000Frame.RangingFrame(ANCHOR)
+    assert received.decode(encoded(frame, messageId))
+    assert received.messageId == messageId
+    assert (received.source, received.destination, received.sequence) == (frame.source, frame.destination, frame.sequence)
+    return received
+
+
+def test_round_trip_of_every_message():
+    frame = DW1000Frame.RangingFrame(TAG)
+    frame.destination = ANCHOR
+    frame.sequence = 7
+    frame.protocol = C.SS_TWR
+    assert roundTrip(frame, C.POLL).protocol == C.SS_TWR
+
+    frame.timePollReceived = 0xFF12345678
+    frame.timePollAckSent = 0x0102030405
+    received = roundTrip(frame, C.POLL_ACK)
+    assert (received.timePollReceived, received.timePollAckSent) == (0xFF12345678, 0x0102030405)
+
+    frame.timePollSent = 1
+    frame.timeRangeSent = C.TIME_OVERFLOW - 1
+    frame.timePollAckReceived = [5, 0, 0x8000000000]
+    received = roundTrip(frame, C.RANGE)
+    assert (received.timePollSent, received.timeRangeSent) == (1, C.TIME_OVERFLOW - 1)
+    assert received.timePollAckReceived == [5, 0, 0x8000000000]
+
+    frame.timeOfFlight = 640
+    assert roundTrip(frame, C.RANGE_REPORT).timeOfFlight == 640
+    roundTrip(frame, C.RANGE_FAILED)
+
+
+def test_broadcast_poll_and_long_addresses():
+    frame = DW1000Frame.RangingFrame(0x0102030405060708, longAddresses=True)
+    frame.anchors = [1, 2, 3]
+    received = roundTrip(frame, C.POLL)
+    assert received.destination == C.BROADCAST_ADDRESS
+    assert received.anchors == [1, 2, 3]
+    frame.destination = 0x1112131415161718
+    frame.ackRequest = True
+    data = encoded(frame, C.RANGE_FAILED)
+    assert struct.unpack_from("<H", data)[0] & DW1000Frame.ACK_REQUEST
+    assert roundTrip(frame, C.RANGE_FAILED).destination == 0x1112131415161718
+
+
+def test_negative_time_of_flight_is_clamped():
+    frame = DW1000Frame.RangingFrame(ANCHOR)
+    frame.destination = TAG
+    frame.timeOfFlight = -20
+    assert roundTrip(frame, C.RANGE_REPORT).timeOfFlight == 0
+    frame.timeOfFlight = C.TIME_OVERFLOW + 5
+    assert roundTrip(frame, C.RANGE_REPORT).timeOfFlight == C.TIME_OVERFLOW - 1
+
+
+def test_truncated_frames_are_rejected():
+    frame = DW1000Frame.RangingFrame(TAG)
+    frame.destination = ANCHOR
+    frame.anchors = [1, 2]
+    frame.timePollAckReceived = [1, 2, 3]
+    received = DW1000Frame.RangingFrame(ANCHOR)
+    for messageId in (C.POLL, C.POLL_ACK, C.RANGE, C.RANGE_REPORT, C.RANGE_FAILED):
+        data = encoded(frame, messageId)
+        for length in range(len(data)):
+            assert not received.decode(data[:length])
+
+
+def test_malformed_frames_are_rejected():
+    received = DW1000Frame.RangingFrame(ANCHOR)
+    # data frame with short addresses without PAN ID compression: the source PAN ID does not fit
+    frameControl = C.FRAME_TYPE_DATA | (DW1000Frame.SHORT_ADDRESS << 10) | (DW1000Frame.SHORT_ADDRESS << 14)
+    data = struct.pack("<HBHHH", frameControl, 0, C.PAN_ID, ANCHOR, TAG) + b"\x00"
+    assert len(data) == 10
+    assert not received.decode(data)
+    # with it, the frame is valid
+    assert received.decode(struct.pack("<HBHHHHB", frameControl, 0, C.PAN_ID, ANCHOR, C.PAN_ID, TAG, C.RANGE_FAILED))
+    assert received.source == TAG
+    # acknowledgement frame, reserved addressing mode, unknown message
+    assert not received.decode(struct.pack("<HB", C.FRAME_TYPE_ACK, 0))
+    assert not received.decode(struct.pack("<HBHHHB", C.FRAME_TYPE_DATA | DW1000Frame.PAN_ID_COMPRESSION | (1 << 10) | (2 << 14), 0,
+                                           C.PAN_ID, ANCHOR, TAG, C.RANGE_FAILED))
+    data = bytearray(encoded(DW1000Frame.RangingFrame(TAG), C.RANGE_FAILED))
+    data[-1] = 0x7F
+    assert not received.decode(data)
+    # a POLL announcing more anchors than it carries
+    frame = DW1000Frame.RangingFrame(TAG)
+    frame.anchors = [1, 2]
+    data = bytearray(encoded(frame, C.POLL))
+    data[-5] = 3
+    assert not received.decode(data)
+    assert received.decode([b for b in encoded(frame, C.POLL)])
@@ -0,0 +1,74 @@
+import os
+
+import pytest
+
+import DW1000Constants as C
+import DW1000Simulator
+from test_simulator import makeRadio, nextEvent, send
+
+DW1000Interrupt = pytest.importorskip("DW1000Interrupt")
+if DW1000Interrupt.selectors is None:
+    pytest.skip("DW1000Interrupt requires the selectors module", allow_module_level=True)
+
+
+def makeBus():
+    """
+    A LineEventBus over simulated chips whose interrupt lines raise the edges of PipeLines.
+    """
+    simulated = DW1000Simulator.SimulatedBus()
+
+    def lineFactory(irq):
+        line = DW1000Interrupt.PipeLine(level=lambda: simulated.interruptAsserted(irq))
+        simulated.setupInterrupt(irq, lambda _: line.trigger())
+        return line
+    return DW1000Interrupt.LineEventBus(simulated, lineFactory=lineFactory)
+
+
+def openDescriptors():
+    return len(os.listdir("/proc/self/fd"))
+
+
+def test_poll_dispatches_the_pending_edges():
+    bus = makeBus()
+    sender = makeRadio(bus, 20, 10, 1)
+    receiver = makeRadio(bus, 21, 11, 2)
+    send(sender, [1, 2, 3])
+    # the edges wait in the pipes until the interrupts are dispatched
+    assert receiver.pollEvent() is None
+    assert bus.poll(0) == 2
+    assert list(nextEvent(receiver, C.EVENT_RECEIVED).data[:3]) == [1, 2, 3]
+    assert nextEvent(sender, C.EVENT_SENT).timestamp is not None
+    assert bus.poll(0) == 0
+    assert bus.edges == 2
+    assert all(latency >= 0 for latency in bus.getLatencies())
+    sender.close()
+    receiver.close()
+
+
+def test_thread_dispatches_the_edges():
+    bus = makeBus()
+    sender = makeRadio(bus, 20, 10, 1)
+    receiver = makeRadio(bus, 21, 11, 2)
+    bus.start()
+    try:
+        send(sender, [4, 5, 6])
+        event = receiver.pollEvent(5)
+        assert event is not None and event.kind == C.EVENT_RECEIVED
+        assert list(event.data[:3]) == [4, 5, 6]
+    finally:
+        bus.stop()
+    sender.close()
+    receiver.close()
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="needs /proc to count the file descriptors")
+def test_close_releases_every_descriptor():
+    before = openDescriptors()
+    bus = makeBus()
+    sender = makeRadio(bus, 20, 10, 1)
+    receiver = makeRadio(bus, 21, 11, 2)
+    bus.start()
+    sender.close()
+    assert openDescriptors() > before
+    receiver.close()
+    assert openDescriptors() == before
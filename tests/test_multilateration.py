@@ -0,0 +1,39 @@
+import pytest
+
+numpy = pytest.importorskip("numpy")
+import DW1000Multilateration
+
+ANCHORS = [(0.0, 0.0), (10.0, 0.0), (0.0, 8.0), (10.0, 8.0)]
+
+
+def rangesTo(positions, anchors=ANCHORS):
+    return numpy.sqrt(numpy.sum((numpy.asarray(positions)[:, None, :] - numpy.asarray(anchors)) ** 2, axis=2))
+
+
+def test_solves_every_tag_at_once():
+    tags = numpy.array([(2.0, 3.0), (7.5, 1.0), (5.0, 6.5)])
+    positions, residuals = DW1000Multilateration.solvePositions(ANCHORS, rangesTo(tags))
+    assert numpy.allclose(positions, tags, atol=1e-3)
+    assert numpy.all(residuals < 1e-3)
+
+
+def test_missing_ranges():
+    tags = numpy.array([(2.0, 3.0), (7.5, 1.0), (5.0, 6.5)])
+    ranges = rangesTo(tags)
+    ranges[0, 3] = numpy.nan
+    ranges[1, 1:] = numpy.nan
+    # two ranges in 2D: two mirror positions fit them
+    ranges[2, 2:] = numpy.nan
+    positions, residuals = DW1000Multilateration.solvePositions(ANCHORS, ranges)
+    assert numpy.allclose(positions[0], tags[0], atol=1e-3)
+    assert numpy.all(numpy.isnan(positions[1:]))
+    assert numpy.all(numpy.isnan(residuals[1:]))
+
+
+def test_solve_ranges_by_address():
+    anchors = dict(zip((1, 2, 3, 4), ANCHORS))
+    ranges = dict(zip((1, 2, 3), rangesTo([(2.0, 3.0)])[0]))
+    position, residual = DW1000Multilateration.solveRanges(anchors, ranges)
+    assert numpy.allclose(position, (2.0, 3.0), atol=1e-3)
+    del ranges[3]
+    assert DW1000Multilateration.solveRanges(anchors, ranges) is None
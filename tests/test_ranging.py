@@ -0,0 +1,34 @@
+import DW1000Constants as C
+import DW1000Ranging
+import DW1000Timestamp
+
+TIME_OF_FLIGHT = 640
+REPLY = 3000000
+
+
+def test_single_sided_range_corrects_the_clock_offset():
+    clockOffset = 20e-6
+    timePollSent = C.TIME_OVERFLOW - 1000
+    timePollReceived = 5000
+    timePollAckSent = timePollReceived + REPLY
+    # the anchor's reply time, measured with its faster clock, is shorter on the tag's clock
+    timePollAckReceived = DW1000Timestamp.add(timePollSent, 2 * TIME_OF_FLIGHT + int(round(REPLY * (1 - clockOffset))))
+    timeOfFlight = DW1000Ranging.computeRangeSingleSided(timePollSent, timePollAckReceived, timePollReceived, timePollAckSent,
+                                                          clockOffset)
+    assert abs(timeOfFlight - TIME_OF_FLIGHT) < 1
+
+
+def test_range_filter_rejects_outliers_and_nlos():
+    rangeFilter = DW1000Ranging.RangeFilter()
+    for i in range(5):
+        assert abs(rangeFilter.update(3.0, i * 100) - 3.0) < 1e-9
+    assert rangeFilter.update(DW1000Ranging.MAX_RANGE + 1, 500) is None
+    assert rangeFilter.update(3.0, 600, firstPathPower=-100.0, rxPower=-80.0) is None
+    # a single wild range is removed by the median
+    assert abs(rangeFilter.update(50.0, 700) - 3.0) < 1e-9
+
+
+def test_protocols():
+    assert not DW1000Ranging.hasFinalMessage(C.SS_TWR)
+    assert DW1000Ranging.hasFinalMessage(C.DS_TWR_3) and not DW1000Ranging.hasReport(C.DS_TWR_3)
+    assert DW1000Ranging.hasReport(C.DS_TWR_4)
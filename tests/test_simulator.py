@@ -0,0 +1,165 @@
+import threading
+import time
+import DW1000
+import DW1000Constants as C
+import DW1000Ranging
+import DW1000Simulator
+
+TIME_OF_FLIGHT = 640
+REPLY_DELAY_US = 5000
+
+
+def makeRadio(bus, irq, ss, address):
+    radio = DW1000.DW1000Radio()
+    radio.begin(irq, bus)
+    radio.setup(ss)
+    radio.generalConfiguration("82:17:5B:D5:A9:9A:E2:%02X" % address, C.MODE_LONGDATA_FAST_ACCURACY, address)
+    radio.enableEventQueue()
+    radio.newReceive()
+    radio.receivePermanently()
+    radio.startReceive()
+    return radio
+
+
+def send(radio, data, origin=None):
+    radio.newTransmit()
+    txTimestamp = None
+    if origin is not None:
+        txTimestamp = radio.transmitAt(origin, REPLY_DELAY_US)
+    radio.setData(data, len(data))
+    assert radio.startTransmit()
+    return txTimestamp
+
+
+def nextEvent(radio, kind):
+    event = radio.pollEvent()
+    while event is not None and event.kind != kind:
+        event = radio.pollEvent()
+    assert event is not None
+    return event
+
+
+def test_status_is_write_one_to_clear():
+    chip = DW1000Simulator.DW1000Simulator()
+    chip.setStatus(C.RXDFR_BIT, C.RXFCG_BIT)
+    chip.write(C.SYS_STATUS, 1, bytearray([1 << (C.RXDFR_BIT - 8)]))
+    status = chip.getValue(C.SYS_STATUS, 0, 4)
+    assert not status & (1 << C.RXDFR_BIT)
+    assert status & (1 << C.RXFCG_BIT)
+
+
+def test_frame_is_received_with_its_payload():
+    bus = DW1000Simulator.SimulatedBus()
+    sender = makeRadio(bus, 20, 10, 1)
+    receiver = makeRadio(bus, 21, 11, 2)
+    send(sender, [1, 2, 3, 4])
+    assert nextEvent(sender, C.EVENT_SENT).timestamp is not None
+    assert list(nextEvent(receiver, C.EVENT_RECEIVED).data[:4]) == [1, 2, 3, 4]
+
+
+def test_double_sided_round_trip_range():
+    bus = DW1000Simulator.SimulatedBus(timeOfFlight=TIME_OF_FLIGHT)
+    tag = makeRadio(bus, 20, 10, 1)
+    anchor = makeRadio(bus, 21, 11, 2)
+    # the clock offset cancels out in the double-sided exchange
+    bus.chips[11].clockOffset = 20.0
+
+    send(tag, [C.POLL])
+    timePollSent = nextEvent(tag, C.EVENT_SENT).timestamp
+    timePollReceived = nextEvent(anchor, C.EVENT_RECEIVED).timestamp
+    timePollAckSent = send(anchor, [C.POLL_ACK], timePollReceived)
+    assert nextEvent(anchor, C.EVENT_SENT).timestamp == timePollAckSent
+    timePollAckReceived = nextEvent(tag, C.EVENT_RECEIVED).timestamp
+    timeRangeSent = send(tag, [C.RANGE], timePollAckReceived)
+    timeRangeReceived = nextEvent(anchor, C.EVENT_RECEIVED).timestamp
+
+    timeOfFlight = DW1000Ranging.computeRangeAsymmetric(timePollSent, timePollReceived, timePollAckSent, timePollAckReceived,
+                                                        timeRangeSent, timeRangeReceived)
+    # the range bias correction of the receive power is a few centimeters
+    assert abs(timeOfFlight * C.DISTANCE_OF_RADIO - TIME_OF_FLIGHT * C.DISTANCE_OF_RADIO) < 0.3
+
+
+def test_poll_event_waits_for_the_interrupt_handler():
+    radio = DW1000.DW1000Radio()
+    radio.enableEventQueue()
+    assert radio.pollEvent(0.01) is None
+    event = DW1000.RadioEvent(C.EVENT_SENT, None, 1, 0, None)
+    timer = threading.Timer(0.05, radio.pushEvent, (event,))
+    start = time.time()
+    timer.start()
+    assert radio.pollEvent(5) is event
+    assert time.time() - start < 1
+    timer.join()
+
+
+def countTransfers(bus):
+    counts = [0]
+    transfer = bus.transfer
+
+    def counted(ss, data):
+        counts[0] += 1
+        return transfer(ss, data)
+    bus.transfer = counted
+    return counts
+
+
+def test_diagnostics_take_three_reads_and_the_clock_offset_a_fourth():
+    bus = DW1000Simulator.SimulatedBus()
+    sender = makeRadio(bus, 20, 10, 1)
+    receiver = makeRadio(bus, 21, 11, 2)
+    bus.chips[10].clockOffset = 10.0
+    send(sender, [1, 2, 3, 4])
+    counts = countTransfers(bus)
+    diagnostics = receiver.readRxDiagnostics()
+    assert counts[0] == 3
+    assert diagnostics.carrierIntegrator is None
+    assert abs(receiver.getClockOffset(receiver.readRxDiagnostics(True)) - 10.0) < 0.5
+    # without the carrier integrator in the diagnostics, the one of the last reception is read
+    assert abs(receiver.getClockOffset(diagnostics) - 10.0) < 0.5
+
+    receiver.enableClockOffset()
+    send(sender, [1, 2, 3, 4])
+    event = nextEvent(receiver, C.EVENT_RECEIVED)
+    assert abs(receiver.getClockOffset(event.diagnostics) - 10.0) < 0.5
+
+
+def test_receive_status_accessors_read_the_chip():
+    bus = DW1000Simulator.SimulatedBus()
+    radio = DW1000.DW1000Radio()
+    radio.begin(20, bus)
+    radio.setup(10)
+    assert not radio.isReceiveFailed() and not radio.isReceiveTimeout()
+    # no interrupt is enabled: the handler does not see these events
+    bus.chips[10].setStatus(C.RXFCE_BIT)
+    assert radio.isReceiveFailed() and not radio.isReceiveTimeout()
+    bus.chips[10].setStatus(C.RXRFTO_BIT)
+    assert radio.isReceiveTimeout()
+    radio.clearReceiveStatus()
+    assert not radio.isReceiveFailed()
+
+
+def test_register_accesses_reuse_the_transfer_buffers():
+    bus = DW1000Simulator.SimulatedBus()
+    radio = makeRadio(bus, 20, 10, 1)
+    buffers = set()
+    transfer = bus.transfer
+
+    def recorded(ss, data):
+        buffers.add(id(data.obj))
+        return transfer(ss, data)
+    bus.transfer = recorded
+    # 3 bytes header, then 1 byte header: the junk bytes must not keep the extended offset
+    radio.writeBytes(C.TX_BUFFER, 200, [1, 2, 3, 4], 4)
+    data = [0] * 4
+    radio.readBytes(C.TX_BUFFER, 200, data, 4)
+    assert data == [1, 2, 3, 4]
+    radio.readBytes(C.DEV_ID, C.NO_SUB, data, 4)
+    assert DW1000.getTimeStamp(data, 0, 4) >> 8 == C.DEV_ID_TAG
+    send(radio, [5, 6])
+    nextEvent(radio, C.EVENT_SENT)
+    assert len(buffers) == 1
+    # an access longer than the buffer gets its own one
+    long = bytearray(C.SPI_BUFFER_LEN)
+    radio.readBytes(C.TX_BUFFER, C.NO_SUB, long, len(long))
+    assert long[:2] == bytearray([5, 6]) and long[200:204] == bytearray([1, 2, 3, 4])
+    assert len(buffers) == 2
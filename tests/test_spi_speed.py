@@ -0,0 +1,66 @@
+import DW1000Constants as C
+import DW1000Simulator
+from test_simulator import makeRadio, nextEvent, send
+
+SS = 10
+
+
+def makeBus(maxSpiSpeed=C.SPI_FAST_SPEED):
+    bus = DW1000Simulator.SimulatedBus()
+    chip = bus.chips[SS] = DW1000Simulator.DW1000Simulator()
+    chip.maxSpiSpeed = maxSpiSpeed
+    return bus, chip
+
+
+def test_speed_is_halved_until_the_link_works():
+    bus, chip = makeBus(8000000)
+    radio = makeRadio(bus, 20, SS, 1)
+    assert radio.getSpiSpeed() == 5000000
+    assert radio.checkLink()
+
+
+def test_speed_follows_the_clock():
+    bus, chip = makeBus()
+    radio = makeRadio(bus, 20, SS, 1)
+    assert radio.getSpiSpeed() == C.SPI_FAST_SPEED
+    radio.enableClock(C.XTI_CLOCK)
+    assert radio.getSpiSpeed() == C.SPI_SLOW_SPEED
+    assert radio.checkLink()
+    radio.enableClock(C.AUTO_CLOCK)
+    assert radio.getSpiSpeed() == C.SPI_FAST_SPEED
+    radio.softReset()
+    assert radio.getSpiSpeed() == C.SPI_FAST_SPEED
+    assert radio.checkLink()
+
+
+def test_speed_stays_slow_without_pll_lock():
+    bus, chip = makeBus()
+    radio = makeRadio(bus, 20, SS, 1)
+    radio.enableClock(C.XTI_CLOCK)
+    chip.pllLocks = False
+    radio.writeStatus(1 << C.CPLOCK_BIT)
+    radio.enableClock(C.AUTO_CLOCK)
+    assert not radio.isPllLocked()
+    assert radio.getSpiSpeed() == C.SPI_SLOW_SPEED
+    assert radio.checkLink()
+    chip.pllLocks = True
+    assert radio.setSpiSpeed(C.SPI_FAST_SPEED) == C.SPI_SLOW_SPEED
+    radio.enableClock(C.AUTO_CLOCK)
+    assert radio.getSpiSpeed() == C.SPI_FAST_SPEED
+
+
+def test_pll_lock_is_kept_by_clear_all_status():
+    bus, chip = makeBus()
+    radio = makeRadio(bus, 20, SS, 1)
+    radio.clearAllStatus()
+    assert radio.isPllLocked()
+
+
+def test_frames_go_through_after_a_clock_fallback():
+    bus, chip = makeBus()
+    sender = makeRadio(bus, 20, SS, 1)
+    receiver = makeRadio(bus, 21, 11, 2)
+    sender.enableClock(C.XTI_CLOCK)
+    sender.enableClock(C.AUTO_CLOCK)
+    send(sender, [1, 2, 3, 4])
+    assert list(nextEvent(receiver, C.EVENT_RECEIVED).data[:4]) == [1, 2, 3, 4]
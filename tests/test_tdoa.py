@@ -0,0 +1,50 @@
+import socket
+
+import DW1000Constants as C
+import DW1000TDoA
+
+SYNC_PERIOD = 63897600  # 0.1 s in DW1000 time units
+
+
+def test_clock_model_converges_on_offset_and_drift():
+    drift = 15e-6
+    offset = C.TIME_OVERFLOW - 1000000
+    model = DW1000TDoA.ClockModel()
+    for i in range(50):
+        local = (i * SYNC_PERIOD) % C.TIME_OVERFLOW
+        reference = int(round(local + offset + drift * i * SYNC_PERIOD)) % C.TIME_OVERFLOW
+        model.update(local, reference)
+    assert model.isSynchronized()
+    assert abs(model.drift - drift) < 1e-7
+    # half a period after the last beacon, across the overflow of the counter
+    local = 49 * SYNC_PERIOD + SYNC_PERIOD // 2
+    expected = int(round(local + offset + drift * local)) % C.TIME_OVERFLOW
+    error = (model.toReference(local % C.TIME_OVERFLOW) - expected) % C.TIME_OVERFLOW
+    assert min(error, C.TIME_OVERFLOW - error) < 10
+
+
+def test_blink_and_sync_round_trip():
+    data = [0] * DW1000TDoA.LEN_SYNC
+    DW1000TDoA.setBlink(data, 0x1234, 263)
+    assert DW1000TDoA.getBlink(data) == (0x1234, 7)
+    assert DW1000TDoA.getSync(data) is None
+    DW1000TDoA.setSync(data, 0x0001, 8, 0x123456789A)
+    assert DW1000TDoA.getSync(data) == (0x0001, 8, 0x123456789A)
+    assert DW1000TDoA.getBlink(data[:DW1000TDoA.LEN_BLINK - 1]) is None
+
+
+def test_records_wrap_at_the_timestamp_overflow():
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.bind(("127.0.0.1", 0))
+    sink.settimeout(5)
+    collector = DW1000TDoA.UdpCollector("127.0.0.1", sink.getsockname()[1])
+    try:
+        for rxTimestamp in (-3, C.TIME_OVERFLOW - 1, C.TIME_OVERFLOW + 5):
+            collector.send(DW1000TDoA.BlinkRecord(1, 0x1234, 7, rxTimestamp, -80.0))
+        collector.flush()
+        records = DW1000TDoA.unpackRecords(sink.recv(65536))
+    finally:
+        collector.close()
+        sink.close()
+    assert [record.rxTimestamp for record in records] == [C.TIME_OVERFLOW - 3, C.TIME_OVERFLOW - 1, 5]
+    assert records[0] == DW1000TDoA.BlinkRecord(1, 0x1234, 7, C.TIME_OVERFLOW - 3, -80.0)
@@ -0,0 +1,34 @@
+import DW1000Constants as C
+import DW1000Timestamp
+
+
+def test_pack_unpack():
+    data = bytearray(6)
+    DW1000Timestamp.pack(data, 0x123456789A, 1)
+    assert data == bytearray([0, 0x9A, 0x78, 0x56, 0x34, 0x12])
+    assert DW1000Timestamp.unpack(data, 1) == 0x123456789A
+
+
+def test_intervals_across_the_overflow():
+    origin = C.TIME_OVERFLOW - 100
+    later = DW1000Timestamp.add(origin, 250)
+    assert later == 150
+    assert DW1000Timestamp.elapsed(later, origin) == 250
+    assert DW1000Timestamp.difference(later, origin) == 250
+    assert DW1000Timestamp.difference(origin, later) == -250
+
+
+def test_divide_rounds_to_nearest():
+    assert DW1000Timestamp.divide(7, 2) == 4
+    assert DW1000Timestamp.divide(5, 3) == 2
+    assert DW1000Timestamp.divide(-7, 2) == -3
+    # beyond the precision of floating point numbers
+    big = (C.TIME_OVERFLOW - 1) ** 2
+    assert DW1000Timestamp.divide(big * 3 + 1, 3) == big
+
+
+def test_unwrapper_counts_overflows():
+    unwrapper = DW1000Timestamp.Unwrapper()
+    step = C.TIME_OVERFLOW // 3
+    values = [unwrapper.unwrap((i * step) % C.TIME_OVERFLOW) for i in range(10)]
+    assert values == [i * step for i in range(10)]